@@ -1,6 +1,17 @@
-"""DEX feature extraction utilities."""
+"""DEX feature extraction utilities.
+
+:func:`parse_dex_features` depends on androguard, which is slow to import, so
+it is loaded on first access rather than when the package is imported.
+"""
 
-from .dex_parser import parse_dex_features
 from .schema import DexFeatureSchema
 
 __all__ = ["parse_dex_features", "DexFeatureSchema"]
+
+
+def __getattr__(name: str):
+    if name == "parse_dex_features":
+        from .dex_parser import parse_dex_features
+
+        return parse_dex_features
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
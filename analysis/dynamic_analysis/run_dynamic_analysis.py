@@ -10,7 +10,21 @@ from pathlib import Path
 from typing import Optional, Union
 
 import utils.logging_utils.logging_engine as log
-from utils.adb_utils.adb_runner import run_adb_command
+from config import app_config
+from utils.adb_utils.adb_runner import run_adb_command, run_adb_command_compressed
+
+
+def _capture(serial: str, args: list[str], path: Path, timeout: int) -> dict:
+    """Run ``args``; with compressed transport enabled keep ``<path>.gz``."""
+    if app_config.ADB_COMPRESS_OUTPUT:
+        return run_adb_command_compressed(
+            serial,
+            args,
+            timeout=timeout,
+            log_errors=False,
+            gzip_path=path.with_name(path.name + ".gz"),
+        )
+    return run_adb_command(serial, args, timeout=timeout, log_errors=False)
 
 
 def run_dynamic_analysis(
@@ -40,10 +54,11 @@ def run_dynamic_analysis(
 
     # Capture a snapshot of logcat
     print(f"[+] Capturing logcat for {serial}...")
-    logcat_res = run_adb_command(
-        serial, ["logcat", "-d"], timeout=duration, log_errors=False
-    )
-    if logcat_res["success"]:
+    logcat_res = _capture(serial, ["logcat", "-d"], logcat_path, duration)
+    if logcat_res.get("raw_path"):
+        logcat_path = Path(logcat_res["raw_path"])
+        print(f"[+] Wrote compressed logcat to {logcat_path}")
+    elif logcat_res["success"]:
         print(f"[+] Writing logcat to {logcat_path}")
         logcat_path.write_text(logcat_res["output"])
     else:
@@ -53,13 +68,13 @@ def run_dynamic_analysis(
 
     # Capture the current activity stack
     print(f"[+] Capturing activity stack for {serial}...")
-    activity_res = run_adb_command(
-        serial,
-        ["shell", "dumpsys", "activity", "activities"],
-        timeout=duration,
-        log_errors=False,
+    activity_res = _capture(
+        serial, ["shell", "dumpsys", "activity", "activities"], activity_path, duration
     )
-    if activity_res["success"]:
+    if activity_res.get("raw_path"):
+        activity_path = Path(activity_res["raw_path"])
+        print(f"[+] Wrote compressed activity stack to {activity_path}")
+    elif activity_res["success"]:
         print(f"[+] Writing activity stack to {activity_path}")
         activity_path.write_text(activity_res["output"])
     else:
@@ -1,4 +1,5 @@
 import shutil
+from pathlib import Path
 from typing import Dict, Optional
 import subprocess
 import utils.logging_utils.logging_engine as log
@@ -55,3 +56,34 @@ def analyze_apk(apk_path: str) -> Dict[str, str]:
     print("APK metadata extraction complete")
     return metadata
 
+
+# Members aapt2 needs for badging and that carry the signing data
+REMOTE_TRIAGE_PATTERNS = ("AndroidManifest.xml", "resources.arsc", "META-INF/*")
+
+
+def analyze_remote_apk(serial: str, remote_path: str, work_dir: str | Path) -> Dict[str, str]:
+    """Analyze an APK on the device after fetching only its triage members.
+
+    The manifest, resource table and ``META-INF`` signature files are read
+    with ranged transfers (see :mod:`utils.adb_utils.remote_zip`) into a
+    slimmed-down local copy, which is then handed to :func:`analyze_apk`.
+    """
+    from utils.adb_utils.remote_zip import RemoteZip, RemoteZipError
+
+    try:
+        archive = RemoteZip.open(serial, remote_path)
+        stub = archive.extract_subset(
+            Path(work_dir) / Path(remote_path).name, REMOTE_TRIAGE_PATTERNS
+        )
+    except (RemoteZipError, OSError) as exc:
+        log.warning(f"Partial read of {remote_path} failed: {exc}")
+        print(f"⚠️  Could not read {remote_path} remotely: {exc}")
+        return {}
+    log.info(
+        f"Fetched {archive.bytes_transferred} of {archive.size} bytes from {remote_path}"
+    )
+    metadata = analyze_apk(str(stub))
+    signatures = archive.match(["META-INF/*.RSA", "META-INF/*.DSA", "META-INF/*.EC"])
+    if signatures:
+        metadata["signature_files"] = ", ".join(signatures)
+    return metadata
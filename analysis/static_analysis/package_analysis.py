@@ -1,13 +1,18 @@
 """Utilities for querying package information via adb."""
 
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 import logging
+import re
+import shlex
+import time
 from pathlib import Path
 
 import utils.logging_utils.logging_engine as log
-from utils.adb_utils.adb_runner import run_adb_command
+from config import app_config
+from utils.adb_utils.adb_runner import run_adb_command, run_adb_command_compressed
 from utils.display_utils.progress import Progress
+from utils.perf_utils import metrics, tracing
 
 # Prefer modular imports, but gracefully fallback if unavailable
 try:
@@ -57,6 +62,144 @@ class PackageReport:
     apk_hash: Optional[str] = None
     apk_path: Optional[str] = None
     artifacts: Optional[List[str]] = None
+    users: Optional[List[int]] = None
+    version_code: Optional[str] = None
+
+
+@dataclass
+class InstallMatrix:
+    """Which packages are installed for which Android users on a device."""
+
+    users: Dict[int, str] = field(default_factory=dict)
+    paths: Dict[str, str] = field(default_factory=dict)
+    installs: Dict[str, List[int]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.paths)
+
+    def users_for(self, package: str) -> List[int]:
+        """Return the ids of the users that have ``package`` installed."""
+        return list(self.installs.get(package, []))
+
+    def packages_for(self, user: int) -> List[str]:
+        """Return the packages installed for ``user``."""
+        return [pkg for pkg, users in self.installs.items() if user in users]
+
+
+# Lists users, then every user's packages, in a single adb round-trip
+_INSTALL_MATRIX_SCRIPT = (
+    "users=$(pm list users); echo \"$users\"; "
+    "ids=$(echo \"$users\" | sed -n 's/.*UserInfo{\\([0-9]*\\):.*/\\1/p'); "
+    "for u in ${ids:-0}; do echo \"@user $u\"; pm list packages -f -U --user $u; done"
+)
+_USER_RE = re.compile(r"UserInfo\{(\d+):([^:}]*)")
+# Android derives app uids as user_id * 100000 + app_id
+_PER_USER_RANGE = 100000
+
+
+def _parse_package_line(line: str) -> Tuple[str, str, List[int]]:
+    """Split ``package:<path>=<pkg> [uid:<uid>[,<uid>...]]``.
+
+    The package name is taken after the *last* ``=``, as Android 11+ install
+    directories (``~~<base64>==``) contain ``=`` themselves.
+    """
+    body = line[len("package:") :]
+    uids: List[int] = []
+    head, sep, uid_text = body.partition(" uid:")
+    if sep:
+        uids = [int(u) for u in uid_text.strip().split(",") if u.strip().isdigit()]
+    path, _, pkg = head.rpartition("=")
+    return path.strip(), pkg.strip(), uids
+
+
+def parse_install_matrix(output: str) -> InstallMatrix:
+    """Parse the output of the batched users/packages listing."""
+    matrix = InstallMatrix()
+    user: Optional[int] = None
+    for line in output.splitlines():
+        line = line.strip()
+        if line.startswith("@user "):
+            value = line[len("@user ") :].strip()
+            user = int(value) if value.isdigit() else None
+            continue
+        match = _USER_RE.search(line)
+        if match:
+            matrix.users[int(match.group(1))] = match.group(2)
+            continue
+        if not line.startswith("package:"):
+            continue
+        path, pkg, uids = _parse_package_line(line)
+        if not pkg:
+            continue
+        matrix.paths.setdefault(pkg, path)
+        owners = matrix.installs.setdefault(pkg, [])
+        found = [uid // _PER_USER_RANGE for uid in uids] if user is None else [user]
+        for uid_user in found:
+            if uid_user not in owners:
+                owners.append(uid_user)
+    for user_id in {u for users in matrix.installs.values() for u in users}:
+        matrix.users.setdefault(user_id, "")
+    return matrix
+
+
+def get_install_matrix(serial: str, raw_dir: Path | None = None) -> InstallMatrix:
+    """Return the package x user installation matrix for ``serial``.
+
+    ``pm list users`` and a ``pm list packages -f -U --user <id>`` for every
+    user run in one shell invocation, so work profiles and secondary users
+    are covered without a round-trip per user or per package.  If
+    ``raw_dir`` is provided, the raw output is written to
+    ``raw_dir / 'pm_list_users_packages.txt'`` and one ``package:`` line per
+    distinct package to ``raw_dir / 'pm_list_packages.txt'``.
+    """
+
+    log.debug(f"Listing packages for all users on {serial}")
+    result = _fetch_listing(
+        serial, ["shell", _INSTALL_MATRIX_SCRIPT], raw_dir, "pm_list_users_packages.txt"
+    )
+
+    if not result.get("success", False):
+        log.warning(
+            f"ADB failed while fetching APK paths for {serial} :: {result.get('error')}"
+        )
+        return InstallMatrix()
+
+    output = str(result.get("output") or "")
+    matrix = parse_install_matrix(output)
+    if raw_dir is not None:
+        try:
+            if not result.get("raw_path"):
+                (raw_dir / "pm_list_users_packages.txt").write_text(output)
+            (raw_dir / "pm_list_packages.txt").write_text(
+                "\n".join(f"package:{path}={pkg}" for pkg, path in matrix.paths.items())
+            )
+        except OSError:
+            pass
+
+    if not matrix:
+        log.warning(f"No APK paths found for {serial}")
+        return matrix
+
+    log.info(
+        f"Discovered APK paths for {len(matrix.paths)} packages across "
+        f"{len(matrix.users)} user(s) on {serial}"
+    )
+    return matrix
+
+
+def _fetch_listing(
+    serial: str, args: List[str], raw_dir: Path | None, raw_name: str
+) -> Dict[str, object]:
+    """Run a large text listing, compressed on the wire when enabled.
+
+    With ``app_config.ADB_COMPRESS_OUTPUT`` the raw output is kept as
+    ``raw_dir / '<raw_name>.gz'`` and the result's ``raw_path`` is set, so
+    callers skip writing the plain-text copy.
+    """
+    if app_config.ADB_COMPRESS_OUTPUT:
+        gzip_path = raw_dir / f"{raw_name}.gz" if raw_dir is not None else None
+        return run_adb_command_compressed(serial, args, gzip_path=gzip_path)
+    return run_adb_command(serial, args)
 
 
 def get_all_package_permissions(serial: str, raw_dir: Path | None = None) -> Dict[str, List[str]]:
@@ -67,7 +210,7 @@ def get_all_package_permissions(serial: str, raw_dir: Path | None = None) -> Dic
     """
 
     log.debug(f"Fetching full package dump for {serial}")
-    result = run_adb_command(serial, ["shell", "dumpsys", "package"])
+    result = _fetch_listing(serial, ["shell", "dumpsys", "package"], raw_dir, "dumpsys_package.txt")
 
     if not result.get("success", False):
         log.warning(
@@ -76,7 +219,7 @@ def get_all_package_permissions(serial: str, raw_dir: Path | None = None) -> Dic
         return {}
 
     output: Optional[str] = result.get("output")
-    if raw_dir is not None:
+    if raw_dir is not None and not result.get("raw_path"):
         try:
             (raw_dir / "dumpsys_package.txt").write_text(str(output or ""))
         except OSError:
@@ -86,6 +229,17 @@ def get_all_package_permissions(serial: str, raw_dir: Path | None = None) -> Dic
         log.warning(f"No package data found for {serial}")
         return {}
 
+    packages = parse_package_permissions(output)
+    log.info(f"Parsed permissions for {len(packages)} packages in total")
+    return packages
+
+
+def parse_package_permissions(output: str, keep_first: bool = False) -> Dict[str, List[str]]:
+    """Parse ``Package [<name>]`` sections of ``dumpsys package`` output.
+
+    With ``keep_first`` only the first section of each package counts; the
+    per-package dump repeats it under "Hidden system packages".
+    """
     packages: Dict[str, List[str]] = {}
     current_pkg: Optional[str] = None
     count = 0
@@ -97,6 +251,9 @@ def get_all_package_permissions(serial: str, raw_dir: Path | None = None) -> Dic
             end = line.find("]")
             if end != -1:
                 current_pkg = line[len("Package [") : end]
+                if keep_first and current_pkg in packages:
+                    current_pkg = None
+                    continue
                 packages[current_pkg] = []
                 count += 1
                 ticker.update(count)
@@ -107,51 +264,166 @@ def get_all_package_permissions(serial: str, raw_dir: Path | None = None) -> Dic
 
     ticker.total = count
     ticker.update(count)
-    log.info(f"Parsed permissions for {count} packages in total")
     return packages
 
 
-def get_installed_apk_paths(serial: str, raw_dir: Path | None = None) -> Dict[str, str]:
-    """Return a mapping of package names to APK paths on the device.
+@dataclass
+class InventoryEntry:
+    """One package from the lean ``cmd package list packages`` inventory."""
 
-    If ``raw_dir`` is provided, the raw ``pm list packages`` output is written
-    to ``raw_dir / 'pm_list_packages.txt'``.
-    """
+    path: str
+    version_code: Optional[str] = None
+    installer: Optional[str] = None
+    uid: Optional[int] = None
 
-    log.debug(f"Listing APK paths for {serial}")
-    result = run_adb_command(
-        serial, ["shell", "pm", "list", "packages", "-f", "-u", "--user", "0"]
-    )
 
+# Inventory without the resolver tables, libraries etc. of a full dumpsys
+_FAST_INVENTORY_CMD = "cmd package list packages -f -U --show-versioncode -i"
+# Packages per batched ``dumpsys package <pkg>`` shell call
+DETAIL_BATCH_SIZE = 50
+# Beyond this share of packages needing detail, one full dump is cheaper
+FAST_DETAIL_MAX_FRACTION = 0.5
+
+
+def parse_package_inventory(output: str) -> Dict[str, InventoryEntry]:
+    """Parse ``package:<path>=<pkg> versionCode:<n> installer=<x> uid:<n>`` lines."""
+    inventory: Dict[str, InventoryEntry] = {}
+    for line in output.splitlines():
+        line = line.strip()
+        if not line.startswith("package:"):
+            continue
+        head, *fields = line[len("package:") :].split(" ")
+        path, _, pkg = head.rpartition("=")
+        if not pkg:
+            continue
+        entry = InventoryEntry(path=path)
+        for token in fields:
+            if token.startswith("versionCode:"):
+                entry.version_code = token[len("versionCode:") :]
+            elif token.startswith("installer="):
+                value = token[len("installer=") :]
+                entry.installer = None if value == "null" else value
+            elif token.startswith("uid:") and token[len("uid:") :].isdigit():
+                entry.uid = int(token[len("uid:") :])
+        inventory[pkg] = entry
+    return inventory
+
+
+def get_package_inventory(serial: str, raw_dir: Path | None = None) -> Dict[str, InventoryEntry]:
+    """Return the lean package inventory for ``serial``.
+
+    An empty mapping means the device's ``cmd package`` lacks the needed
+    options (or adb failed) and callers should use the full dump instead.
+    """
+    log.debug(f"Fetching fast package inventory for {serial}")
+    result = _fetch_listing(serial, ["shell", _FAST_INVENTORY_CMD], raw_dir, "package_inventory.txt")
     if not result.get("success", False):
         log.warning(
-            f"ADB failed while fetching APK paths for {serial} :: {result.get('error')}"
+            f"ADB failed while fetching package inventory for {serial} :: {result.get('error')}"
         )
         return {}
-
-    output: Optional[str] = result.get("output")
-    if raw_dir is not None:
+    output = str(result.get("output") or "")
+    if raw_dir is not None and not result.get("raw_path"):
         try:
-            (raw_dir / "pm_list_packages.txt").write_text(str(output or ""))
+            (raw_dir / "package_inventory.txt").write_text(output)
         except OSError:
             pass
+    return parse_package_inventory(output)
 
-    if not isinstance(output, str) or not output.strip():
-        log.warning(f"No APK paths found for {serial}")
-        return {}
 
-    apk_paths: Dict[str, str] = {}
-    for line in output.splitlines():
-        line = line.strip()
-        if not line.startswith("package:"):
+def get_package_permissions(
+    serial: str, packages: Iterable[str], batch_size: int = DETAIL_BATCH_SIZE
+) -> Dict[str, List[str]]:
+    """Return permissions for ``packages`` only, ``batch_size`` per adb call."""
+    packages = list(packages)
+    perms: Dict[str, List[str]] = {}
+    for start in range(0, len(packages), batch_size):
+        batch = packages[start : start + batch_size]
+        script = "; ".join(f"dumpsys package {shlex.quote(pkg)}" for pkg in batch)
+        result = run_adb_command(serial, ["shell", script], timeout=60)
+        if not result.get("success", False):
+            log.warning(
+                f"ADB failed while fetching package detail for {serial} :: {result.get('error')}"
+            )
             continue
-        path_package = line[len("package:") :]
-        path, _, pkg = path_package.partition("=")
-        if pkg:
-            apk_paths[pkg.strip()] = path.strip()
+        parsed = parse_package_permissions(str(result.get("output") or ""), keep_first=True)
+        perms.update((pkg, parsed[pkg]) for pkg in batch if pkg in parsed)
+    return perms
 
-    log.info(f"Discovered APK paths for {len(apk_paths)} packages on {serial}")
-    return apk_paths
+
+def select_for_detail(
+    inventory: Mapping[str, InventoryEntry],
+    previous: Mapping[str, Mapping[str, Any]],
+) -> List[str]:
+    """Return the packages whose permissions must be fetched again.
+
+    A package needs detail when it is new since ``previous`` (reports of the
+    last run keyed by name), its version code changed, or the previous run
+    has no permission list for it.  Risk scores are derived from the
+    permissions, so an unchanged flagged package keeps its previous ones.
+    """
+    needed: List[str] = []
+    for pkg, entry in inventory.items():
+        prev = previous.get(pkg)
+        if (
+            prev is None
+            or prev.get("permissions") is None
+            or not prev.get("version_code")
+            or str(prev.get("version_code")) != str(entry.version_code)
+        ):
+            needed.append(pkg)
+    return needed
+
+
+def get_fast_package_permissions(
+    serial: str,
+    previous: Mapping[str, Mapping[str, Any]],
+    raw_dir: Path | None = None,
+) -> Tuple[Dict[str, List[str]], Dict[str, InventoryEntry]]:
+    """Build the permission map from the lean inventory plus targeted dumps.
+
+    Unchanged packages reuse the permissions recorded in
+    ``previous``; only :func:`select_for_detail` packages are dumped, unless
+    they exceed ``FAST_DETAIL_MAX_FRACTION`` of the inventory (e.g. on a
+    first run), in which case a single full dump is used.  Returns
+    ``({}, {})`` when the lean inventory is unavailable.
+    """
+    inventory = get_package_inventory(serial, raw_dir=raw_dir)
+    if not inventory:
+        return {}, {}
+    needed = select_for_detail(inventory, previous)
+    if len(needed) > FAST_DETAIL_MAX_FRACTION * len(inventory):
+        log.info(
+            f"{len(needed)} of {len(inventory)} package(s) need detail; using the full dump"
+        )
+        full = get_all_package_permissions(serial, raw_dir=raw_dir)
+        return {pkg: full.get(pkg, []) for pkg in inventory}, inventory
+    needed_set = set(needed)
+    perms_map: Dict[str, List[str]] = {
+        pkg: list(previous[pkg]["permissions"]) for pkg in inventory if pkg not in needed_set
+    }
+    fetched = get_package_permissions(serial, needed)
+    for pkg in needed:
+        perms_map[pkg] = fetched.get(pkg, [])
+    detail = metrics.registry().counter(
+        "gf_package_detail_total", "Packages by permission source in fast inventory mode"
+    )
+    detail.inc(len(needed), source="dumpsys")
+    detail.inc(len(inventory) - len(needed), source="previous_run")
+    log.info(
+        f"Fast inventory: {len(inventory)} package(s), {len(needed)} needing permission detail"
+    )
+    return perms_map, inventory
+
+
+def get_installed_apk_paths(serial: str, raw_dir: Path | None = None) -> Dict[str, str]:
+    """Return a mapping of package names to APK paths on the device.
+
+    Packages installed for any user are included; see
+    :func:`get_install_matrix` for the per-user breakdown.
+    """
+
+    return get_install_matrix(serial, raw_dir=raw_dir).paths
 
 
 def verify_package_apks(
@@ -166,16 +438,17 @@ def verify_package_apks(
 
     valid: Dict[str, str] = {}
     missing: List[str] = []
+    verbose = _is_verbose_enabled()
     ticker = Progress("Validating APKs", total, progress_every)
     for idx, pkg in enumerate(packages, start=1):
         path = apk_paths.get(pkg)
         if path:
             valid[pkg] = path
-            log.debug(f"APK for {pkg} located at {path}")
+            log.debug("APK for %s located at %s", pkg, path)
         else:
             missing.append(pkg)
-            if _is_verbose_enabled():
-                log.warning(f"No APK path found for {pkg}")
+            if verbose:
+                log.warning("No APK path found for %s", pkg)
         ticker.update(idx)
 
     return valid, missing
@@ -191,7 +464,8 @@ def compute_apk_hashes(
     hashes: Dict[str, str] = {}
     ticker = Progress("Hashing APKs", total, progress_every)
     for idx, (pkg, path) in enumerate(apk_map.items(), start=1):
-        result = run_adb_command(serial, ["shell", "sha256sum", path])
+        with tracing.span("hash_apk", serial=serial, package=pkg):
+            result = run_adb_command(serial, ["shell", "sha256sum", path])
         if result.get("success", False):
             output: Optional[str] = result.get("output")
             if isinstance(output, str):
@@ -201,47 +475,89 @@ def compute_apk_hashes(
                         hash_val, reported_path = parts[0], parts[1]
                         if reported_path != path:
                             log.warning(
-                                f"Hash output path mismatch for {pkg}: expected {path}, got {reported_path}"
+                                "Hash output path mismatch for %s: expected %s, got %s",
+                                pkg,
+                                path,
+                                reported_path,
                             )
                         else:
                             hashes[pkg] = hash_val
-                            log.debug(f"Hash for {pkg}: {hash_val}")
+                            log.debug("Hash for %s: %s", pkg, hash_val)
                     elif parts:
-                        log.warning(
-                            f"Malformed hash output for {pkg}: {output!r}"
-                        )
+                        log.warning("Malformed hash output for %s: %r", pkg, output)
                     else:
-                        log.warning(f"No hash output for {pkg}")
+                        log.warning("No hash output for %s", pkg)
                 except Exception as exc:  # pragma: no cover - defensive
-                    log.warning(f"Failed to parse hash for {pkg} :: {exc}")
+                    log.warning("Failed to parse hash for %s :: %s", pkg, exc)
             else:
-                log.warning(f"No hash output for {pkg}")
+                log.warning("No hash output for %s", pkg)
         else:
             log.warning(
-                f"Failed to hash {pkg} :: {result.get('error', 'no error provided')}"
+                "Failed to hash %s :: %s", pkg, result.get("error", "no error provided")
             )
         ticker.update(idx)
 
     return hashes
 
 
-def analyze_packages(serial: str, raw_dir: Path | None = None) -> List[PackageReport]:
+def analyze_packages(
+    serial: str,
+    raw_dir: Path | None = None,
+    known_artifacts: Mapping[str, List[str]] | None = None,
+    on_report: Callable[[PackageReport], None] | None = None,
+    install_matrix: InstallMatrix | None = None,
+    fast_inventory: bool = False,
+    previous_reports: Mapping[str, Mapping[str, Any]] | None = None,
+) -> List[PackageReport]:
     """Gather package, permission, and risk information for ``serial``.
 
     ``raw_dir`` is an optional directory where raw adb command output will be
-    stored.
+    stored.  ``known_artifacts`` maps APK hashes to artifacts found by an
+    earlier run; packages whose hash is present reuse those artifacts instead
+    of pulling and scanning the APK again.  ``on_report`` is called with
+    each report as soon as it is built, e.g. to hand it to a write-behind
+    database writer while analysis continues.  ``install_matrix`` reuses an
+    already fetched :class:`InstallMatrix` instead of listing packages again;
+    each report records the users that have the package installed.
+
+    With ``fast_inventory`` the full ``dumpsys package`` is replaced by the
+    lean ``cmd package list packages`` inventory; permissions are dumped only
+    for packages that are new, changed or missing permissions in
+    ``previous_reports`` (the last run's reports keyed by package name) and
+    reused from it otherwise.  Devices without the lean inventory fall back
+    to the full dump.
     """
 
-    print("- Retrieving package permissions...")
-    perms_map = get_all_package_permissions(serial, raw_dir=raw_dir)
+    perms_map: Dict[str, List[str]] = {}
+    inventory: Dict[str, InventoryEntry] = {}
+    if fast_inventory:
+        print("- Retrieving package inventory...")
+        with tracing.span("fast_inventory", serial=serial) as span_args:
+            perms_map, inventory = get_fast_package_permissions(
+                serial, previous_reports or {}, raw_dir=raw_dir
+            )
+            span_args["packages"] = len(inventory)
+        if not inventory:
+            print("  Fast inventory unavailable; using full package dump")
+    if not inventory:
+        print("- Retrieving package permissions...")
+        with tracing.span("dumpsys_package", serial=serial) as span_args:
+            perms_map = get_all_package_permissions(serial, raw_dir=raw_dir)
+            span_args["packages"] = len(perms_map)
     print(f"  Found {len(perms_map)} package(s)")
 
     print("- Listing installed APK paths...")
-    apk_paths = get_installed_apk_paths(serial, raw_dir=raw_dir)
+    with tracing.span("pm_list_packages", serial=serial) as span_args:
+        if install_matrix is None:
+            install_matrix = get_install_matrix(serial, raw_dir=raw_dir)
+        apk_paths = install_matrix.paths
+        span_args["packages"] = len(apk_paths)
+        span_args["users"] = len(install_matrix.users)
     print(f"  Located paths for {len(apk_paths)} package(s)")
 
     print("- Verifying APK availability...")
-    verified_apks, missing = verify_package_apks(perms_map.keys(), apk_paths)
+    with tracing.span("verify_apks", serial=serial):
+        verified_apks, missing = verify_package_apks(perms_map.keys(), apk_paths)
     print(f"  Verified APKs for {len(verified_apks)} package(s)")
 
     if missing:
@@ -249,7 +565,9 @@ def analyze_packages(serial: str, raw_dir: Path | None = None) -> List[PackageRe
         print(f"  Skipping {len(missing)} package(s) without APKs")
 
     print("- Computing APK hashes...")
-    hashes = compute_apk_hashes(serial, verified_apks)
+    with tracing.span("hashing", serial=serial) as span_args:
+        hashes = compute_apk_hashes(serial, verified_apks)
+        span_args["packages"] = len(hashes)
     print(f"  Calculated hashes for {len(hashes)} package(s)")
 
     packages = list(verified_apks.keys())
@@ -259,21 +577,30 @@ def analyze_packages(serial: str, raw_dir: Path | None = None) -> List[PackageRe
 
     progress_every = 10
     ticker = Progress("Analyzing packages", total, progress_every)
-    for idx, pkg in enumerate(packages, start=1):
-        perms = perms_map.get(pkg, [])
-        dangerous = [p for p in perms if p in SENSITIVE_PERMISSIONS]
-        risk = len(dangerous)
-
-        category = get_category(pkg)
-        apk_hash = hashes.get(pkg)
-
-        # Optional artifact analysis (if available)
-        artifacts = None
-        if string_finder:
-            artifacts = string_finder.find_artifacts(serial, pkg)
-
-        reports.append(
-            PackageReport(
+    reg = metrics.registry()
+    cache_requests = reg.counter("gf_cache_requests_total", "Cache lookups by result")
+    started = time.perf_counter()
+    with tracing.span("artifacts", serial=serial, packages=total):
+        for idx, pkg in enumerate(packages, start=1):
+            perms = perms_map.get(pkg, [])
+            dangerous = [p for p in perms if p in SENSITIVE_PERMISSIONS]
+            risk = len(dangerous)
+
+            category = get_category(pkg)
+            apk_hash = hashes.get(pkg)
+
+            # Optional artifact analysis (if available)
+            artifacts = None
+            if known_artifacts and apk_hash and apk_hash in known_artifacts:
+                artifacts = list(known_artifacts[apk_hash])
+                cache_requests.inc(cache="artifacts", result="hit")
+                log.debug(f"Reusing {len(artifacts)} cached artifact(s) for {pkg}")
+            elif string_finder:
+                if known_artifacts is not None:
+                    cache_requests.inc(cache="artifacts", result="miss")
+                artifacts = string_finder.find_artifacts(serial, pkg)
+
+            report = PackageReport(
                 name=pkg,
                 category=category,
                 permissions=perms,
@@ -282,11 +609,29 @@ def analyze_packages(serial: str, raw_dir: Path | None = None) -> List[PackageRe
                 apk_hash=apk_hash,
                 apk_path=verified_apks.get(pkg),
                 artifacts=artifacts,
+                users=install_matrix.users_for(pkg) or None,
+                version_code=inventory[pkg].version_code if pkg in inventory else None,
             )
+            reports.append(report)
+            if on_report is not None:
+                on_report(report)
+
+            counters = string_finder.get_failure_counts() if string_finder else None
+            ticker.update(idx, counters)
+
+    elapsed = time.perf_counter() - started
+    reg.counter("gf_apks_scanned_total", "APKs analyzed").inc(len(reports))
+    if elapsed > 0:
+        reg.gauge("gf_apks_scanned_per_second", "APK analysis throughput").set(
+            len(reports) / elapsed
+        )
+    lookups = cache_requests.value(cache="artifacts", result="hit") + cache_requests.value(
+        cache="artifacts", result="miss"
+    )
+    if lookups:
+        reg.gauge("gf_cache_hit_ratio", "Cache hit ratio").set(
+            cache_requests.value(cache="artifacts", result="hit") / lookups, cache="artifacts"
         )
-
-        counters = string_finder.get_failure_counts() if string_finder else None
-        ticker.update(idx, counters)
 
     flagged = sum(1 for r in reports if r.risk_score)
     log.info(
@@ -1,9 +1,9 @@
 """Formatting helpers for static analysis reports."""
 
 from collections import Counter
-from typing import Iterable, Optional, Mapping, Any
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional
 
-from utils.csv_utils import write_csv, read_apk_list, validate_apk_list
+from utils.csv_utils import CsvWriteSummary, write_csv
 
 from .package_analysis import PackageReport
 from .social_app_finder import SocialApp
@@ -75,14 +75,32 @@ def print_reports(
 
 def write_csv_report(
     reports: Iterable[PackageReport | Mapping[str, Any]], path: str
-) -> None:
+) -> CsvWriteSummary:
     """Write ``reports`` to ``path`` using :func:`utils.csv_utils.write_csv`.
 
     ``reports`` may contain :class:`PackageReport` instances or mapping-like
-    objects with matching keys.
+    objects with matching keys.  The file is validated while it is written;
+    the returned summary holds the row count, size and checksum.
     """
 
-    rows = []
+    summary = write_csv(path, _report_rows(reports), headers=["Category", "Risk_Score"])
+    if summary.valid:
+        print(
+            f"[report_formatter] Wrote {summary.rows} report row(s) to {path} "
+            f"({summary.bytes} bytes, sha256 {summary.sha256[:12]})"
+        )
+    else:
+        print(
+            f"[report_formatter] Warning: {summary.invalid_rows} of {summary.rows} "
+            f"row(s) in {path} lack a package or APK path"
+        )
+        log.warning(f"CSV {path} failed validation: {'; '.join(summary.errors)}")
+    return summary
+
+
+def _report_rows(
+    reports: Iterable[PackageReport | Mapping[str, Any]]
+) -> Iterator[Dict[str, Any]]:
     for rep in reports:
         if isinstance(rep, Mapping):
             pkg = rep.get("Package") or rep.get("package") or rep.get("name")
@@ -94,31 +112,15 @@ def write_csv_report(
             apk = rep.apk_path
             category = rep.category
             risk = rep.risk_score
-        rows.append(
-            {
-                "Package": pkg,
-                "APK_Path": apk or "",
-                "Category": category,
-                "Risk_Score": risk,
-            }
-        )
-
-    print(
-        f"[report_formatter] Writing {len(rows)} report row(s) to {path}"
-    )
-    write_csv(path, rows, headers=["Category", "Risk_Score"])
-
-    # Debugging verification to ensure the file was written correctly
-    if validate_apk_list(path):
-        loaded = read_apk_list(path)
-        print(
-            f"[report_formatter] Verified CSV at {path} with {len(loaded)} row(s)"
-        )
-    else:
-        print(f"[report_formatter] Warning: failed to validate written CSV at {path}")
+        yield {
+            "Package": pkg,
+            "APK_Path": apk or "",
+            "Category": category,
+            "Risk_Score": risk,
+        }
 
 
-def write_social_csv(apps: Iterable[SocialApp], path: str) -> None:
+def write_social_csv(apps: Iterable[SocialApp], path: str) -> CsvWriteSummary:
     """Write detected social apps to ``path`` as a CSV."""
 
     rows = []
@@ -133,4 +135,4 @@ def write_social_csv(apps: Iterable[SocialApp], path: str) -> None:
         )
 
     print(f"[report_formatter] Writing {len(rows)} social app row(s) to {path}")
-    write_csv(path, rows, headers=["App_Name", "Label"])
+    return write_csv(path, rows, headers=["App_Name", "Label"])
@@ -1,6 +1,11 @@
+import functools
+import json
+import sqlite3
+import tempfile
+from dataclasses import asdict, dataclass, field, is_dataclass
 from pathlib import Path
 from datetime import datetime
-from typing import Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 from . import (
     package_analysis,
@@ -14,6 +19,19 @@ from config import app_config
 from utils.display_utils import menu_utils, theme
 from utils.adb_utils.adb_devices import get_connected_devices
 from utils.adb_utils.adb_runner import run_adb_command
+from utils.perf_utils import metrics, profiling, tracing
+from database import artifact_index, run_catalog
+
+
+@dataclass
+class DeviceRun:
+    """Outcome of :func:`analyze_device` for a single device."""
+
+    serial: str
+    run_dir: Path
+    reports: List = field(default_factory=list)
+    social_apps: List = field(default_factory=list)
+    artifacts: List[Path] = field(default_factory=list)
 
 
 def prepare_run_dirs(
@@ -44,6 +62,80 @@ def save_reports(
     return [packages_csv, social_csv]
 
 
+def record_in_catalog(
+    serial: str, run_dir: Path, reports: Iterable, social_apps: Iterable
+) -> None:
+    """Add the run to the SQLite catalog next to the device directories.
+
+    Artifacts of APK hashes not seen before are added to the full-text
+    artifact index.  Catalog failures are logged and never abort the run.
+    """
+
+    base_dir = run_dir.parent.parent
+    try:
+        run_catalog.record_run(base_dir, serial, run_dir, reports, social_apps)
+        artifact_index.index_run(base_dir, reports)
+    except sqlite3.Error as exc:
+        log.warning(f"Could not record run in catalog {base_dir}: {exc}")
+
+
+def report_to_dict(rep) -> dict:
+    """Return ``rep`` (a report dataclass or mapping) as a plain dict."""
+
+    if is_dataclass(rep):
+        return asdict(rep)
+    return dict(rep)
+
+
+def save_results_json(reports: Iterable, reports_dir: Path) -> Path:
+    """Write the full report records, including hashes and artifacts, as JSON."""
+
+    path = reports_dir / "results.json"
+    payload = [report_to_dict(rep) for rep in reports]
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    return path
+
+
+def load_previous_artifacts(serial: str, base_dir: str | Path) -> Dict[str, List[str]]:
+    """Return ``{apk_hash: artifacts}`` from the device's ``latest`` run.
+
+    Missing or unreadable results yield an empty mapping so callers simply
+    fall back to a full scan.
+    """
+
+    path = Path(base_dir) / serial / "latest" / "reports" / "results.json"
+    try:
+        records = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+    known: Dict[str, List[str]] = {}
+    for rec in records:
+        digest = rec.get("apk_hash") if isinstance(rec, dict) else None
+        artifacts = rec.get("artifacts") if isinstance(rec, dict) else None
+        if digest and artifacts is not None:
+            known[digest] = list(artifacts)
+    log.info(f"Loaded {len(known)} cached artifact set(s) from {path}")
+    return known
+
+
+def load_previous_reports(serial: str, base_dir: str | Path) -> Dict[str, Dict[str, Any]]:
+    """Return the device's ``latest`` run reports keyed by package name.
+
+    Used by fast inventory mode to reuse permissions of unchanged packages;
+    missing or unreadable results yield an empty mapping.
+    """
+
+    path = Path(base_dir) / serial / "latest" / "reports" / "results.json"
+    try:
+        records = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {
+        rec["name"]: rec for rec in records if isinstance(rec, dict) and rec.get("name")
+    }
+
+
 def update_latest_symlink(run_dir: Path) -> None:
     """Point the device's ``latest`` symlink to ``run_dir``."""
 
@@ -104,6 +196,10 @@ def pull_apks(serial: str, reports: Iterable, apks_dir: Path) -> List[Path]:
         )
         if res.get("success"):
             pulled.append(local)
+            if local.exists():
+                metrics.registry().counter(
+                    "gf_bytes_pulled_total", "Bytes pulled from devices"
+                ).inc(local.stat().st_size, source="pull_apks")
     print(f"  Pulled {len(pulled)} APK(s)")
     return pulled
 
@@ -113,29 +209,137 @@ def analyze_device(
     artifact_limit: int | None = None,
     base_output_dir: str | Path = "output",
     pull_apk_files: bool = True,
-) -> None:
-    """Run static analysis against connected device packages."""
+    incremental: bool = False,
+    profile: bool = False,
+    save_db: bool = False,
+    fast_inventory: bool = False,
+) -> Optional[DeviceRun]:
+    """Run static analysis against connected device packages.
+
+    With ``incremental`` set, artifacts recorded by the device's previous run
+    are reused for packages whose APK hash has not changed.  Returns a
+    :class:`DeviceRun` describing the run, or ``None`` when no packages were
+    found.  Stage and adb timings are written to ``trace.json`` in the run
+    directory (Chrome trace-event format) alongside ``metrics.prom`` and
+    ``metrics.json`` with the run's aggregate counters and histograms, and
+    the run is added to the SQLite catalog in ``base_output_dir``.
+
+    With ``profile`` set, each pipeline stage is run under cProfile and
+    tracemalloc; per-stage reports are written to ``profile/`` in the run
+    directory and a summary of hot spots is printed once the run ends.
+
+    With ``save_db`` set, each package report is handed to the background
+    database writer (:mod:`database.db_writer`) as soon as it is built.
+
+    With ``fast_inventory`` set, packages are enumerated with the lean
+    ``cmd package`` listing and only new or changed packages (versus
+    the previous run) get a per-package ``dumpsys``.
+    """
 
     print(f"\n📱 Starting static analysis for device {serial}")
     if artifact_limit is None:
         artifact_limit = getattr(app_config, "ARTIFACT_LIMIT", 3)
 
+    known_artifacts = (
+        load_previous_artifacts(serial, base_output_dir) if incremental else None
+    )
+    previous_reports = (
+        load_previous_reports(serial, base_output_dir) if fast_inventory else None
+    )
+
     run_dir, raw_dir, reports_dir, apks_dir = prepare_run_dirs(
         serial, base_output_dir, pull_apks=pull_apk_files
     )
 
-    reports = package_analysis.analyze_packages(serial, raw_dir=raw_dir)
+    on_report = None
+    if save_db:
+        # Deferred: the database driver is only needed when persisting
+        from database import db_writer
+
+        writer = db_writer.get_writer()
+        on_report = functools.partial(writer.submit, serial, str(run_dir))
+
+    with tracing.session() as tracer, metrics.session() as registry:
+        profiler = None
+        if profile:
+            profiler = profiling.StageProfiler(run_dir / "profile")
+            tracer.add_stage_hook(profiler)
+        try:
+            with tracing.span("analyze_device", serial=serial):
+                return _run_stages(
+                    serial,
+                    run_dir,
+                    raw_dir,
+                    reports_dir,
+                    apks_dir,
+                    artifact_limit,
+                    known_artifacts,
+                    on_report,
+                    previous_reports,
+                )
+        finally:
+            trace_path = tracer.write(run_dir / "trace.json")
+            registry.write(run_dir)
+            if profiler is not None:
+                profiler.finish()
+            log.info(f"Wrote stage trace and metrics to {trace_path.parent}")
+
+
+def _run_stages(
+    serial: str,
+    run_dir: Path,
+    raw_dir: Path,
+    reports_dir: Path,
+    apks_dir: Optional[Path],
+    artifact_limit: int | None,
+    known_artifacts: Optional[Dict[str, List[str]]],
+    on_report: Optional[Callable[[Any], None]] = None,
+    previous_reports: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Optional[DeviceRun]:
+    """Execute the analysis pipeline stages for :func:`analyze_device`.
+
+    ``previous_reports`` is only given in fast inventory mode.
+    """
+
+    # One users/packages listing serves both package analysis and social apps
+    with tracing.span("install_matrix", serial=serial):
+        install_matrix = package_analysis.get_install_matrix(serial, raw_dir=raw_dir)
+
+    kwargs: Dict[str, Any] = {"raw_dir": raw_dir}
+    social_kwargs: Dict[str, Any] = {"raw_dir": raw_dir}
+    if install_matrix:
+        kwargs["install_matrix"] = install_matrix
+        social_kwargs["install_matrix"] = install_matrix
+    if known_artifacts:
+        kwargs["known_artifacts"] = known_artifacts
+    if on_report is not None:
+        kwargs["on_report"] = on_report
+    if previous_reports is not None:
+        kwargs["fast_inventory"] = True
+        kwargs["previous_reports"] = previous_reports
+    with tracing.span("analyze_packages", serial=serial):
+        reports = package_analysis.analyze_packages(serial, **kwargs)
     if not reports:
         print("⚠️  No packages found to analyze")
-        return
+        return None
 
-    social_apps = social_app_finder.find_social_apps(serial, raw_dir=raw_dir)
+    with tracing.span("find_social_apps", serial=serial):
+        social_apps = social_app_finder.find_social_apps(serial, **social_kwargs)
 
-    report_formatter.print_reports(reports, serial, artifact_limit)
+    with tracing.span("print_reports", serial=serial):
+        report_formatter.print_reports(reports, serial, artifact_limit)
 
-    csv_artifacts = save_reports(reports, social_apps, reports_dir)
+    with tracing.span("write_reports", serial=serial) as span_args:
+        csv_artifacts = save_reports(reports, social_apps, reports_dir)
+        csv_artifacts.append(save_results_json(reports, reports_dir))
+        span_args["bytes"] = sum(p.stat().st_size for p in csv_artifacts if p.exists())
 
-    apk_artifacts = pull_apks(serial, reports, apks_dir)
+    with tracing.span("catalog", serial=serial):
+        record_in_catalog(serial, run_dir, reports, social_apps)
+
+    with tracing.span("pull_apks", serial=serial) as span_args:
+        apk_artifacts = pull_apks(serial, reports, apks_dir)
+        span_args["bytes"] = sum(p.stat().st_size for p in apk_artifacts if p.exists())
 
     artifacts = list(csv_artifacts) + list(raw_dir.glob("*")) + apk_artifacts
 
@@ -145,14 +349,12 @@ def analyze_device(
 
     print(f"✅ Static analysis complete for {serial}")
     log.info(f"Static analysis complete for {serial}")
+    return DeviceRun(serial, run_dir, reports, social_apps, artifacts)
 
 
-def analyze_apk_driver(apk_path: str):
-    """Run static APK analysis via apk_analysis module."""
-    print(f"\n📦 Scanning APK at {apk_path}")
-    metadata = apk_analysis.analyze_apk(apk_path)
+def _print_apk_metadata(label: str, metadata: Dict[str, str]) -> None:
     if not metadata:
-        print(f"\n⚠️  No metadata extracted from {apk_path}\n")
+        print(f"\n⚠️  No metadata extracted from {label}\n")
         return
 
     print("Extracted metadata:")
@@ -160,7 +362,35 @@ def analyze_apk_driver(apk_path: str):
     for k, v in metadata.items():
         print(f"{k:15}: {v}")
     print("✅ APK analysis complete")
-    log.info(f"APK analysis complete for {apk_path}")
+    log.info(f"APK analysis complete for {label}")
+
+
+def analyze_apk_driver(apk_path: str):
+    """Run static APK analysis via apk_analysis module."""
+    print(f"\n📦 Scanning APK at {apk_path}")
+    _print_apk_metadata(apk_path, apk_analysis.analyze_apk(apk_path))
+
+
+def analyze_device_apk_driver(serial: str, package: str) -> None:
+    """Analyze ``package``'s base APK on ``serial`` without pulling all of it.
+
+    Only the manifest, resource table and signature files are transferred
+    (see :func:`apk_analysis.analyze_remote_apk`).
+    """
+    print(f"\n📦 Scanning {package} on {serial}")
+    res = run_adb_command(serial, ["shell", "pm", "path", package], log_errors=False)
+    paths = [
+        line.split(":", 1)[1].strip()
+        for line in str(res.get("output", "")).splitlines()
+        if line.startswith("package:")
+    ]
+    if not res.get("success") or not paths:
+        print(f"❌ No APK found for {package}")
+        return
+    remote_path = next((p for p in paths if p.endswith("base.apk")), paths[0])
+    with tempfile.TemporaryDirectory(prefix="apk_triage_") as work_dir:
+        metadata = apk_analysis.analyze_remote_apk(serial, remote_path, work_dir)
+    _print_apk_metadata(f"{package} ({remote_path})", metadata)
 
 
 def list_apk_hashes(serial: str) -> None:
@@ -287,6 +517,17 @@ def static_analysis_menu() -> None:
             return
         analyze_apk_driver(apk_path)
 
+    def _analyze_device_apk():
+        serial = _resolve_serial(None)
+        if not serial:
+            print("❌ No device selected")
+            return
+        pkg = input(theme.header("Enter package name: ")).strip()
+        if not pkg:
+            print("❌ No package name provided")
+            return
+        analyze_device_apk_driver(serial, pkg)
+
     def _scan_package():
         serial = _resolve_serial(None)
         if not serial:
@@ -318,6 +559,7 @@ def static_analysis_menu() -> None:
         "3": ("List device APK hashes", _list_hashes),
         "4": ("Scan package strings", _scan_package),
         "5": ("Find social apps", _find_social),
+        "6": ("Analyze device APK (partial read)", _analyze_device_apk),
     }
 
     menu_utils.show_menu("Static Analysis", options, exit_label="Back")
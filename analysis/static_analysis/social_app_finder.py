@@ -8,7 +8,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 import discovery
 from utils.adb_utils.adb_runner import run_adb_command
@@ -16,6 +16,13 @@ from utils.adb_utils.adb_runner import run_adb_command
 # Curated social app package -> label mapping lives in app_categories.
 from .app_categories import SOCIAL_APP_LABELS as SOCIAL_APPS
 
+if TYPE_CHECKING:
+    from .package_analysis import InstallMatrix
+
+
+# Partitions searched when neither discovery nor ``pm path`` yields a path
+PARTITIONS = ["/data/app", "/system/app", "/vendor/app", "/product/app"]
+
 
 @dataclass
 class SocialApp:
@@ -28,21 +35,70 @@ class SocialApp:
     metadata: Dict[str, str]
 
 
-def find_social_apps(serial: str, apk_csv: str | Path = "apk_list.csv") -> List[SocialApp]:
+def build_partition_index(serial: str, partitions: List[str] = PARTITIONS) -> Dict[str, str]:
+    """Map package names to install directories with one batched listing.
+
+    A single ``ls -d`` covers every partition, including the nested
+    ``/data/app/~~<hash>/<pkg>-<hash>`` layout of Android 11+.  Directories are
+    keyed by their name and by the part before ``-`` (package names never
+    contain one); earlier partitions win when a name appears twice.
+    """
+    globs: List[str] = []
+    for part in partitions:
+        globs.append(f"{part}/*")
+        if part == "/data/app":
+            globs.append(f"{part}/~~*/*")
+    res = run_adb_command(
+        serial, ["shell", f"ls -d {' '.join(globs)} 2>/dev/null"], log_errors=False
+    )
+    index: Dict[str, str] = {}
+    if not res.get("output"):
+        return index
+    # ls may exit non-zero when a glob matches nothing; keep what it listed
+    ranked = {part: rank for rank, part in enumerate(partitions)}
+    entries = []
+    for line in res["output"].splitlines():
+        path = line.strip().rstrip("/")
+        top = next((p for p in partitions if path.startswith(p + "/")), None)
+        name = path.rsplit("/", 1)[-1]
+        if top is None or not name or name.startswith("~~"):
+            continue
+        entries.append((ranked[top], path, name))
+    for _, path, name in sorted(entries, key=lambda e: e[0]):
+        index.setdefault(name, path)
+        index.setdefault(name.split("-", 1)[0], path)
+    return index
+
+
+def find_social_apps(
+    serial: str,
+    apk_csv: str | Path = "apk_list.csv",
+    raw_dir: Path | None = None,
+    install_matrix: InstallMatrix | None = None,
+) -> List[SocialApp]:
     """Identify installed social apps on the device identified by ``serial``.
 
     Attempts to load package data from discovery CSV first, then falls back to
-    ADB enumeration if necessary.
+    ADB enumeration if necessary.  If ``raw_dir`` is provided, the detected
+    packages and their paths are written to ``raw_dir / 'social_packages.txt'``.
+    With an ``install_matrix`` (see :func:`package_analysis.get_install_matrix`)
+    packages installed only for secondary users or work profiles are found
+    too, and each app's ``metadata["users"]`` lists the user ids holding it.
     """
 
     print(f"\n🔎 Searching for social apps on {serial}")
     packages, source = discovery.list_packages(serial, apk_csv)
+    if install_matrix:
+        for pkg, path in install_matrix.paths.items():
+            if not packages.get(pkg):
+                packages[pkg] = path
     source_msg = f"{source} (CSV missing)" if source == "adb" else source
     print(f"  Loaded {len(packages)} package(s) from {source_msg}")
 
     found: List[SocialApp] = []
     unresolved: List[str] = []
-    partitions = ["/data/app", "/system/app", "/vendor/app", "/product/app"]
+    partitions = PARTITIONS
+    partition_index: Optional[Dict[str, str]] = None
 
     for pkg, apk_path in packages.items():
         if pkg not in SOCIAL_APPS:
@@ -62,32 +118,44 @@ def find_social_apps(serial: str, apk_csv: str | Path = "apk_list.csv") -> List[
                     apk_paths.append(adb_path)
                     print(f"    pm path found {adb_path}")
 
-        # If still missing, search common partitions
+        # If still missing, look it up in the partition index (built once)
         if not apk_paths:
             print("    pm path failed; searching common partitions...")
-            for part in partitions:
-                ls_res = run_adb_command(serial, ["ls", part], log_errors=False)
-                if ls_res.get("success") and pkg in ls_res.get("output", ""):
-                    found_path = f"{part}/{pkg}"
-                    apk_paths.append(found_path)
-                    print(f"    found in {found_path}")
-                    break
-                else:
-                    print(f"    not found in {part}")
+            if partition_index is None:
+                partition_index = build_partition_index(serial, partitions)
+            found_path = partition_index.get(pkg)
+            if found_path:
+                apk_paths.append(found_path)
+                print(f"    found in {found_path}")
+            else:
+                print(f"    not found in {', '.join(partitions)}")
 
         if not apk_paths:
             unresolved.append(pkg)
 
+        metadata: Dict[str, str] = {}
+        if install_matrix:
+            users = install_matrix.users_for(pkg)
+            if users:
+                metadata["users"] = ",".join(str(u) for u in users)
+
         found.append(
             SocialApp(
                 package=pkg,
                 app_name=SOCIAL_APPS[pkg],
                 apk_paths=apk_paths,
                 label=None,
-                metadata={},
+                metadata=metadata,
             )
         )
 
+    if raw_dir is not None:
+        lines = [f"{app.package}\t{';'.join(app.apk_paths)}" for app in found]
+        try:
+            (raw_dir / "social_packages.txt").write_text("\n".join(lines))
+        except OSError:
+            pass
+
     # Summary
     if found:
         print(f"Identified {len(found)} social app(s)")
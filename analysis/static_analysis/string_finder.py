@@ -13,29 +13,38 @@ import re
 import shutil
 import subprocess
 import tempfile
+import threading
+import time
 from collections import Counter
 from typing import List, Mapping
 
 import utils.logging_utils.logging_engine as log
 from utils.adb_utils.adb_runner import run_adb_command
+from utils.perf_utils import metrics, tracing
 from .secret_scanner import scan as scan_secrets
 
-# failure tracking
+# failure tracking; batch scans record from several device threads
 _failure_counts: Counter[str] = Counter()
 _failure_details: List[str] = []
+_failure_lock = threading.Lock()
 
 
 def get_failure_counts() -> Mapping[str, int]:
     """Expose current failure counters."""
 
-    return dict(_failure_counts)
+    with _failure_lock:
+        return dict(_failure_counts)
 
 
 def _record_failure(pkg: str, reason: str, detail: str) -> None:
     """Track a failure ``reason`` for ``pkg`` with optional ``detail``."""
 
-    _failure_counts[reason] += 1
-    _failure_details.append(f"{pkg}: {detail}")
+    with _failure_lock:
+        _failure_counts[reason] += 1
+        _failure_details.append(f"{pkg}: {detail}")
+    metrics.registry().counter(
+        "gf_string_finder_failures_total", "APK pull/scan failures by reason"
+    ).inc(reason=reason)
 
 URL_RE = re.compile(r"https?://[^\s'\"]+")
 SECRET_KEYWORDS = ["api_key", "apikey", "api-key", "secret", "token"]
@@ -74,7 +83,13 @@ def _pull_apk(serial: str, package: str) -> str | None:
 
     tmp_dir = tempfile.mkdtemp(prefix="apk_")
     local_path = os.path.join(tmp_dir, f"{package}.apk")
-    pull_res = run_adb_command(serial, ["pull", remote_path, local_path], timeout=60, log_errors=False)
+    with tracing.span("pull_apk", serial=serial, package=package) as span_args:
+        pull_res = run_adb_command(serial, ["pull", remote_path, local_path], timeout=60, log_errors=False)
+        if pull_res.get("success") and os.path.exists(local_path):
+            span_args["bytes"] = os.path.getsize(local_path)
+            metrics.registry().counter("gf_bytes_pulled_total", "Bytes pulled from devices").inc(
+                span_args["bytes"], source="string_finder"
+            )
     if not pull_res.get("success"):
         error = pull_res.get("error", "unknown error").lower()
         if "denied" in error:
@@ -101,7 +116,11 @@ def _run_strings(path: str) -> str | None:
         print("  strings command not available")
         return None
     try:
-        res = subprocess.run(["strings", "-a", path], capture_output=True, text=True, check=True)
+        started = time.perf_counter()
+        with tracing.span("strings") as span_args:
+            res = subprocess.run(["strings", "-a", path], capture_output=True, text=True, check=True)
+            span_args["bytes"] = os.path.getsize(path) if os.path.exists(path) else 0
+        _record_scan_rate(span_args["bytes"], time.perf_counter() - started)
         return res.stdout
     except (subprocess.CalledProcessError, OSError) as exc:
         log.warning(f"strings failed for {path}: {exc}")
@@ -109,6 +128,19 @@ def _run_strings(path: str) -> str | None:
         return None
 
 
+def _record_scan_rate(size: int, elapsed: float) -> None:
+    """Accumulate string-scan throughput metrics."""
+    reg = metrics.registry()
+    scanned = reg.counter("gf_string_scan_bytes_total", "Bytes scanned by strings")
+    seconds = reg.counter("gf_string_scan_seconds_total", "Time spent in strings")
+    scanned.inc(size)
+    seconds.inc(elapsed)
+    if seconds.total():
+        reg.gauge("gf_string_scan_mb_per_second", "String-scan throughput").set(
+            scanned.total() / seconds.total() / 1_000_000
+        )
+
+
 def find_artifacts(serial: str, package: str) -> List[str]:
     """Pull ``package`` from ``serial`` and scan for potential secrets.
 
@@ -116,6 +148,11 @@ def find_artifacts(serial: str, package: str) -> List[str]:
     The list may include URLs or lines containing common secret keywords.
     """
 
+    with tracing.span("find_artifacts", serial=serial, package=package):
+        return _find_artifacts(serial, package)
+
+
+def _find_artifacts(serial: str, package: str) -> List[str]:
     apk_path = _pull_apk(serial, package)
     if not apk_path:
         return []
@@ -144,16 +181,18 @@ def find_artifacts(serial: str, package: str) -> List[str]:
 def print_failure_summary(debug: bool = False) -> None:
     """Print and reset collected failure information."""
 
-    if not _failure_counts:
+    with _failure_lock:
+        counts = dict(_failure_counts)
+        details = list(_failure_details)
+        _failure_counts.clear()
+        _failure_details.clear()
+    if not counts:
         return
 
     log.info("\nFailure Summary")
     log.info("---------------")
-    for reason, count in _failure_counts.items():
+    for reason, count in counts.items():
         log.info(f" - {reason}: {count}")
-    if debug and _failure_details:
-        for detail in _failure_details:
+    if debug and details:
+        for detail in details:
             log.debug(f"   {detail}")
-
-    _failure_counts.clear()
-    _failure_details.clear()
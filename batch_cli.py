@@ -0,0 +1,497 @@
+"""Non-interactive subcommands for running analysis from schedulers.
+
+``main.py`` registers the subcommands defined here so that static analysis,
+hashing, string scanning, social app detection and dynamic capture can be
+driven from cron or job schedulers without a TTY.  Every subcommand accepts a
+common set of options:
+
+``--devices``
+    Comma-separated serials, or ``all`` (default) for every connected device
+    in the ``device`` state.
+``--jobs``
+    Number of devices processed concurrently.
+``--output-format``
+    ``json`` (default), ``jsonl`` or ``csv``.
+
+The ``catalog`` and ``search`` subcommands instead query the local run
+catalog and artifact index (``<output-dir>/catalog.sqlite``) and need no
+connected device.
+
+Human-oriented progress output is redirected to stderr while a subcommand
+runs so that stdout (or ``--output``) carries only machine-readable results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+import utils.logging_utils.logging_engine as log
+from utils.adb_utils.adb_devices import get_connected_devices
+
+
+OUTPUT_FORMATS = ("json", "jsonl", "csv")
+
+Row = Dict[str, Any]
+
+
+@dataclass
+class DeviceResult:
+    """Rows produced by a subcommand for one device."""
+
+    serial: str
+    ok: bool = True
+    error: str = ""
+    rows: List[Row] = field(default_factory=list)
+
+
+# ---------------------------------------------------------------------------
+# Subcommand handlers
+# ---------------------------------------------------------------------------
+
+def _cmd_analyze(serial: str, args: argparse.Namespace) -> List[Row]:
+    from analysis.static_analysis import run_static_analysis
+
+    run = run_static_analysis.analyze_device(
+        serial,
+        artifact_limit=0,
+        base_output_dir=args.output_dir,
+        pull_apk_files=args.pull_apks,
+        incremental=args.incremental,
+        profile=args.profile,
+        save_db=args.save_db,
+        fast_inventory=args.fast_inventory,
+    )
+    if run is None:
+        return []
+
+    rows: List[Row] = []
+    for rep in run.reports:
+        rec = run_static_analysis.report_to_dict(rep)
+        rows.append(
+            {
+                "package": rec.get("name"),
+                "category": rec.get("category"),
+                "risk_score": rec.get("risk_score"),
+                "apk_hash": rec.get("apk_hash") or "",
+                "apk_path": rec.get("apk_path") or "",
+                "artifact_count": len(rec.get("artifacts") or []),
+                "run_dir": str(run.run_dir),
+            }
+        )
+    return rows
+
+
+def _cmd_hash(serial: str, args: argparse.Namespace) -> List[Row]:
+    from analysis.static_analysis import package_analysis
+
+    apk_map = package_analysis.get_installed_apk_paths(serial)
+    if not apk_map:
+        raise RuntimeError(f"No APKs found on {serial}")
+    hashes = package_analysis.compute_apk_hashes(serial, apk_map)
+    return [
+        {"package": pkg, "apk_path": apk_map.get(pkg, ""), "sha256": digest}
+        for pkg, digest in hashes.items()
+    ]
+
+
+def _cmd_scan_strings(serial: str, args: argparse.Namespace) -> List[Row]:
+    from analysis.static_analysis import string_finder
+
+    rows: List[Row] = []
+    for pkg in args.packages:
+        for art in string_finder.find_artifacts(serial, pkg):
+            rows.append({"package": pkg, "artifact": art})
+    # Failure counters are shared by all devices; run() prints one summary
+    return rows
+
+
+def _cmd_social(serial: str, args: argparse.Namespace) -> List[Row]:
+    from analysis.static_analysis import social_app_finder
+
+    apps = social_app_finder.find_social_apps(serial, apk_csv=args.apk_csv)
+    return [
+        {
+            "package": app.package,
+            "app_name": app.app_name,
+            "apk_paths": ";".join(app.apk_paths),
+        }
+        for app in apps
+    ]
+
+
+def _cmd_dynamic(serial: str, args: argparse.Namespace) -> List[Row]:
+    from analysis.dynamic_analysis.run_dynamic_analysis import run_dynamic_analysis
+
+    out_dir = Path(args.output_dir) / serial / "dynamic"
+    paths = run_dynamic_analysis(serial, output_dir=out_dir, duration=args.duration)
+    return [{"artifact": name, "path": str(path)} for name, path in paths.items()]
+
+
+def _query_catalog(args: argparse.Namespace) -> List[Row]:
+    from database.run_catalog import RunCatalog, catalog_path
+
+    path = Path(args.db) if args.db else catalog_path(args.output_dir)
+    if not path.exists():
+        raise FileNotFoundError(f"No run catalog at {path}")
+    with RunCatalog(path) as catalog:
+        if args.runs:
+            return catalog.list_runs(serial=args.serial)
+        return catalog.find_packages(
+            package=args.package,
+            sha256=args.sha256,
+            serial=args.serial,
+            since=args.since,
+            until=args.until,
+            limit=args.limit,
+        )
+
+
+def _query_search(args: argparse.Namespace) -> List[Row]:
+    from database import artifact_index
+    from database.run_catalog import catalog_path
+
+    path = Path(args.db) if args.db else catalog_path(args.output_dir)
+    if args.reindex:
+        added = artifact_index.index_results_tree(args.output_dir, path)
+        log.info(f"Indexed {added} new artifact(s) from {args.output_dir} into {path}")
+    elif not path.exists():
+        raise FileNotFoundError(f"No artifact index at {path}")
+    with artifact_index.ArtifactIndex(path) as index:
+        return index.search(args.term, prefix=args.prefix, limit=args.limit)
+
+
+HANDLERS: Dict[str, Callable[[str, argparse.Namespace], List[Row]]] = {
+    "analyze": _cmd_analyze,
+    "hash": _cmd_hash,
+    "scan-strings": _cmd_scan_strings,
+    "social": _cmd_social,
+    "dynamic": _cmd_dynamic,
+}
+
+# Subcommands that run once rather than per device
+QUERY_HANDLERS: Dict[str, Callable[[argparse.Namespace], List[Row]]] = {
+    "catalog": _query_catalog,
+    "search": _query_search,
+}
+
+
+# ---------------------------------------------------------------------------
+# Argument parsing
+# ---------------------------------------------------------------------------
+
+def _positive_int(value: str) -> int:
+    num = int(value)
+    if num < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return num
+
+
+def register_subcommands(parser: argparse.ArgumentParser) -> None:
+    """Attach the headless subcommands to ``parser``."""
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="Format of the results written to --output",
+    )
+    output.add_argument(
+        "--output",
+        default="-",
+        help="File to write results to ('-' for stdout)",
+    )
+    output.add_argument(
+        "--output-dir",
+        default="output",
+        help="Base directory for run artefacts",
+    )
+
+    common = argparse.ArgumentParser(add_help=False, parents=[output])
+    common.add_argument(
+        "--devices",
+        default="all",
+        help="Comma-separated device serials, or 'all' for every connected device",
+    )
+    common.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=1,
+        help="Number of devices to process concurrently",
+    )
+
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    analyze = sub.add_parser(
+        "analyze", parents=[common], help="Run full static analysis on devices"
+    )
+    analyze.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse results from the previous run for unchanged APKs",
+    )
+    analyze.add_argument(
+        "--pull-apks",
+        action="store_true",
+        help="Pull analyzed APKs into the run directory",
+    )
+    analyze.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each stage with cProfile/tracemalloc into <run>/profile",
+    )
+    analyze.add_argument(
+        "--save-db",
+        action="store_true",
+        help="Also persist the results to the configured MySQL database",
+    )
+    analyze.add_argument(
+        "--fast-inventory",
+        action="store_true",
+        help="Enumerate with 'cmd package list' and dump only new or changed packages",
+    )
+
+    sub.add_parser("hash", parents=[common], help="List SHA-256 hashes of installed APKs")
+
+    scan = sub.add_parser(
+        "scan-strings", parents=[common], help="Scan packages for string artifacts"
+    )
+    scan.add_argument(
+        "--package",
+        dest="packages",
+        action="append",
+        required=True,
+        help="Package to scan; may be repeated",
+    )
+
+    social = sub.add_parser("social", parents=[common], help="Detect installed social apps")
+    social.add_argument(
+        "--apk-csv",
+        default="apk_list.csv",
+        help="Inventory CSV used for discovery before falling back to adb",
+    )
+
+    dynamic = sub.add_parser(
+        "dynamic", parents=[common], help="Capture logcat and activity state"
+    )
+    dynamic.add_argument(
+        "-d",
+        "--duration",
+        type=int,
+        default=15,
+        help="Maximum seconds to allow each adb command to run",
+    )
+
+    catalog = sub.add_parser(
+        "catalog", parents=[output], help="Query the local run catalog"
+    )
+    catalog.add_argument("--db", help="Catalog file (default: <output-dir>/catalog.sqlite)")
+    catalog.add_argument("--package", help="Package name; a trailing '*' matches a prefix")
+    catalog.add_argument("--sha256", help="APK SHA-256 hash")
+    catalog.add_argument("--serial", help="Device serial")
+    catalog.add_argument("--since", help="Only runs started at or after this ISO date")
+    catalog.add_argument("--until", help="Only runs started before this ISO date")
+    catalog.add_argument("--limit", type=_positive_int, help="Maximum rows to return")
+    catalog.add_argument(
+        "--runs", action="store_true", help="List recorded runs instead of packages"
+    )
+
+    search = sub.add_parser(
+        "search", parents=[output], help="Search string artifacts across all runs"
+    )
+    search.add_argument("term", help="Domain, URL fragment or token to look for")
+    search.add_argument("--db", help="Index file (default: <output-dir>/catalog.sqlite)")
+    search.add_argument(
+        "--prefix", action="store_true", help="Treat the last token of TERM as a prefix"
+    )
+    search.add_argument("--limit", type=_positive_int, default=50, help="Maximum rows to return")
+    search.add_argument(
+        "--reindex",
+        action="store_true",
+        help="First index results.json files of earlier runs under the output directory",
+    )
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+def resolve_devices(spec: str) -> List[str]:
+    """Return the serials selected by a ``--devices`` value."""
+
+    connected = [d.serial for d in get_connected_devices() if d.state == "device"]
+    if not spec or spec.lower() == "all":
+        return connected
+
+    requested = [s.strip() for s in spec.split(",") if s.strip()]
+    missing = [s for s in requested if s not in connected]
+    for serial in missing:
+        log.warning(f"Requested device {serial} is not connected")
+    return [s for s in requested if s in connected]
+
+
+def _run_one(command: str, serial: str, args: argparse.Namespace) -> DeviceResult:
+    try:
+        rows = HANDLERS[command](serial, args)
+    except Exception as exc:
+        log.error(f"{command} failed for {serial}: {exc}")
+        return DeviceResult(serial, ok=False, error=str(exc))
+    return DeviceResult(serial, rows=rows)
+
+
+def execute(command: str, serials: List[str], args: argparse.Namespace) -> List[DeviceResult]:
+    """Run ``command`` for each serial using up to ``args.jobs`` workers."""
+
+    if args.jobs <= 1 or len(serials) <= 1:
+        return [_run_one(command, serial, args) for serial in serials]
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        return list(pool.map(lambda s: _run_one(command, s, args), serials))
+
+
+def emit_results(
+    command: str, results: List[DeviceResult], fmt: str, stream: TextIO
+) -> None:
+    """Write ``results`` to ``stream`` in the requested format."""
+
+    if fmt == "json":
+        payload = {
+            "command": command,
+            "devices": [
+                {"serial": r.serial, "ok": r.ok, "error": r.error, "rows": r.rows}
+                for r in results
+            ],
+        }
+        json.dump(payload, stream, indent=2)
+        stream.write("\n")
+        return
+
+    flat = [dict({"serial": r.serial}, **row) for r in results for row in r.rows]
+    if fmt == "jsonl":
+        for row in flat:
+            stream.write(json.dumps(row) + "\n")
+        for r in results:
+            if not r.ok:
+                stream.write(json.dumps({"serial": r.serial, "error": r.error}) + "\n")
+        return
+
+    _write_csv(flat, stream, default_field="serial")
+
+
+def emit_rows(rows: List[Row], fmt: str, stream: TextIO) -> None:
+    """Write plain ``rows`` (not grouped by device) in the requested format."""
+
+    if fmt == "json":
+        json.dump(rows, stream, indent=2)
+        stream.write("\n")
+    elif fmt == "jsonl":
+        for row in rows:
+            stream.write(json.dumps(row) + "\n")
+    else:
+        _write_csv(rows, stream)
+
+
+def _write_csv(rows: List[Row], stream: TextIO, default_field: str = "") -> None:
+    fieldnames: List[str] = []
+    for row in rows:
+        for key in row:
+            if key not in fieldnames:
+                fieldnames.append(key)
+    if not fieldnames and default_field:
+        fieldnames = [default_field]
+    writer = csv.DictWriter(stream, fieldnames=fieldnames, lineterminator="\n")
+    if fieldnames:
+        writer.writeheader()
+    writer.writerows(rows)
+
+
+@contextlib.contextmanager
+def _output_stream(target: str, stdout: TextIO):
+    if target == "-":
+        yield stdout
+        return
+    out_path = Path(target)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8", newline="") as fh:
+        yield fh
+
+
+def _run_query(args: argparse.Namespace, stdout: TextIO) -> int:
+    try:
+        rows = QUERY_HANDLERS[args.command](args)
+    except Exception as exc:
+        log.error(f"{args.command} query failed: {exc}")
+        print(f"❌ {exc}", file=sys.stderr)
+        return 1
+    with _output_stream(args.output, stdout) as stream:
+        emit_rows(rows, args.output_format, stream)
+    return 0
+
+
+def _drain_db_writer() -> None:
+    # Only loaded when a handler persisted results; avoids importing the driver
+    writer_mod = sys.modules.get("database.db_writer")
+    if writer_mod is not None:
+        writer_mod.drain()
+
+
+def _print_failure_summary() -> None:
+    # One summary for all devices rather than one per worker thread
+    finder = sys.modules.get("analysis.static_analysis.string_finder")
+    if finder is not None:
+        finder.print_failure_summary()
+
+
+def run(args: argparse.Namespace, stdout: Optional[TextIO] = None) -> int:
+    """Execute the subcommand selected in ``args`` and return an exit code.
+
+    Exit codes: ``0`` on success, ``1`` if any device (or a query) failed
+    and ``2`` when no devices could be selected.
+    """
+
+    stdout = stdout or sys.stdout
+    command = args.command
+    if command in QUERY_HANDLERS:
+        return _run_query(args, stdout)
+    log.info(f"Headless command '{command}' requested for devices={args.devices}")
+
+    with contextlib.redirect_stdout(sys.stderr):
+        serials = resolve_devices(args.devices)
+        if not serials:
+            print("No matching connected devices")
+            results: List[DeviceResult] = []
+        else:
+            try:
+                results = execute(command, serials, args)
+            finally:
+                # Also on Ctrl+C, so rows queued by --save-db are not lost
+                _drain_db_writer()
+        _print_failure_summary()
+
+    with _output_stream(args.output, stdout) as stream:
+        emit_results(command, results, args.output_format, stream)
+
+    if not serials:
+        return 2
+    return 0 if all(r.ok for r in results) else 1
+
+
+__all__ = [
+    "DeviceResult",
+    "HANDLERS",
+    "OUTPUT_FORMATS",
+    "QUERY_HANDLERS",
+    "emit_results",
+    "emit_rows",
+    "execute",
+    "register_subcommands",
+    "resolve_devices",
+    "run",
+]
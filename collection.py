@@ -5,7 +5,15 @@ The script reads a list of package names and, when the ``--pull`` flag is
 provided, attempts to locate and download their base and split APKs.  Each
 pulled APK is hashed (SHA-256) and recorded in ``reports/pulled_apks.csv``;
 per-package hash digests are also saved alongside the APKs in
-``apks/<PACKAGE>/<PACKAGE>.sha256.txt``.
+``apks/<PACKAGE>/<PACKAGE>.sha256.txt``.  Splits are pulled concurrently
+(``--jobs``) and tracked in ``reports/pulled_apks.manifest.json`` so an
+interrupted collection resumes where it stopped.
+
+``--harvest`` replaces ``scripts/andro_apk_harvester.sh``: APKs are hashed
+(SHA-256, SHA-1 and MD5) as they stream off the device, so each file is read
+once, version and installer metadata for every package comes from one batched
+``dumpsys package`` call, and each record is streamed to
+``reports/apks_report_<timestamp>.csv`` and ``.json`` as soon as it is ready.
 
 Permission errors while pulling or hashing are handled gracefully and logged
 so processing of other packages continues.
@@ -16,11 +24,32 @@ from __future__ import annotations
 import argparse
 import csv
 import hashlib
+import json
+import os
+import shlex
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import IO, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import utils.logging_utils.logging_engine as log
-from utils.adb_utils.adb_runner import run_adb_command
+from utils.adb_utils.adb_runner import run_adb_command, stream_adb_command
+from utils.adb_utils.remote_zip import RemoteZipError, remote_size
+
+# Packages harvested when none are given (the shell harvester's defaults)
+DEFAULT_HARVEST_PACKAGES = [
+    "com.zhiliaoapp.musically",  # TikTok
+    "com.facebook.katana",  # Facebook
+    "com.facebook.orca",  # Messenger
+    "com.snapchat.android",  # Snapchat
+]
+
+# Read size for hashing pulled files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_SYSTEM_PREFIXES = ("/system/", "/system_ext/", "/product/", "/vendor/", "/apex/")
 
 
 # ---------------------------------------------------------------------------
@@ -54,46 +83,439 @@ def list_apk_paths(serial: str | None, package: str) -> List[str]:
     return paths
 
 
-def pull_apks(
-    serial: str | None, package: str, paths: Iterable[str]
+def stream_pull(
+    serial: str | None,
+    remote: str,
+    local_file: Path,
+    algorithms: Sequence[str] = ("sha256",),
+    label: str = "",
+) -> Optional[Dict[str, str | int]]:
+    """Copy ``remote`` to ``local_file`` while hashing it, in one pass.
+
+    The file is streamed through ``adb exec-out cat`` so memory use stays at
+    one chunk and every byte is hashed on its way to disk.  ``exec-out``
+    does not report ``cat``'s exit status, so the streamed byte count must
+    match the remote file size; otherwise (size unknown, short or empty
+    stream, no ``exec-out`` support) ``adb pull`` plus :func:`hash_file` is
+    used instead.  Returns the hex digests named by ``algorithms`` and
+    ``size``, or ``None`` when the file could not be pulled.
+    """
+    try:
+        expected: Optional[int] = remote_size(serial, remote)
+    except RemoteZipError as exc:
+        log.debug(f"Cannot verify streamed size of {remote}: {exc}")
+        expected = None
+
+    res: Dict[str, object] = {"error": "remote size unknown"}
+    if expected:
+        hashers = {name: hashlib.new(name) for name in algorithms}
+        with local_file.open("wb") as out:
+
+            def consume(chunk: bytes) -> None:
+                out.write(chunk)
+                for h in hashers.values():
+                    h.update(chunk)
+
+            res = stream_adb_command(
+                serial,
+                ["exec-out", f"cat {shlex.quote(remote)} 2>/dev/null"],
+                consume,
+                log_errors=False,
+            )
+        if res.get("success") and res.get("bytes") == expected:
+            result: Dict[str, str | int] = {name: h.hexdigest() for name, h in hashers.items()}
+            result["size"] = expected
+            return result
+        if res.get("success"):
+            res["error"] = f"streamed {res.get('bytes')} of {expected} bytes"
+
+    log.debug(f"Streaming {remote} failed ({res.get('error') or 'no data'}); using adb pull")
+    res = run_adb_command(serial, ["pull", remote, str(local_file)], timeout=60)
+    if not res.get("success", False):
+        msg = res.get("error", "") or res.get("output", "")
+        if "Permission denied" in msg:
+            log.warning(f"Permission denied pulling {remote} for {label or remote}")
+        else:
+            log.warning(f"Failed to pull {remote} for {label or remote} :: {msg}")
+        local_file.unlink(missing_ok=True)
+        return None
+    digests = hash_file(local_file)
+    return {name: digests[name] for name in (*algorithms, "size")}
+
+
+class CollectionManifest:
+    """Resumable record of verified APK pulls, kept as JSON on disk.
+
+    Entries are keyed by ``<package>/<split file name>`` and hold the
+    remote path, local path, size and SHA-256 of a completed pull.  The file
+    is rewritten atomically after every update so an interrupted run loses
+    at most the split in flight.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, str | int]] = {}
+        try:
+            doc = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as exc:
+            log.warning(f"Ignoring unreadable manifest {self.path}: {exc}")
+            return
+        if isinstance(doc, dict) and isinstance(doc.get("entries"), dict):
+            self.entries = doc["entries"]
+
+    @staticmethod
+    def key(package: str, local_file: Path) -> str:
+        return f"{package}/{local_file.name}"
+
+    def verified(self, package: str, local_file: Path) -> Optional[Dict[str, str | int]]:
+        """Return the entry for ``local_file`` if the file on disk still matches it."""
+        entry = self.entries.get(self.key(package, local_file))
+        if not entry:
+            return None
+        try:
+            if local_file.stat().st_size != entry.get("size"):
+                return None
+            if hash_file(local_file)["sha256"] != entry.get("sha256"):
+                return None
+        except OSError:
+            return None
+        return entry
+
+    def record(self, package: str, remote: str, local_file: Path, size: int, sha256: str) -> Dict[str, str | int]:
+        entry: Dict[str, str | int] = {
+            "package": package,
+            "split": local_file.name,
+            "remote": remote,
+            "local": str(local_file),
+            "size": size,
+            "sha256": sha256,
+        }
+        with self._lock:
+            self.entries[self.key(package, local_file)] = entry
+            self._save()
+        return entry
+
+    def forget(self, package: str, local_file: Path) -> None:
+        """Drop the entry for ``local_file`` (e.g. after a failed re-pull)."""
+        with self._lock:
+            if self.entries.pop(self.key(package, local_file), None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": self.VERSION, "entries": self.entries}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+    def records(self) -> List[Tuple[str, str, str]]:
+        """Return ``(package, local_path, sha256)`` rows sorted by package and path.
+
+        Entries whose local file is gone or has the wrong size are left out.
+        """
+        rows = []
+        for e in self.entries.values():
+            try:
+                if Path(str(e["local"])).stat().st_size != e.get("size"):
+                    continue
+            except OSError:
+                continue
+            rows.append((str(e["package"]), str(e["local"]), str(e["sha256"])))
+        return sorted(rows)
+
+
+def collect(
+    serial: str | None,
+    packages: Sequence[str],
+    jobs: int = 4,
+    out_dir: str | Path = "apks",
+    reports_dir: str | Path = "reports",
 ) -> List[Tuple[str, str, str]]:
-    """Pull APKs for ``package`` and compute hashes.
+    """Pull every split of ``packages`` with up to ``jobs`` concurrent transfers.
 
-    Returns a list of ``(package, local_path, sha256)`` tuples for successfully
-    pulled files.
+    Progress is tracked in ``reports/pulled_apks.manifest.json``; splits
+    whose local copy still matches the manifest's size and SHA-256 are
+    skipped, so a rerun only fetches what is missing or corrupt.
+    ``reports/pulled_apks.csv`` and each package's hash file are regenerated
+    from the manifest, so repeated runs do not duplicate rows.
     """
-    records: List[Tuple[str, str, str]] = []
-    out_dir = Path("apks") / package
-    out_dir.mkdir(parents=True, exist_ok=True)
-    hash_path = out_dir / f"{package}.sha256.txt"
-
-    for remote in paths:
-        local_file = out_dir / Path(remote).name
-        res = run_adb_command(serial, ["pull", remote, str(local_file)], timeout=60)
-        if not res.get("success", False):
-            err = res.get("error", "")
-            out = res.get("output", "")
-            msg = err or out
-            if "Permission denied" in msg:
-                log.warning(f"Permission denied pulling {remote} for {package}")
-            else:
-                log.warning(f"Failed to pull {remote} for {package} :: {msg}")
-            continue
+    out_dir = Path(out_dir)
+    reports_dir = Path(reports_dir)
+    manifest = CollectionManifest(reports_dir / "pulled_apks.manifest.json")
+    jobs = max(1, jobs)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        path_lists = list(pool.map(lambda pkg: list_apk_paths(serial, pkg), packages))
+
+        splits: List[Tuple[str, str, Path]] = []
+        for pkg, paths in zip(packages, path_lists):
+            if not paths:
+                log.warning(f"No APK paths found for {pkg}")
+                continue
+            (out_dir / pkg).mkdir(parents=True, exist_ok=True)
+            splits.extend((pkg, remote, out_dir / pkg / Path(remote).name) for remote in paths)
+
+        def fetch(split: Tuple[str, str, Path]) -> bool:
+            pkg, remote, local_file = split
+            if manifest.verified(pkg, local_file):
+                log.debug(f"Skipping verified {local_file}")
+                return False
+            try:
+                digests = stream_pull(serial, remote, local_file, label=pkg)
+            except PermissionError as exc:
+                log.warning(f"Permission error writing {local_file}: {exc}")
+                manifest.forget(pkg, local_file)
+                return False
+            if digests is None:
+                manifest.forget(pkg, local_file)
+                return False
+            manifest.record(pkg, remote, local_file, int(digests["size"]), str(digests["sha256"]))
+            return True
+
+        pulled = sum(pool.map(fetch, splits))
 
+    records = manifest.records()
+    print(f"Pulled {pulled} APK file(s); {len(splits) - pulled} already verified or failed")
+    _write_hash_files(out_dir, records)
+    _write_pulled_csv(reports_dir / "pulled_apks.csv", records)
+    return records
+
+
+def _write_hash_files(out_dir: Path, records: Iterable[Tuple[str, str, str]]) -> None:
+    """Write ``<package>.sha256.txt`` once per package from ``records``."""
+    by_package: Dict[str, List[Tuple[str, str]]] = {}
+    for pkg, local, digest in records:
+        by_package.setdefault(pkg, []).append((digest, Path(local).name))
+    for pkg, lines in by_package.items():
+        hash_path = out_dir / pkg / f"{pkg}.sha256.txt"
         try:
-            digest = hashlib.sha256(local_file.read_bytes()).hexdigest()
-        except PermissionError as exc:
-            log.warning(f"Permission error hashing {local_file}: {exc}")
+            hash_path.write_text("".join(f"{digest}  {name}\n" for digest, name in lines))
+        except OSError as exc:
+            log.warning(f"Permission error writing hash file for {pkg}: {exc}")
+
+
+def _write_pulled_csv(csv_path: Path, records: Iterable[Tuple[str, str, str]]) -> None:
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with csv_path.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["package", "apk_path", "sha256"])
+            writer.writerows(records)
+    except PermissionError as exc:
+        log.warning(f"Permission error writing {csv_path}: {exc}")
+
+
+def hash_file(path: str | Path, chunk_size: int = HASH_CHUNK_SIZE) -> Dict[str, str | int]:
+    """Return SHA-256, SHA-1, MD5 and size of ``path`` from a single read."""
+    digests = {"sha256": hashlib.sha256(), "sha1": hashlib.sha1(), "md5": hashlib.md5()}
+    size = 0
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    with Path(path).open("rb") as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            chunk = view[:n]
+            for h in digests.values():
+                h.update(chunk)
+            size += n
+    result: Dict[str, str | int] = {name: h.hexdigest() for name, h in digests.items()}
+    result["size"] = size
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Harvesting
+# ---------------------------------------------------------------------------
+
+@dataclass
+class PackageMeta:
+    """Version and installer details parsed from ``dumpsys package``."""
+
+    version: str = "unknown"
+    version_code: str = "unknown"
+    target_sdk: str = "unknown"
+    installer: str = "unknown"
+
+
+@dataclass
+class HarvestRecord:
+    """One pulled APK file with its digests and package metadata."""
+
+    package: str
+    file: str
+    sha256: str
+    sha1: str
+    md5: str
+    size: int
+    version: str
+    versionCode: str
+    targetSdk: str
+    installer: str
+    installType: str
+
+
+HARVEST_FIELDS = list(HarvestRecord.__dataclass_fields__)
+
+
+def parse_dumpsys_packages(output: str) -> Dict[str, PackageMeta]:
+    """Parse ``Package [<name>]`` sections of ``dumpsys package`` output.
+
+    The first value seen for each field wins, so entries from a hidden
+    system package section do not override the active install.
+    """
+    meta: Dict[str, PackageMeta] = {}
+    current: Optional[PackageMeta] = None
+    for raw_line in output.splitlines():
+        line = raw_line.strip()
+        if line.startswith("Package ["):
+            end = line.find("]")
+            name = line[len("Package [") : end] if end != -1 else ""
+            current = meta.setdefault(name, PackageMeta()) if name else None
             continue
+        if current is None:
+            continue
+        if raw_line[:1] not in (" ", "\t"):
+            current = None
+            continue
+        for token in line.split():
+            key, sep, value = token.partition("=")
+            if not sep or not value:
+                continue
+            if key == "versionName" and current.version == "unknown":
+                current.version = value
+            elif key == "versionCode" and current.version_code == "unknown":
+                current.version_code = value
+            elif key == "targetSdk" and current.target_sdk == "unknown":
+                current.target_sdk = value
+            elif key == "installerPackageName" and current.installer == "unknown":
+                if value != "null":
+                    current.installer = value
+    return meta
 
-        try:
-            with hash_path.open("a") as hf:
-                hf.write(f"{digest}  {local_file.name}\n")
-        except PermissionError as exc:
-            log.warning(f"Permission error writing hash file for {package}: {exc}")
 
-        records.append((package, str(local_file), digest))
+def get_package_metadata(serial: str | None, packages: Sequence[str]) -> Dict[str, PackageMeta]:
+    """Fetch metadata for ``packages`` with a single adb round-trip."""
+    if not packages:
+        return {}
+    script = "; ".join(f"dumpsys package {shlex.quote(pkg)}" for pkg in packages)
+    result = run_adb_command(serial, ["shell", script], timeout=60)
+    if not result.get("success", False):
+        log.warning(f"Failed to fetch package metadata :: {result.get('error', 'no error')}")
+        return {}
+    return parse_dumpsys_packages(str(result.get("output", "")))
+
+
+def install_type(remote_path: str) -> str:
+    """Classify an on-device APK path as a ``system`` or ``user`` install."""
+    return "system" if remote_path.startswith(_SYSTEM_PREFIXES) else "user"
+
+
+class HarvestReportWriter:
+    """Stream :class:`HarvestRecord` rows to a CSV and a JSON array."""
+
+    def __init__(self, csv_path: Path, json_path: Path) -> None:
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        self.csv_path = csv_path
+        self.json_path = json_path
+        self.count = 0
+        self._csv_file: IO[str] = csv_path.open("w", newline="", encoding="utf-8")
+        self._json_file: IO[str] = json_path.open("w", encoding="utf-8")
+        self._csv = csv.DictWriter(self._csv_file, fieldnames=HARVEST_FIELDS)
+        self._csv.writeheader()
+        self._json_file.write("[")
+
+    def write(self, record: HarvestRecord) -> None:
+        row = asdict(record)
+        self._csv.writerow(row)
+        self._json_file.write(("," if self.count else "") + "\n  " + json.dumps(row))
+        self.count += 1
+
+    def close(self) -> None:
+        self._json_file.write("\n]\n" if self.count else "]\n")
+        self._csv_file.close()
+        self._json_file.close()
 
+    def __enter__(self) -> "HarvestReportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+
+def _harvest_record(
+    package: str, remote: str, local_file: Path, digests: Dict[str, str | int], meta: PackageMeta
+) -> HarvestRecord:
+    return HarvestRecord(
+        package=package,
+        file=str(local_file),
+        sha256=str(digests["sha256"]),
+        sha1=str(digests["sha1"]),
+        md5=str(digests["md5"]),
+        size=int(digests["size"]),
+        version=meta.version,
+        versionCode=meta.version_code,
+        targetSdk=meta.target_sdk,
+        installer=meta.installer,
+        installType=install_type(remote),
+    )
+
+
+def harvest(
+    serial: str | None,
+    packages: Sequence[str],
+    out_dir: str | Path = "apks",
+    reports_dir: str | Path = "reports",
+) -> List[HarvestRecord]:
+    """Pull, hash and describe the APKs of ``packages``.
+
+    Each APK is hashed while it is pulled (see :func:`stream_pull`), so no
+    file is read back from disk, and its record is written to the CSV/JSON
+    reports straight away.
+    """
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    reports_dir = Path(reports_dir)
+    writer = HarvestReportWriter(
+        reports_dir / f"apks_report_{stamp}.csv", reports_dir / f"apks_report_{stamp}.json"
+    )
+    metadata = get_package_metadata(serial, packages)
+    records: List[HarvestRecord] = []
+
+    with writer:
+        for pkg in packages:
+            paths = list_apk_paths(serial, pkg)
+            if not paths:
+                print(f"  {pkg}: not installed")
+                continue
+            pkg_dir = Path(out_dir) / pkg
+            pkg_dir.mkdir(parents=True, exist_ok=True)
+            meta = metadata.get(pkg, PackageMeta())
+            for remote in paths:
+                local_file = pkg_dir / Path(remote).name
+                try:
+                    digests = stream_pull(
+                        serial, remote, local_file, algorithms=("sha256", "sha1", "md5"), label=pkg
+                    )
+                except OSError as exc:
+                    log.warning(f"Failed to write {local_file}: {exc}")
+                    digests = None
+                if digests is None:
+                    print(f"  {pkg}: failed to pull {remote}")
+                    continue
+                rec = _harvest_record(pkg, remote, local_file, digests, meta)
+                writer.write(rec)
+                records.append(rec)
+
+    print(f"Harvested {len(records)} APK file(s); reports: {writer.csv_path}, {writer.json_path}")
     return records
 
 
@@ -112,37 +534,38 @@ def main(argv: List[str] | None = None) -> int:
         action="store_true",
         help="Pull APKs and compute SHA-256 hashes",
     )
+    parser.add_argument(
+        "--harvest",
+        action="store_true",
+        help="Pull APKs and write SHA-256/SHA-1/MD5 and version metadata reports",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=4,
+        help="Concurrent pulls when collecting with --pull (default: 4)",
+    )
     args = parser.parse_args(argv)
 
+    if args.harvest:
+        harvest(args.serial, args.packages or DEFAULT_HARVEST_PACKAGES)
+        return 0
+
     if not args.packages:
         log.info("No packages specified; nothing to do")
         return 0
 
-    all_records: List[Tuple[str, str, str]] = []
+    if args.pull:
+        collect(args.serial, args.packages, jobs=args.jobs)
+        return 0
+
     for pkg in args.packages:
         paths = list_apk_paths(args.serial, pkg)
         if not paths:
             log.warning(f"No APK paths found for {pkg}")
             continue
-        if args.pull:
-            all_records.extend(pull_apks(args.serial, pkg, paths))
-        else:
-            for p in paths:
-                print(f"{pkg}: {p}")
-
-    if args.pull and all_records:
-        reports_dir = Path("reports")
-        reports_dir.mkdir(parents=True, exist_ok=True)
-        csv_path = reports_dir / "pulled_apks.csv"
-        write_header = not csv_path.exists()
-        try:
-            with csv_path.open("a", newline="") as f:
-                writer = csv.writer(f)
-                if write_header:
-                    writer.writerow(["package", "apk_path", "sha256"])
-                writer.writerows(all_records)
-        except PermissionError as exc:
-            log.warning(f"Permission error writing {csv_path}: {exc}")
+        for p in paths:
+            print(f"{pkg}: {p}")
 
     return 0
 
@@ -14,3 +14,12 @@ THEME_PALETTE: str = os.getenv("GF_THEME", "cyber")
 # static analysis output. ``None`` shows all artifacts, while ``0`` suppresses
 # artifact display entirely.
 ARTIFACT_LIMIT: int | None = 3
+
+# Minimum level written to ``logs/android_tool.log``. Raising it (e.g. via
+# ``GF_LOG_LEVEL=INFO``) lets debug calls in hot loops short-circuit entirely.
+LOG_FILE_LEVEL: str = os.getenv("GF_LOG_LEVEL", "DEBUG").upper()
+
+# Pipe large text outputs (dumpsys, pm list, logcat) through the device's
+# gzip over ``adb exec-out`` and keep ``raw/`` artefacts compressed.  Off by
+# default; enable with ``GF_ADB_COMPRESS=1`` on slow USB or Wi-Fi links.
+ADB_COMPRESS_OUTPUT: bool = os.getenv("GF_ADB_COMPRESS", "0").lower() in ("1", "true", "yes")
@@ -0,0 +1,205 @@
+"""
+Full-text index of string artifacts across all runs.
+
+Responsibilities:
+- Persist ``string_finder`` artifacts per package and APK hash
+- Index them with SQLite FTS5 for token and prefix search ("which APKs
+  contain this domain or key prefix"), falling back to ``LIKE`` scans when
+  the SQLite build lacks FTS5
+- Index incrementally: an APK hash is only indexed once, however many runs
+  or devices report it
+
+The index shares ``<output>/catalog.sqlite`` with :mod:`database.run_catalog`
+so search hits can be joined to the devices that had the APK installed.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from database.run_catalog import catalog_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apk_artifacts (
+    id INTEGER PRIMARY KEY,
+    apk_key TEXT NOT NULL,
+    package TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    UNIQUE (apk_key, artifact)
+);
+CREATE INDEX IF NOT EXISTS idx_apk_artifacts_package ON apk_artifacts (package);
+
+CREATE TABLE IF NOT EXISTS indexed_apks (
+    sha256 TEXT PRIMARY KEY,
+    package TEXT NOT NULL,
+    artifact_count INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS artifacts_fts USING fts5(
+    artifact, content='apk_artifacts', content_rowid='id'
+)
+"""
+
+
+def _as_dict(obj: Any) -> Dict[str, Any]:
+    return asdict(obj) if is_dataclass(obj) else dict(obj)
+
+
+def _fts_phrase(term: str, prefix: bool) -> str:
+    phrase = '"' + term.replace('"', '""') + '"'
+    return phrase + "*" if prefix else phrase
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class ArtifactIndex:
+    """Connection to the artifact search index."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.execute(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:  # SQLite built without FTS5
+            self.fts = False
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ArtifactIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    # -------------------------
+    # Indexing
+    # -------------------------
+
+    def is_indexed(self, sha256: str) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM indexed_apks WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        return row is not None
+
+    def add(self, package: str, sha256: Optional[str], artifacts: Iterable[str]) -> int:
+        """Index ``artifacts`` for one APK and return how many were new.
+
+        APKs with a hash are recorded as indexed and skipped next time;
+        unhashed packages are keyed by name and merged on every call.
+        """
+        apk_key = sha256 or f"package:{package}"
+        added = 0
+        with self._conn:
+            for art in dict.fromkeys(artifacts):
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO apk_artifacts (apk_key, package, artifact) "
+                    "VALUES (?, ?, ?)",
+                    (apk_key, package, art),
+                )
+                if cur.rowcount:
+                    added += 1
+                    if self.fts:
+                        self._conn.execute(
+                            "INSERT INTO artifacts_fts (rowid, artifact) VALUES (?, ?)",
+                            (cur.lastrowid, art),
+                        )
+            if sha256:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO indexed_apks (sha256, package, artifact_count) "
+                    "VALUES (?, ?, (SELECT COUNT(*) FROM apk_artifacts WHERE apk_key = ?))",
+                    (sha256, package, apk_key),
+                )
+        return added
+
+    def index_reports(self, reports: Iterable[Any]) -> int:
+        """Index the artifacts of ``reports``, skipping already indexed hashes."""
+        added = 0
+        for rep in reports:
+            rec = _as_dict(rep)
+            artifacts = rec.get("artifacts")
+            sha256 = rec.get("apk_hash") or None
+            if artifacts is None or (sha256 and self.is_indexed(sha256)):
+                continue
+            added += self.add(rec["name"], sha256, artifacts)
+        return added
+
+    # -------------------------
+    # Search
+    # -------------------------
+
+    def search(self, term: str, *, prefix: bool = False, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return artifacts matching ``term`` with the devices that had the APK.
+
+        With FTS5, ``term`` is matched as a token phrase (``api.example.com``
+        matches URLs on that host) and ``prefix`` extends the last token;
+        without FTS5 a substring match is used.
+        """
+        if self.fts:
+            where = "a.id IN (SELECT rowid FROM artifacts_fts WHERE artifacts_fts MATCH ?)"
+            param = _fts_phrase(term, prefix)
+        else:
+            where = "a.artifact LIKE ? ESCAPE '\\'"
+            param = _like_pattern(term)
+
+        has_catalog = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'packages'"
+        ).fetchone()
+        devices = (
+            "(SELECT GROUP_CONCAT(DISTINCT r.serial) FROM packages p "
+            "JOIN runs r ON r.id = p.run_id WHERE p.sha256 = a.apk_key)"
+            if has_catalog
+            else "NULL"
+        )
+        sql = (
+            "SELECT CASE WHEN a.apk_key LIKE 'package:%' THEN NULL ELSE a.apk_key END AS sha256, "
+            f"a.package, a.artifact, {devices} AS devices "
+            f"FROM apk_artifacts a WHERE {where} ORDER BY a.package, a.id LIMIT ?"
+        )
+        return [dict(row) for row in self._conn.execute(sql, (param, int(limit)))]
+
+
+def index_run(base_dir: str | Path, reports: Iterable[Any]) -> int:
+    """Incrementally index a finished run's artifacts under ``base_dir``."""
+    with ArtifactIndex(catalog_path(base_dir)) as index:
+        return index.index_reports(reports)
+
+
+def index_results_tree(base_dir: str | Path, index_path: str | Path | None = None) -> int:
+    """Index every ``<serial>/<run>/reports/results.json`` below ``base_dir``.
+
+    Used to backfill history recorded before the index existed; hashes that
+    are already indexed are skipped, so re-running it is cheap.  The index is
+    written to ``index_path``, by default the catalog in ``base_dir``.
+    """
+    base_dir = Path(base_dir)
+    added = 0
+    with ArtifactIndex(index_path or catalog_path(base_dir)) as index:
+        for results in sorted(base_dir.glob("*/*/reports/results.json")):
+            if results.parent.parent.is_symlink():
+                continue
+            try:
+                reports = json.loads(results.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            added += index.index_reports(r for r in reports if isinstance(r, dict) and r.get("name"))
+    return added
+
+
+__all__ = ["ArtifactIndex", "index_results_tree", "index_run"]
@@ -4,6 +4,9 @@ Simplified database core module.
 
 - Supports single or pooled MySQL connections
 - Provides connection lifecycle + ping
+- Skips the checkout ping for connections used within an idle window
+- Pre-warms pooled connections
+- Elastic pool sizing between min/max bounds with instrumentation
 - Context manager for safe usage
 
 Out of scope:
@@ -11,14 +14,63 @@ Out of scope:
 """
 
 from __future__ import annotations
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
-from typing import Optional, Iterator, Any
+from typing import Optional, Iterator, Any, Dict, List, Tuple
 
 import mysql.connector
 from mysql.connector import Error
-from mysql.connector.pooling import MySQLConnectionPool
 
 from database.db_config import DB_CONFIG
+from utils.perf_utils import metrics
+
+# Connections used more recently than this are trusted without a ping
+PING_IDLE_SECONDS = 30.0
+
+
+def raw_connection(conn: Any) -> Any:
+    """Return the driver connection behind a pooled wrapper (or ``conn``)."""
+    return getattr(conn, "_cnx", None) or conn
+
+
+class _IdleTracker:
+    """Remember when each connection was last used to elide liveness pings.
+
+    Also records the autocommit mode last applied so pooled checkouts only
+    issue ``SET autocommit`` when it actually changes.
+    """
+
+    def __init__(self, idle_seconds: float) -> None:
+        self.idle_seconds = idle_seconds
+        self._last_used: Dict[int, float] = {}
+        self._autocommit: Dict[int, bool] = {}
+        self._lock = threading.Lock()
+
+    def apply_autocommit(self, conn: Any, value: bool) -> None:
+        key = id(raw_connection(conn))
+        with self._lock:
+            current = self._autocommit.get(key)
+        if current is not value:
+            conn.autocommit = value  # type: ignore[attr-defined]
+            with self._lock:
+                self._autocommit[key] = value
+
+    def needs_ping(self, conn: Any) -> bool:
+        with self._lock:
+            last = self._last_used.get(id(raw_connection(conn)))
+        return last is None or time.monotonic() - last > self.idle_seconds
+
+    def touch(self, conn: Any) -> None:
+        with self._lock:
+            self._last_used[id(raw_connection(conn))] = time.monotonic()
+
+    def forget(self, conn: Any) -> None:
+        key = id(raw_connection(conn))
+        with self._lock:
+            self._last_used.pop(key, None)
+            self._autocommit.pop(key, None)
 
 
 # -------------------------
@@ -26,10 +78,12 @@ from database.db_config import DB_CONFIG
 # -------------------------
 
 class SingleConnection:
-    def __init__(self, cfg: dict, autocommit: bool = False) -> None:
+    def __init__(self, cfg: dict, autocommit: bool = False,
+                 ping_idle: float = PING_IDLE_SECONDS) -> None:
         self._cfg = cfg
         self._conn: Optional[Any] = None
         self._autocommit = autocommit
+        self._idle = _IdleTracker(ping_idle)
 
     def connect(self) -> None:
         if not self._conn or not self.is_ready():
@@ -39,6 +93,7 @@ class SingleConnection:
 
     def disconnect(self) -> None:
         if self._conn:
+            self._idle.forget(self._conn)
             try:
                 self._conn.close()
             except Exception:
@@ -62,40 +117,111 @@ class SingleConnection:
             self.disconnect()
             return False
 
+    def warm(self) -> None:
+        self.connect()
+        if self._conn is not None:
+            self._idle.touch(self._conn)
+
     @contextmanager
     def connection(self) -> Iterator[Any]:
-        self.connect()
-        self.ping()
+        if self._conn is None:
+            self.connect()
+        elif self._idle.needs_ping(self._conn):
+            self.ping()
         assert self._conn is not None
-        yield self._conn
+        try:
+            yield self._conn
+        finally:
+            if self._conn is not None:
+                self._idle.touch(self._conn)
 
 
 # -------------------------
 # Connection pool
 # -------------------------
 
+class PoolExhaustedError(Error):
+    """Raised when no pooled connection became free within the timeout."""
+
+
 class ConnectionPool:
+    """Elastic pool of connections that keep their session between checkouts.
+
+    The pool holds between ``min_size`` and ``max_size`` connections.  New
+    connections are opened on demand while below ``max_size``; once the
+    limit is reached checkouts wait up to ``checkout_timeout`` seconds for a
+    connection to be returned.  Connections idle for longer than
+    ``idle_timeout`` are closed again down to ``min_size``.
+
+    Sessions are not reset when a connection is returned (which would cost
+    a round-trip per checkin); instead any transaction left open is rolled
+    back on checkin.  :meth:`stats` and the ``gf_db_pool_*`` metrics
+    report checkout latency, in-use/idle counts, exhaustion events and
+    connection age.
+    """
+
     def __init__(self, cfg: dict, pool_name: str = "default_pool",
-                 pool_size: int = 5, autocommit: bool = False) -> None:
+                 pool_size: int = 5, autocommit: bool = False,
+                 ping_idle: float = PING_IDLE_SECONDS, *,
+                 min_size: int = 1, max_size: Optional[int] = None,
+                 checkout_timeout: float = 30.0,
+                 idle_timeout: float = 300.0) -> None:
         self._cfg = cfg
         self._pool_name = pool_name
-        self._pool_size = pool_size
-        self._pool: Optional[MySQLConnectionPool] = None
+        self._max_size = max_size if max_size is not None else pool_size
+        self._min_size = min(min_size, self._max_size)
+        if self._max_size < 1:
+            raise ValueError("pool max_size must be at least 1")
+        self._checkout_timeout = checkout_timeout
+        self._idle_timeout = idle_timeout
         self._autocommit = autocommit
+        self._idle = _IdleTracker(ping_idle)
+
+        self._cond = threading.Condition()
+        self._open = False
+        self._free: "deque[Tuple[Any, float]]" = deque()  # (conn, returned_at)
+        self._created_at: Dict[int, float] = {}
+        self._pending = 0  # connections being opened outside the lock
+        self._in_use = 0
+        self._counters = {
+            "checkouts": 0,
+            "exhaustion_events": 0,
+            "timeouts": 0,
+            "opened": 0,
+            "closed": 0,
+        }
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    # -- lifecycle ------------------------------------------------------
 
     def connect(self) -> None:
-        if self._pool is None:
-            self._pool = MySQLConnectionPool(
-                pool_name=self._pool_name,
-                pool_size=self._pool_size,
-                **self._cfg,
-            )
+        with self._cond:
+            if self._open:
+                return
+            self._open = True
+        while True:
+            with self._cond:
+                if self._size() >= self._min_size:
+                    break
+                self._pending += 1
+            conn = self._open_connection()
+            with self._cond:
+                self._pending -= 1
+                if conn is None:
+                    break
+                self._free.append((conn, time.monotonic()))
 
     def disconnect(self) -> None:
-        self._pool = None
+        with self._cond:
+            self._open = False
+            free, self._free = list(self._free), deque()
+            self._cond.notify_all()
+        for conn, _ in free:
+            self._close_connection(conn)
 
     def is_ready(self) -> bool:
-        return self._pool is not None
+        return self._open
 
     def ping(self) -> bool:
         try:
@@ -106,17 +232,181 @@ class ConnectionPool:
             self.disconnect()
             return False
 
+    def warm(self) -> None:
+        """Ping the idle connections once so first use skips the ping."""
+        self.connect()
+        with self._cond:
+            free = list(self._free)
+        for conn, _ in free:
+            try:
+                conn.ping(reconnect=True, attempts=1, delay=0)  # type: ignore[attr-defined]
+                self._idle.apply_autocommit(conn, self._autocommit)
+                self._idle.touch(conn)
+            except Error:
+                self._idle.forget(conn)
+
+    # -- checkout / checkin ---------------------------------------------
+
     @contextmanager
     def connection(self) -> Iterator[Any]:
-        self.connect()
-        assert self._pool is not None
-        conn = self._pool.get_connection()
-        conn.autocommit = self._autocommit  # type: ignore[attr-defined]
+        conn = self._checkout()
         try:
-            conn.ping(reconnect=True, attempts=1, delay=0)  # type: ignore[attr-defined]
+            if self._idle.needs_ping(conn):
+                conn.ping(reconnect=True, attempts=1, delay=0)  # type: ignore[attr-defined]
+            self._idle.apply_autocommit(conn, self._autocommit)
             yield conn
         finally:
+            self._checkin(conn)
+
+    def _checkout(self) -> Any:
+        self.connect()
+        start = time.monotonic()
+        deadline = start + self._checkout_timeout
+        exhausted = False
+        conn = None
+        with self._cond:
+            while True:
+                if not self._open:
+                    raise Error("Connection pool is closed")
+                if self._free:
+                    conn = self._free.pop()[0]  # most recently used first
+                    break
+                if self._size() < self._max_size:
+                    self._pending += 1
+                    break
+                if not exhausted:
+                    exhausted = True
+                    self._counters["exhaustion_events"] += 1
+                    self._metric_counter("gf_db_pool_exhausted_total", "Checkouts that had to wait")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolExhaustedError(
+                        f"No connection available in pool '{self._pool_name}' "
+                        f"after {self._checkout_timeout:.1f}s (max_size={self._max_size})"
+                    )
+                self._cond.wait(remaining)
+
+        if conn is None:
+            try:
+                conn = self._open_connection(raise_errors=True)
+            finally:
+                with self._cond:
+                    self._pending -= 1
+                    if conn is None:
+                        self._cond.notify()
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._in_use += 1
+            self._counters["checkouts"] += 1
+            self._latency_total += waited
+            self._latency_max = max(self._latency_max, waited)
+        self._publish(waited)
+        return conn
+
+    def _checkin(self, conn: Any) -> None:
+        healthy = True
+        try:
+            if getattr(conn, "in_transaction", False):
+                conn.rollback()
+            self._idle.touch(conn)
+        except Exception:
+            healthy = False
+            self._idle.forget(conn)
+
+        with self._cond:
+            self._in_use -= 1
+            keep = healthy and self._open
+            if keep:
+                self._free.append((conn, time.monotonic()))
+            self._cond.notify()
+            reaped = self._reap_idle()
+        if not keep:
+            self._close_connection(conn)
+        for old in reaped:
+            self._close_connection(old)
+        self._publish()
+
+    def _reap_idle(self) -> List[Any]:
+        """Pop connections idle past ``idle_timeout`` above ``min_size``."""
+        reaped = []
+        now = time.monotonic()
+        while (
+            self._free
+            and self._size() > self._min_size
+            and now - self._free[0][1] >= self._idle_timeout
+        ):
+            reaped.append(self._free.popleft()[0])
+        return reaped
+
+    # -- connection management ------------------------------------------
+
+    def _size(self) -> int:
+        return len(self._free) + self._in_use + self._pending
+
+    def _open_connection(self, raise_errors: bool = False) -> Optional[Any]:
+        try:
+            conn = mysql.connector.connect(**self._cfg)
+        except Error:
+            if raise_errors:
+                raise
+            return None
+        with self._cond:
+            self._created_at[id(conn)] = time.monotonic()
+            self._counters["opened"] += 1
+        return conn
+
+    def _close_connection(self, conn: Any) -> None:
+        self._idle.forget(conn)
+        with self._cond:
+            self._created_at.pop(id(conn), None)
+            self._counters["closed"] += 1
+        try:
             conn.close()
+        except Exception:
+            pass
+
+    # -- instrumentation ------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of pool sizing, checkout and age statistics."""
+        now = time.monotonic()
+        with self._cond:
+            ages = [now - t for t in self._created_at.values()]
+            checkouts = self._counters["checkouts"]
+            return dict(
+                self._counters,
+                size=self._size(),
+                in_use=self._in_use,
+                idle=len(self._free),
+                min_size=self._min_size,
+                max_size=self._max_size,
+                checkout_latency_avg=self._latency_total / checkouts if checkouts else 0.0,
+                checkout_latency_max=self._latency_max,
+                connection_age_max=max(ages, default=0.0),
+                connection_age_avg=sum(ages) / len(ages) if ages else 0.0,
+            )
+
+    def _metric_counter(self, name: str, help: str) -> None:
+        metrics.registry().counter(name, help).inc(pool=self._pool_name)
+
+    def _publish(self, waited: Optional[float] = None) -> None:
+        reg = metrics.active()
+        if reg is None:
+            return
+        if waited is not None:
+            reg.histogram(
+                "gf_db_pool_checkout_seconds", "Time spent waiting for a pooled connection"
+            ).observe(waited, pool=self._pool_name)
+        snap = self.stats()
+        for state in ("in_use", "idle"):
+            reg.gauge("gf_db_pool_connections", "Pooled connections by state").set(
+                snap[state], pool=self._pool_name, state=state
+            )
+        reg.gauge("gf_db_pool_connection_age_seconds", "Age of the oldest pooled connection").set(
+            snap["connection_age_max"], pool=self._pool_name
+        )
 
 
 # -------------------------
@@ -146,6 +436,12 @@ class DatabaseCore:
     def ping(self) -> bool:
         return self._provider.ping()
 
+    def warm(self) -> None:
+        """Open provider connections ahead of first use."""
+        warm = getattr(self._provider, "warm", None)
+        if warm is not None:
+            warm()
+
     @contextmanager
     def connection(self) -> Iterator[Any]:
         with self._provider.connection() as conn:
@@ -14,6 +14,7 @@ from __future__ import annotations
 
 import time
 from contextlib import contextmanager
+from itertools import islice
 from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
 
 from mysql.connector import Error, errorcode
@@ -23,6 +24,9 @@ from database.db_core import DatabaseCore
 Params = Union[Tuple[Any, ...], Dict[str, Any]]
 T = TypeVar("T")
 
+# Rows per executemany round-trip and per fetchmany batch when streaming
+DEFAULT_CHUNK_SIZE = 1000
+
 
 class DbEngine:
     def __init__(
@@ -42,6 +46,7 @@ class DbEngine:
 
     def init(self) -> None:
         self._core.connect()
+        self._core.warm()
 
     def shutdown(self) -> None:
         self._core.disconnect()
@@ -127,13 +132,40 @@ class DbEngine:
         *,
         commit: bool = False,
         dict_rows: Optional[bool] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        commit_each_chunk: bool = False,
+        progress: Optional[Callable[[int], None]] = None,
     ) -> int:
+        """Execute ``sql`` for every parameter set in ``seq_of_params``.
+
+        The iterable is consumed lazily in chunks of ``chunk_size`` so large
+        generators never have to fit in memory.  With ``commit_each_chunk``
+        every chunk is committed as soon as it is sent; otherwise a single
+        commit follows the last chunk (when ``commit`` or autocommit writes
+        apply).  ``progress`` is called with the running row count after each
+        chunk.  Returns the total affected row count.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        should_commit = commit or (self._autocommit_writes and _is_write_statement(sql))
+        params_iter = iter(seq_of_params)
+        affected = 0
+        sent = 0
         with self._core.connection() as conn:
             cur = conn.cursor(dictionary=(self._default_dict_rows if dict_rows is None else dict_rows))  # type: ignore[arg-type]
             try:
-                cur.executemany(sql, list(seq_of_params))
-                affected = cur.rowcount
-                if commit or (self._autocommit_writes and _is_write_statement(sql)):
+                while True:
+                    chunk = list(islice(params_iter, chunk_size))
+                    if not chunk:
+                        break
+                    cur.executemany(sql, chunk)
+                    affected += max(cur.rowcount, 0)
+                    sent += len(chunk)
+                    if commit_each_chunk:
+                        conn.commit()
+                    if progress is not None:
+                        progress(sent)
+                if should_commit and not commit_each_chunk:
                     conn.commit()
                 return affected
             finally:
@@ -164,6 +196,58 @@ class DbEngine:
             cur.execute(sql, params)
             return cur.fetchall()
 
+    def stream(
+        self,
+        sql: str,
+        params: Optional[Params] = None,
+        *,
+        dict_rows: Optional[bool] = None,
+        batch_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[List[Union[Tuple[Any, ...], Dict[str, Any]]]]:
+        """Yield the result of ``sql`` in lists of up to ``batch_size`` rows.
+
+        Rows are read from an unbuffered cursor with ``fetchmany`` so the
+        result set is streamed from the server instead of materialized.  The
+        connection stays checked out until the generator is exhausted or
+        closed; any unread rows are discarded on early exit.
+        """
+        dict_flag = self._default_dict_rows if dict_rows is None else dict_rows
+        with self._core.connection() as conn:
+            cur = conn.cursor(dictionary=dict_flag, buffered=False)  # type: ignore[arg-type]
+            exhausted = False
+            try:
+                cur.execute(sql, params)
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        exhausted = True
+                        break
+                    yield rows
+            finally:
+                if not exhausted:
+                    consume = getattr(conn, "consume_results", None)
+                    if consume is not None:
+                        try:
+                            consume()
+                        except Exception:
+                            pass
+                try:
+                    cur.close()
+                except Exception:
+                    pass
+
+    def fetch_iter(
+        self,
+        sql: str,
+        params: Optional[Params] = None,
+        *,
+        dict_rows: Optional[bool] = None,
+        batch_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[Union[Tuple[Any, ...], Dict[str, Any]]]:
+        """Yield rows of ``sql`` one by one in constant memory (see :meth:`stream`)."""
+        for rows in self.stream(sql, params, dict_rows=dict_rows, batch_size=batch_size):
+            yield from rows
+
     def fetch_val(self, sql: str, params: Optional[Params] = None) -> Optional[Any]:
         row = self.fetch_one(sql, params, dict_rows=False)
         if row is None:
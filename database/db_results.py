@@ -0,0 +1,326 @@
+"""
+Persistence of static analysis results on top of :mod:`database.db_engine`.
+
+Responsibilities:
+- Define the results schema (devices, runs, packages, permissions,
+  APK hashes and artifacts)
+- Bulk-load the reports of a run in chunked multi-row
+  ``INSERT ... ON DUPLICATE KEY UPDATE`` statements
+- Optionally stream large tables through ``LOAD DATA LOCAL INFILE``
+
+A whole run is written inside a single transaction, so a 5,000 package
+device costs a handful of round-trips per table rather than one per row.
+``LOAD DATA LOCAL INFILE`` additionally requires ``allow_local_infile`` in
+the connection config and ``local_infile=1`` on the server.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from database.db_engine import DbEngine
+
+DEFAULT_CHUNK_SIZE = 1000
+
+SCHEMA: Tuple[str, ...] = (
+    """
+    CREATE TABLE IF NOT EXISTS gf_devices (
+        serial VARCHAR(128) NOT NULL PRIMARY KEY,
+        model VARCHAR(128) NULL,
+        first_seen DATETIME NOT NULL,
+        last_seen DATETIME NOT NULL
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gf_runs (
+        id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        serial VARCHAR(128) NOT NULL,
+        run_dir VARCHAR(512) NOT NULL,
+        started_at DATETIME NOT NULL,
+        package_count INT UNSIGNED NOT NULL DEFAULT 0,
+        UNIQUE KEY uq_run (serial, run_dir),
+        KEY ix_runs_started (started_at),
+        CONSTRAINT fk_runs_device FOREIGN KEY (serial) REFERENCES gf_devices (serial)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gf_packages (
+        run_id BIGINT UNSIGNED NOT NULL,
+        package VARCHAR(255) NOT NULL,
+        category VARCHAR(64) NOT NULL,
+        risk_score INT NOT NULL,
+        apk_path VARCHAR(1024) NULL,
+        apk_hash CHAR(64) NULL,
+        PRIMARY KEY (run_id, package),
+        KEY ix_packages_package (package),
+        KEY ix_packages_hash (apk_hash),
+        CONSTRAINT fk_packages_run FOREIGN KEY (run_id) REFERENCES gf_runs (id)
+            ON DELETE CASCADE
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gf_permissions (
+        run_id BIGINT UNSIGNED NOT NULL,
+        package VARCHAR(255) NOT NULL,
+        permission VARCHAR(255) NOT NULL,
+        dangerous TINYINT(1) NOT NULL DEFAULT 0,
+        PRIMARY KEY (run_id, package, permission),
+        KEY ix_permissions_permission (permission),
+        CONSTRAINT fk_permissions_run FOREIGN KEY (run_id) REFERENCES gf_runs (id)
+            ON DELETE CASCADE
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gf_apk_hashes (
+        sha256 CHAR(64) NOT NULL PRIMARY KEY,
+        package VARCHAR(255) NOT NULL,
+        apk_path VARCHAR(1024) NULL,
+        first_run_id BIGINT UNSIGNED NOT NULL,
+        last_run_id BIGINT UNSIGNED NOT NULL,
+        KEY ix_apk_hashes_package (package)
+    ) ENGINE=InnoDB
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS gf_artifacts (
+        run_id BIGINT UNSIGNED NOT NULL,
+        package VARCHAR(255) NOT NULL,
+        artifact_sha1 CHAR(40) NOT NULL,
+        artifact TEXT NOT NULL,
+        PRIMARY KEY (run_id, package, artifact_sha1),
+        CONSTRAINT fk_artifacts_run FOREIGN KEY (run_id) REFERENCES gf_runs (id)
+            ON DELETE CASCADE
+    ) ENGINE=InnoDB
+    """,
+)
+
+Row = Sequence[Any]
+
+
+def create_schema(engine: DbEngine) -> None:
+    """Create the results tables if they do not already exist."""
+    with engine.transaction() as cur:
+        for ddl in SCHEMA:
+            cur.execute(ddl)
+
+
+# -------------------------
+# Bulk helpers
+# -------------------------
+
+def build_upsert(
+    table: str,
+    columns: Sequence[str],
+    row_count: int,
+    update_columns: Optional[Sequence[str]] = None,
+) -> str:
+    """Return a multi-row ``INSERT ... ON DUPLICATE KEY UPDATE`` statement.
+
+    ``update_columns`` defaults to every column; an empty sequence turns the
+    statement into an ``INSERT IGNORE``-style no-op update of the first column.
+    """
+    cols = ", ".join(f"`{c}`" for c in columns)
+    placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    values = ", ".join([placeholder] * row_count)
+    updates = list(columns if update_columns is None else update_columns) or [columns[0]]
+    assignments = ", ".join(f"`{c}` = VALUES(`{c}`)" for c in updates)
+    return f"INSERT INTO `{table}` ({cols}) VALUES {values} ON DUPLICATE KEY UPDATE {assignments}"
+
+
+def upsert_rows(
+    cur: Any,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Row],
+    *,
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """Upsert ``rows`` through ``cur`` in chunks of ``chunk_size`` rows.
+
+    Returns the number of rows sent.  The caller owns the transaction.
+    """
+    sent = 0
+    chunk: List[Any] = []
+    chunk_rows = 0
+    for row in rows:
+        chunk.extend(row)
+        chunk_rows += 1
+        if chunk_rows >= chunk_size:
+            cur.execute(build_upsert(table, columns, chunk_rows, update_columns), tuple(chunk))
+            sent += chunk_rows
+            chunk, chunk_rows = [], 0
+    if chunk_rows:
+        cur.execute(build_upsert(table, columns, chunk_rows, update_columns), tuple(chunk))
+        sent += chunk_rows
+    return sent
+
+
+def _csv_field(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def load_data_rows(cur: Any, table: str, columns: Sequence[str], rows: Iterable[Row]) -> int:
+    """Load ``rows`` into ``table`` via a temporary CSV and ``LOAD DATA``.
+
+    Existing keys are replaced.  Returns the number of rows written.
+    """
+    fd, path = tempfile.mkstemp(prefix=f"gf_{table}_", suffix=".csv")
+    count = 0
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as fh:
+            for row in rows:
+                fh.write(",".join(_csv_field(v) for v in row) + "\n")
+                count += 1
+        if count:
+            cols = ", ".join(f"`{c}`" for c in columns)
+            cur.execute(
+                f"LOAD DATA LOCAL INFILE %s REPLACE INTO TABLE `{table}` "
+                "CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' ENCLOSED BY '\"' "
+                f"ESCAPED BY '' LINES TERMINATED BY '\\n' ({cols})",
+                (path,),
+            )
+    finally:
+        os.unlink(path)
+    return count
+
+
+# -------------------------
+# Results ingestion
+# -------------------------
+
+_PACKAGE_COLUMNS = ("run_id", "package", "category", "risk_score", "apk_path", "apk_hash")
+_PERMISSION_COLUMNS = ("run_id", "package", "permission", "dangerous")
+_HASH_COLUMNS = ("sha256", "package", "apk_path", "first_run_id", "last_run_id")
+_ARTIFACT_COLUMNS = ("run_id", "package", "artifact_sha1", "artifact")
+
+
+def _as_dict(rep: Any) -> Dict[str, Any]:
+    return asdict(rep) if is_dataclass(rep) else dict(rep)
+
+
+def _result_rows(run_id: int, reports: Iterable[Any]) -> Dict[str, List[Tuple[Any, ...]]]:
+    rows: Dict[str, List[Tuple[Any, ...]]] = {
+        "gf_packages": [],
+        "gf_permissions": [],
+        "gf_apk_hashes": [],
+        "gf_artifacts": [],
+    }
+    for rep in reports:
+        rec = _as_dict(rep)
+        name = rec["name"]
+        apk_hash = rec.get("apk_hash") or None
+        apk_path = rec.get("apk_path") or None
+        rows["gf_packages"].append(
+            (run_id, name, rec.get("category", ""), int(rec.get("risk_score") or 0), apk_path, apk_hash)
+        )
+        dangerous = set(rec.get("dangerous_permissions") or ())
+        for perm in dict.fromkeys(rec.get("permissions") or ()):
+            rows["gf_permissions"].append((run_id, name, perm, int(perm in dangerous)))
+        if apk_hash:
+            rows["gf_apk_hashes"].append((apk_hash, name, apk_path, run_id, run_id))
+        for art in dict.fromkeys(rec.get("artifacts") or ()):
+            digest = hashlib.sha1(art.encode("utf-8")).hexdigest()
+            rows["gf_artifacts"].append((run_id, name, digest, art))
+    return rows
+
+
+def save_run(
+    engine: DbEngine,
+    serial: str,
+    reports: Iterable[Any],
+    *,
+    run_dir: str = "",
+    model: Optional[str] = None,
+    started_at: Optional[datetime] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    use_load_data: bool = False,
+) -> int:
+    """Persist ``reports`` for one device run and return the run id.
+
+    ``reports`` are :class:`PackageReport` objects or equivalent mappings.
+    Re-saving the same ``serial``/``run_dir`` pair updates the existing run,
+    so a run may also be written incrementally in several batches.
+    With ``use_load_data`` the permission and artifact tables, which dominate
+    the row count, are loaded with ``LOAD DATA LOCAL INFILE`` instead.
+    """
+    reports = list(reports)
+    now = started_at or datetime.now()
+    with engine.transaction() as cur:
+        upsert_rows(
+            cur,
+            "gf_devices",
+            ("serial", "model", "first_seen", "last_seen"),
+            [(serial, model, now, now)],
+            update_columns=("last_seen",) if model is None else ("model", "last_seen"),
+        )
+        # LAST_INSERT_ID(id) makes lastrowid report the existing row on update
+        cur.execute(
+            "INSERT INTO `gf_runs` (`serial`, `run_dir`, `started_at`, `package_count`) "
+            "VALUES (%s, %s, %s, %s) ON DUPLICATE KEY UPDATE "
+            "`id` = LAST_INSERT_ID(`id`)",
+            (serial, run_dir, now, 0),
+        )
+        run_id = int(cur.lastrowid)
+
+        rows = _result_rows(run_id, reports)
+        upsert_rows(cur, "gf_packages", _PACKAGE_COLUMNS, rows["gf_packages"], chunk_size=chunk_size)
+        upsert_rows(
+            cur,
+            "gf_apk_hashes",
+            _HASH_COLUMNS,
+            rows["gf_apk_hashes"],
+            update_columns=("package", "apk_path", "last_run_id"),
+            chunk_size=chunk_size,
+        )
+        for table, columns in (
+            ("gf_permissions", _PERMISSION_COLUMNS),
+            ("gf_artifacts", _ARTIFACT_COLUMNS),
+        ):
+            if use_load_data:
+                load_data_rows(cur, table, columns, rows[table])
+            else:
+                upsert_rows(cur, table, columns, rows[table], chunk_size=chunk_size)
+        # Counted server-side so batches appended to a run keep it accurate
+        cur.execute(
+            "UPDATE `gf_runs` SET `package_count` = "
+            "(SELECT COUNT(*) FROM `gf_packages` WHERE `run_id` = %s) WHERE `id` = %s",
+            (run_id, run_id),
+        )
+    return run_id
+
+
+def iter_artifacts(
+    engine: DbEngine,
+    *,
+    serial: Optional[str] = None,
+    batch_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Stream stored artifacts (optionally for one device) as dict rows."""
+    sql = (
+        "SELECT r.serial, r.run_dir, a.package, a.artifact "
+        "FROM gf_artifacts a JOIN gf_runs r ON r.id = a.run_id"
+    )
+    params: Tuple[Any, ...] = ()
+    if serial is not None:
+        sql += " WHERE r.serial = %s"
+        params = (serial,)
+    yield from engine.fetch_iter(sql, params or None, dict_rows=True, batch_size=batch_size)
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "SCHEMA",
+    "build_upsert",
+    "create_schema",
+    "iter_artifacts",
+    "load_data_rows",
+    "save_run",
+    "upsert_rows",
+]
@@ -0,0 +1,236 @@
+"""
+Write-behind persistence of package reports.
+
+Responsibilities:
+- Accept report records on a bounded queue without touching the database
+- Batch records by size or age on a background thread
+- Flush batches through :func:`database.db_results.save_run` using
+  :meth:`DbEngine.with_retry` for transient errors
+- Apply backpressure (blocking ``submit``) when the database falls behind
+- Drain cleanly on shutdown or Ctrl+C
+
+Analysis code only pays for a queue ``put``; database latency and lock
+waits are absorbed by the writer thread.
+"""
+
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import utils.logging_utils.logging_engine as log
+from database import db_results
+from database.db_engine import DbEngine
+
+DEFAULT_MAX_QUEUE = 10_000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+
+@dataclass
+class _Record:
+    serial: str
+    run_dir: str
+    report: Any
+
+
+_STOP = object()
+
+
+class ResultWriter:
+    """Background writer persisting reports in batches."""
+
+    def __init__(
+        self,
+        engine: DbEngine,
+        *,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_attempts: int = 3,
+    ) -> None:
+        self._engine = engine
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_attempts = max_attempts
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            "submitted": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "backpressure_waits": 0,
+        }
+
+    # -------------------------
+    # Producer side
+    # -------------------------
+
+    def start(self) -> "ResultWriter":
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="gf-db-writer", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    @property
+    def engine(self) -> DbEngine:
+        return self._engine
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def submit(
+        self, serial: str, run_dir: str, report: Any, timeout: Optional[float] = None
+    ) -> None:
+        """Queue ``report`` for persistence.
+
+        Blocks while the queue is full (up to ``timeout`` seconds, raising
+        :class:`queue.Full` afterwards) so producers slow down to the rate
+        the database can sustain.
+        """
+        if self._closed:
+            raise RuntimeError("ResultWriter is closed")
+        self.start()
+        record = _Record(serial, str(run_dir), report)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self._bump("backpressure_waits")
+            log.debug("DB writer queue full; waiting for the writer to catch up")
+            self._queue.put(record, timeout=timeout)
+        self._bump("submitted")
+
+    def flush(self) -> None:
+        """Block until every queued record has been processed."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flush outstanding records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            # Database stalled with a full queue; give up rather than hang
+            log.warning("DB writer did not drain within %ss", timeout)
+            return
+        self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if self._thread.is_alive():
+            log.warning("DB writer did not drain within %ss", timeout)
+        else:
+            log.info("DB writer drained: %s", self.stats())
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, queued=self._queue.qsize())
+
+    def _bump(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+    # -------------------------
+    # Writer thread
+    # -------------------------
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[_Record] = []
+            deadline = time.monotonic() + self._flush_interval
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(item)
+            if batch:
+                self._write(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch: List[_Record]) -> None:
+        groups: Dict[Tuple[str, str], List[Any]] = {}
+        for rec in batch:
+            groups.setdefault((rec.serial, rec.run_dir), []).append(rec.report)
+        for (serial, run_dir), reports in groups.items():
+            try:
+                self._engine.with_retry(
+                    lambda: db_results.save_run(
+                        self._engine, serial, reports, run_dir=run_dir
+                    ),
+                    max_attempts=self._max_attempts,
+                )
+            except Exception as exc:
+                self._bump("failed", len(reports))
+                log.error(
+                    "DB writer failed to save %d report(s) for %s: %s",
+                    len(reports), serial, exc,
+                )
+                continue
+            self._bump("written", len(reports))
+        self._bump("batches")
+
+
+# -------------------------
+# Process-wide writer
+# -------------------------
+
+_writer: Optional[ResultWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> ResultWriter:
+    """Return the shared writer, connecting and creating the schema on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None or _writer.closed:
+            from database.db_core import DatabaseCore
+
+            engine = DbEngine(DatabaseCore.from_config(use_pool=True))
+            engine.init()
+            db_results.create_schema(engine)
+            _writer = ResultWriter(engine).start()
+        return _writer
+
+
+def drain(timeout: Optional[float] = 30.0) -> None:
+    """Flush and stop the shared writer if one was started."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close(timeout)
+        try:
+            writer.engine.shutdown()
+        except Exception:
+            pass
+
+
+atexit.register(drain)
+
+
+__all__ = ["ResultWriter", "drain", "get_writer"]
@@ -0,0 +1,219 @@
+"""
+Local SQLite catalog of analysis runs.
+
+Responsibilities:
+- Record every run's package reports and social apps next to the CSVs
+- Answer cross-run / cross-device questions ("which devices had package X
+  at hash Y last month") with indexed lookups
+- Work without the MySQL server (stdlib :mod:`sqlite3` only)
+
+The catalog lives at ``<output>/catalog.sqlite`` and uses WAL journaling so
+parallel device runs can record results while queries are running.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+CATALOG_FILENAME = "catalog.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    serial TEXT NOT NULL,
+    run_dir TEXT NOT NULL UNIQUE,
+    started_at TEXT NOT NULL,
+    package_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_serial_started ON runs (serial, started_at);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs (started_at);
+
+CREATE TABLE IF NOT EXISTS packages (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    package TEXT NOT NULL,
+    category TEXT,
+    risk_score INTEGER NOT NULL DEFAULT 0,
+    apk_path TEXT,
+    sha256 TEXT,
+    PRIMARY KEY (run_id, package)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_packages_package ON packages (package);
+CREATE INDEX IF NOT EXISTS idx_packages_sha256 ON packages (sha256);
+
+CREATE TABLE IF NOT EXISTS social_apps (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    package TEXT NOT NULL,
+    app_name TEXT,
+    PRIMARY KEY (run_id, package)
+) WITHOUT ROWID;
+"""
+
+
+def catalog_path(base_dir: str | Path) -> Path:
+    """Return the catalog location for an output directory."""
+    return Path(base_dir) / CATALOG_FILENAME
+
+
+def _as_dict(obj: Any) -> Dict[str, Any]:
+    return asdict(obj) if is_dataclass(obj) else dict(obj)
+
+
+def _started_at(run_dir: Path) -> str:
+    """Derive the run time from the ``YYYYmmdd_HHMMSS`` run directory name."""
+    try:
+        stamp = datetime.strptime(run_dir.name, "%Y%m%d_%H%M%S")
+    except ValueError:
+        stamp = datetime.now().replace(microsecond=0)
+    return stamp.isoformat()
+
+
+class RunCatalog:
+    """Connection to the SQLite run catalog."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "RunCatalog":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    # -------------------------
+    # Writes
+    # -------------------------
+
+    def record_run(
+        self,
+        serial: str,
+        run_dir: str | Path,
+        reports: Iterable[Any],
+        social_apps: Iterable[Any] = (),
+        started_at: Optional[str] = None,
+    ) -> int:
+        """Store one run, replacing any earlier record of the same run dir."""
+        run_dir = Path(run_dir)
+        reports = [_as_dict(r) for r in reports]
+        with self._conn:
+            self._conn.execute("DELETE FROM runs WHERE run_dir = ?", (str(run_dir),))
+            cur = self._conn.execute(
+                "INSERT INTO runs (serial, run_dir, started_at, package_count) VALUES (?, ?, ?, ?)",
+                (serial, str(run_dir), started_at or _started_at(run_dir), len(reports)),
+            )
+            run_id = int(cur.lastrowid)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO packages "
+                "(run_id, package, category, risk_score, apk_path, sha256) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        run_id,
+                        rec["name"],
+                        rec.get("category"),
+                        int(rec.get("risk_score") or 0),
+                        rec.get("apk_path"),
+                        rec.get("apk_hash"),
+                    )
+                    for rec in reports
+                ),
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO social_apps (run_id, package, app_name) VALUES (?, ?, ?)",
+                (
+                    (run_id, app.get("package"), app.get("app_name"))
+                    for app in (_as_dict(a) for a in social_apps)
+                ),
+            )
+        return run_id
+
+    # -------------------------
+    # Queries
+    # -------------------------
+
+    def find_packages(
+        self,
+        *,
+        package: Optional[str] = None,
+        sha256: Optional[str] = None,
+        serial: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return package sightings matching every given filter, newest first.
+
+        ``package`` may end in ``*`` for a prefix match.  ``since``/``until``
+        are ISO dates or timestamps compared against the run start time.
+        """
+        clauses: List[str] = []
+        params: List[Any] = []
+        if package:
+            if package.endswith("*"):
+                clauses.append("p.package GLOB ?")
+            else:
+                clauses.append("p.package = ?")
+            params.append(package)
+        if sha256:
+            clauses.append("p.sha256 = ?")
+            params.append(sha256.lower())
+        if serial:
+            clauses.append("r.serial = ?")
+            params.append(serial)
+        if since:
+            clauses.append("r.started_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("r.started_at < ?")
+            params.append(until)
+        sql = (
+            "SELECT r.serial, r.started_at, r.run_dir, p.package, p.category, "
+            "p.risk_score, p.sha256, p.apk_path "
+            "FROM packages p JOIN runs r ON r.id = p.run_id"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY r.started_at DESC, r.serial, p.package"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def list_runs(self, serial: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return recorded runs, newest first."""
+        sql = "SELECT serial, started_at, run_dir, package_count FROM runs"
+        params: List[Any] = []
+        if serial:
+            sql += " WHERE serial = ?"
+            params.append(serial)
+        sql += " ORDER BY started_at DESC"
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+
+def record_run(
+    base_dir: str | Path,
+    serial: str,
+    run_dir: str | Path,
+    reports: Iterable[Any],
+    social_apps: Iterable[Any] = (),
+) -> int:
+    """Record a run in the catalog under ``base_dir`` and return its id."""
+    with RunCatalog(catalog_path(base_dir)) as catalog:
+        return catalog.record_run(serial, run_dir, reports, social_apps)
+
+
+__all__ = ["CATALOG_FILENAME", "RunCatalog", "catalog_path", "record_run"]
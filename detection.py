@@ -8,10 +8,44 @@ a report is written to ``reports/social_apps_found.csv``.
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Mapping
 
 from config.social_detection import SOCIAL_APP_PACKAGES, KEYWORD_TOKENS
-from utils.csv_utils import read_apk_list, write_csv
+import inventory
+from utils.csv_utils import write_csv
+from utils.text_utils.keyword_automaton import KeywordAutomaton, compile_keywords
+
+
+def keyword_automaton() -> KeywordAutomaton:
+    """Return the cached automaton compiled from ``KEYWORD_TOKENS``."""
+    return compile_keywords(KEYWORD_TOKENS)
+
+
+def iter_hits(rows: Iterable[Mapping[str, str]]) -> Iterator[Dict[str, str]]:
+    """Yield detection hits for ``rows`` one at a time.
+
+    ``rows`` may be any iterable of CSV rows, e.g. a :class:`csv.DictReader`
+    over a large inventory.  Each hit is a copy of its row with ``Detected``,
+    ``Reason`` and ``Matched_Tokens`` (every keyword token found, separated by
+    ``;``) added.
+    """
+    automaton = keyword_automaton()
+    for row in rows:
+        if row.get("Install_Tier") != "data":
+            continue
+        pkg = row.get("Package") or ""
+        tokens = automaton.matches(pkg)
+        if pkg in SOCIAL_APP_PACKAGES:
+            detected, reason = "Y", f"exact:{pkg}"
+        elif tokens:
+            detected, reason = "?", f"keyword:{tokens[0]}"
+        else:
+            continue
+        hit = dict(row)
+        hit["Detected"] = detected
+        hit["Reason"] = reason
+        hit["Matched_Tokens"] = ";".join(tokens)
+        yield hit
 
 
 def detect(
@@ -24,28 +58,11 @@ def detect(
     package matches are flagged with ``Detected`` set to ``"Y"`` and a
     ``Reason`` of ``"exact:<pkg>"``.  Rows whose package names contain any
     ``KEYWORD_TOKENS`` are marked with ``Detected`` set to ``"?"`` and
-    ``Reason`` of ``"keyword:<token>"``.
+    ``Reason`` of ``"keyword:<token>"``.  Keyword tokens are matched in one
+    pass per package name (see :func:`iter_hits`).
     """
 
-    apk_csv = Path(apk_csv)
-    rows = read_apk_list(apk_csv)
-    hits: List[Dict[str, str]] = []
-    for row in rows:
-        if row.get("Install_Tier") != "data":
-            continue
-        pkg = row.get("Package", "")
-        if pkg in SOCIAL_APP_PACKAGES:
-            row["Detected"] = "Y"
-            row["Reason"] = f"exact:{pkg}"
-            hits.append(row)
-            continue
-        lower_pkg = pkg.lower()
-        token = next((t for t in KEYWORD_TOKENS if t in lower_pkg), None)
-        if token:
-            row["Detected"] = "?"
-            row["Reason"] = f"keyword:{token}"
-            hits.append(row)
-
+    hits = list(iter_hits(inventory.load(apk_csv).by_tier("data")))
     if not hits:
         return []
 
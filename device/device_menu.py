@@ -13,7 +13,6 @@ from device import vendor_normalizer
 from utils.display_utils import prompt_utils
 from utils.display_utils.menu_utils import MenuExit
 from menus.base import BaseMenu, MenuAction
-from analysis.static_analysis import run_static_analysis
 from config import app_config
 import utils.logging_utils.logging_engine as log
 
@@ -77,10 +76,16 @@ class DeviceMenu(BaseMenu):
 
     def run_static_analysis(self) -> None:
         print("\n🔍 Running static analysis...\n")
+        # Deferred: the analysis package is only needed once a run starts
+        from analysis.static_analysis import run_static_analysis
+
         try:
             log.info(f"Launching static analysis for {self.serial}")
             limit = getattr(app_config, "ARTIFACT_LIMIT", 3)
-            run_static_analysis.analyze_device(self.serial, artifact_limit=limit)
+            profile = prompt_utils.ask_yes_no("Profile this run?", default="n")
+            run_static_analysis.analyze_device(
+                self.serial, artifact_limit=limit, profile=profile
+            )
             log.info(f"Static analysis finished for {self.serial}")
         except KeyboardInterrupt:
             print("\n⚠️  Static analysis interrupted. Returning to menu.\n")
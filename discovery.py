@@ -4,7 +4,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Dict, Tuple
 
-from utils.csv_utils import read_apk_list
+import inventory
 from utils.adb_utils import adb_runner
 import utils.logging_utils.logging_engine as log
 
@@ -28,7 +28,7 @@ def list_packages(
         (``"csv"`` or ``"adb"``).
     """
     try:
-        rows = read_apk_list(apk_csv)
+        inv = inventory.load(apk_csv)
     except OSError:
         log.warning("apk_list.csv missing; falling back to adb")
         result = adb_runner.run_adb_command(serial, ["pm", "list", "packages", "-f"], log_errors=False)
@@ -39,10 +39,4 @@ def list_packages(
                     path, pkg = line.split("=", 1)
                     packages[pkg.strip()] = path.strip()
         return packages, "adb"
-    packages: Dict[str, str] = {}
-    for row in rows:
-        pkg = row.get("Package")
-        if not pkg:
-            continue
-        packages[pkg] = row.get("APK_Path", "")
-    return packages, "csv"
+    return inv.package_paths(), "csv"
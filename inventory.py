@@ -0,0 +1,195 @@
+"""Shared in-memory view of the canonical APK inventory CSV.
+
+``apk_list.csv`` is consulted by discovery, detection and the ``--validate``
+entry point.  Rather than each of them re-reading and linearly scanning the
+file, :func:`load` parses it once per process and caches the result keyed by
+the file's modification time and size, so an unchanged inventory is never
+parsed twice and a rewritten one is picked up automatically.
+
+Rows are stored as tuples in header order.  Lookups go through hash indexes
+by ``Package`` and ``Install_Tier`` and a sorted package index that answers
+prefix queries such as ``com.vendor.`` with a binary search.
+"""
+from __future__ import annotations
+
+import bisect
+import csv
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import utils.logging_utils.logging_engine as log
+
+_BASE_HEADERS = ("Package", "APK_Path")
+
+Row = Tuple[str, ...]
+
+
+class Inventory:
+    """Parsed APK inventory with package, tier and prefix indexes."""
+
+    __slots__ = (
+        "path",
+        "headers",
+        "_rows",
+        "_columns",
+        "_by_package",
+        "_by_tier",
+        "_sorted_packages",
+    )
+
+    def __init__(self, headers: Sequence[str], rows: Sequence[Row], path: Optional[Path] = None) -> None:
+        self.path = path
+        self.headers: Tuple[str, ...] = tuple(headers)
+        self._rows: List[Row] = list(rows)
+        self._columns: Dict[str, int] = {h: i for i, h in enumerate(self.headers)}
+
+        pkg_col = self._columns.get("Package")
+        tier_col = self._columns.get("Install_Tier")
+        self._by_package: Dict[str, int] = {}
+        self._by_tier: Dict[str, List[int]] = {}
+        for idx, row in enumerate(self._rows):
+            if pkg_col is not None and row[pkg_col]:
+                # Later rows win, matching the dict built by the old readers
+                self._by_package[row[pkg_col]] = idx
+            if tier_col is not None:
+                self._by_tier.setdefault(row[tier_col], []).append(idx)
+        self._sorted_packages: List[str] = sorted(self._by_package)
+
+    @classmethod
+    def from_csv(cls, path: str | Path) -> "Inventory":
+        """Parse ``path`` into an :class:`Inventory` (uncached)."""
+        path = Path(path)
+        log.debug("Reading APK inventory from %s", path)
+        with path.open(encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            headers = next(reader, [])
+            width = len(headers)
+            rows: List[Row] = []
+            for values in reader:
+                if not values:
+                    continue
+                if len(values) < width:
+                    values += [""] * (width - len(values))
+                rows.append(tuple(values[:width]))
+        log.debug("Loaded %d row(s) from %s", len(rows), path)
+        return cls(headers, rows, path)
+
+    # -------------------------
+    # Row access
+    # -------------------------
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, package: object) -> bool:
+        return package in self._by_package
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return self.rows()
+
+    def rows(self, indexes: Optional[Sequence[int]] = None) -> Iterator[Dict[str, str]]:
+        """Yield rows (all, or those at ``indexes``) as fresh dictionaries."""
+        headers = self.headers
+        source = self._rows if indexes is None else (self._rows[i] for i in indexes)
+        for row in source:
+            yield dict(zip(headers, row))
+
+    def value(self, row: Row, column: str, default: str = "") -> str:
+        """Return ``column`` of a raw tuple ``row``."""
+        idx = self._columns.get(column)
+        return row[idx] if idx is not None else default
+
+    # -------------------------
+    # Indexed queries
+    # -------------------------
+
+    def get(self, package: str) -> Optional[Dict[str, str]]:
+        """Return the row for ``package`` or ``None``."""
+        idx = self._by_package.get(package)
+        if idx is None:
+            return None
+        return dict(zip(self.headers, self._rows[idx]))
+
+    def by_tier(self, tier: str) -> List[Dict[str, str]]:
+        """Return the rows whose ``Install_Tier`` equals ``tier``."""
+        return list(self.rows(self._by_tier.get(tier, ())))
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """Return the sorted package names starting with ``prefix``.
+
+        A trailing ``*`` is accepted, so ``com.vendor.*`` and ``com.vendor.``
+        are equivalent.
+        """
+        prefix = prefix.rstrip("*")
+        start = bisect.bisect_left(self._sorted_packages, prefix)
+        end = start
+        names = self._sorted_packages
+        while end < len(names) and names[end].startswith(prefix):
+            end += 1
+        return names[start:end]
+
+    def package_paths(self) -> Dict[str, str]:
+        """Return a mapping of package name to ``APK_Path``."""
+        path_col = self._columns.get("APK_Path")
+        return {
+            pkg: (self._rows[idx][path_col] if path_col is not None else "")
+            for pkg, idx in self._by_package.items()
+        }
+
+    # -------------------------
+    # Validation
+    # -------------------------
+
+    def validate(self) -> bool:
+        """Apply the :func:`utils.csv_utils.validate_apk_list` checks in memory."""
+        if not self.headers:
+            log.warning("Validation failed for %s: missing headers", self.path)
+            return False
+        if self.headers[:2] != _BASE_HEADERS:
+            log.warning(
+                "Validation failed for %s: incorrect base headers %s",
+                self.path, list(self.headers[:2]),
+            )
+            return False
+        for idx, row in enumerate(self._rows, start=1):
+            if not row[0] or not row[1]:
+                log.warning("Validation failed for %s: missing data at row %d", self.path, idx)
+                return False
+        return True
+
+
+# -------------------------
+# Process-wide cache
+# -------------------------
+
+_cache: Dict[Path, Tuple[Tuple[int, int], Inventory]] = {}
+_cache_lock = threading.Lock()
+
+
+def load(path: str | Path = "apk_list.csv") -> Inventory:
+    """Return the inventory at ``path``, parsing it only when it changed.
+
+    Raises :class:`OSError` when the file cannot be read, like
+    :func:`utils.csv_utils.read_apk_list`.
+    """
+    path = Path(path).resolve()
+    st = path.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+    inv = Inventory.from_csv(path)
+    with _cache_lock:
+        _cache[path] = (key, inv)
+    return inv
+
+
+def clear_cache() -> None:
+    """Forget every cached inventory."""
+    with _cache_lock:
+        _cache.clear()
+
+
+__all__ = ["Inventory", "clear_cache", "load"]
@@ -8,9 +8,9 @@ from pathlib import Path
 from config import app_config
 from utils.display_utils import theme
 import utils.logging_utils.logging_engine as log
-from utils.csv_utils import validate_apk_list, read_apk_list
+import inventory
 
-from main_menu import MainMenu
+import batch_cli
 
 
 # ---------- Signal Handling ----------
@@ -56,14 +56,20 @@ def main():
         type=Path,
         help="Validate an apk_list.csv and optionally compare with raw/pm_list_packages.txt",
     )
+    batch_cli.register_subcommands(parser)
     args = parser.parse_args()
 
     if args.validate:
         csv_path: Path = args.validate
-        if validate_apk_list(csv_path):
+        try:
+            inv = inventory.load(csv_path)
+        except OSError as exc:
+            log.warning(f"Validation failed for {csv_path}: {exc}")
+            inv = None
+        if inv is not None and inv.validate():
             pm_list = csv_path.resolve().parent / "raw" / "pm_list_packages.txt"
             if pm_list.exists():
-                csv_count = len(read_apk_list(csv_path))
+                csv_count = len(inv)
                 with pm_list.open(encoding="utf-8") as f:
                     pm_count = sum(1 for line in f if line.strip())
                 delta = csv_count - pm_count
@@ -104,6 +110,10 @@ def main():
                     pass
         log.info("Debug console logging enabled")
 
+    # Headless subcommands bypass the interactive menu entirely
+    if args.command:
+        sys.exit(batch_cli.run(args))
+
     # Configure artifact display limit
     artifact_arg = getattr(args, "artifacts", "3")
     if args.no_artifacts:
@@ -115,6 +125,10 @@ def main():
     # Trap Ctrl+C
     signal.signal(signal.SIGINT, handle_interrupt)
 
+    # Imported here so headless subcommands and --validate never pay for the
+    # menu tree (database driver, device and analysis modules).
+    from main_menu import MainMenu
+
     try:
         MainMenu().show()
     except KeyboardInterrupt:
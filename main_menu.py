@@ -1,14 +1,45 @@
 # main_menu.py
-"""Centralized main menu using an object-oriented design."""
+"""Centralized main menu using an object-oriented design.
+
+Menu actions pull in heavy dependencies (the MySQL driver, device and
+analysis modules, the test runner).  Those are resolved lazily through
+:func:`__getattr__` the first time an action needs them so that building
+and rendering the menu stays cheap.
+"""
+
+import importlib
 
 from config import app_config
 from menus.base import BaseMenu, MenuAction
 from utils.display_utils import error_utils
 import utils.logging_utils.logging_engine as log
-from device import show_devices, connect_to_device
 from utils.about_app import about_app
-from database.db_menu import DatabaseMenu
-from utils.test_utils.test_runner import PytestRunner
+
+
+# attribute name -> (module, attribute within module or None for the module)
+_LAZY_ATTRS = {
+    "show_devices": ("device.show_devices", None),
+    "connect_to_device": ("device.connect_to_device", None),
+    "DatabaseMenu": ("database.db_menu", "DatabaseMenu"),
+    "PytestRunner": ("utils.test_utils.test_runner", "PytestRunner"),
+}
+
+
+def __getattr__(name: str):
+    """Import lazily declared attributes on first access (PEP 562)."""
+    try:
+        module_name, attr = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    module = importlib.import_module(module_name)
+    value = module if attr is None else getattr(module, attr)
+    globals()[name] = value
+    return value
+
+
+def _lazy(name: str):
+    """Return a lazily imported attribute, honouring any patched value."""
+    return globals().get(name) or __getattr__(name)
 
 
 class MainMenu(BaseMenu):
@@ -34,7 +65,7 @@ class MainMenu(BaseMenu):
         """List all connected Android devices."""
         log.info("Selected: Show Connected Devices")
         try:
-            show_devices.display_detailed_devices()
+            _lazy("show_devices").display_detailed_devices()
         except KeyboardInterrupt:
             print("\n⚠️  Device listing interrupted.\n")
             log.warning("Device listing interrupted by user")
@@ -43,7 +74,7 @@ class MainMenu(BaseMenu):
         """Connect to a selected device and open its menu."""
         log.info("Selected: Connect to a Device")
         try:
-            connect_to_device.connect_to_device()
+            _lazy("connect_to_device").connect_to_device()
         except KeyboardInterrupt:
             print("\n⚠️  Device connection interrupted. Returning to main menu.\n")
             log.warning("Device connection interrupted by user")
@@ -53,13 +84,13 @@ class MainMenu(BaseMenu):
     def open_database_menu(self) -> None:
         """Open the interactive database menu."""
         log.info("Opened Database Menu")
-        DatabaseMenu().show()
+        _lazy("DatabaseMenu")().show()
 
     def run_test_suite(self) -> None:
         """Execute the full pytest suite and show results."""
         log.info("Selected: Run Test Suite")
         print("\n🧪 Running test suite...\n")
-        PytestRunner().run_and_report()
+        _lazy("PytestRunner")().run_and_report()
 
 
 # ----- Convenience wrappers -----
@@ -0,0 +1,75 @@
+"""Measure CLI start-up import cost and flag eagerly loaded heavy modules.
+
+Runs ``python -X importtime -c "import main"`` in a clean interpreter, prints
+the slowest imports and exits non-zero when either the total import time
+exceeds ``--budget-ms`` or one of :data:`HEAVY_MODULES` was imported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Modules that must only load when the action needing them runs.
+HEAVY_MODULES = (
+    "mysql",
+    "androguard",
+    "database.db_menu",
+    "analysis.static_analysis",
+    "utils.test_utils.test_runner",
+    "device.device_menu",
+)
+
+
+def measure(target: str = "main") -> List[Tuple[str, int, int]]:
+    """Return ``(module, self_us, cumulative_us)`` for each import of ``target``."""
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        check=True,
+    )
+    rows: List[Tuple[str, int, int]] = []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", default="main", help="Module to import")
+    parser.add_argument("--top", type=int, default=15, help="Number of imports to list")
+    parser.add_argument(
+        "--budget-ms", type=float, default=150.0, help="Maximum total import time"
+    )
+    args = parser.parse_args(argv)
+
+    rows = measure(args.target)
+    total_ms = sum(self_us for _, self_us, _ in rows) / 1000
+    print(f"Total import time for '{args.target}': {total_ms:.1f} ms ({len(rows)} modules)")
+    for name, _, cumulative in sorted(rows, key=lambda r: r[2], reverse=True)[: args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    loaded = {name for name, _, _ in rows}
+    heavy = sorted(m for m in loaded if m.split(".")[0] in HEAVY_MODULES or m in HEAVY_MODULES)
+    status = 0
+    if heavy:
+        print(f"Heavy modules imported eagerly: {', '.join(heavy)}")
+        status = 1
+    if total_ms > args.budget_ms:
+        print(f"Import time {total_ms:.1f} ms exceeds budget of {args.budget_ms:.1f} ms")
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+"""Compare the full ``dumpsys package`` path with the fast inventory path.
+
+For a connected device this measures bytes transferred and wall time of:
+
+* ``full``: :func:`package_analysis.get_all_package_permissions`, the single
+  ``dumpsys package`` that ``analyze_packages`` runs by default
+* ``fast``: :func:`package_analysis.get_fast_package_permissions`, i.e.
+  ``cmd package list packages -f -U --show-versioncode -i`` plus batched
+  ``dumpsys package <pkg>`` for the packages needing detail, including its
+  fallback to the full dump when too many do
+
+The previous run is read from ``--output-dir`` (as ``--fast-inventory``
+would), or simulated with ``--detail N`` so that N packages need detail.
+Results go to ``logs/benchmark/inventory.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+# Ensure repository root is on the import path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+import utils.logging_utils.logging_engine as log
+from analysis.static_analysis import package_analysis, run_static_analysis
+
+OUTPUT_DIR = Path("logs/benchmark")
+
+
+@contextmanager
+def _counting_adb() -> Iterator[Dict[str, int]]:
+    """Count commands and output bytes of the adb calls package_analysis makes."""
+    stats = {"commands": 0, "bytes": 0}
+    originals = {
+        name: getattr(package_analysis, name)
+        for name in ("run_adb_command", "run_adb_command_compressed")
+    }
+
+    def wrap(fn: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+        def counted(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+            result = fn(*args, **kwargs)
+            stats["commands"] += 1
+            stats["bytes"] += len(str(result.get("output", "")))
+            return result
+
+        return counted
+
+    for name, fn in originals.items():
+        setattr(package_analysis, name, wrap(fn))
+    try:
+        yield stats
+    finally:
+        for name, fn in originals.items():
+            setattr(package_analysis, name, fn)
+
+
+def _measure(fn: Callable[[], Any]) -> Dict[str, object]:
+    with _counting_adb() as stats:
+        started = time.perf_counter()
+        perms = fn()
+        seconds = time.perf_counter() - started
+    return {"seconds": round(seconds, 3), "packages": len(perms), **stats}
+
+
+def _simulated_previous(serial: str, detail: int) -> Dict[str, Dict[str, Any]]:
+    """Pretend every package but the first ``detail`` was seen unchanged."""
+    inventory = package_analysis.get_package_inventory(serial)
+    return {
+        pkg: {"version_code": inventory[pkg].version_code, "permissions": []}
+        for pkg in sorted(inventory)[detail:]
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("serial", help="Device serial")
+    parser.add_argument("--detail", type=int, help="Simulate N packages needing detail")
+    parser.add_argument("--output-dir", default="output", help="Analysis output root")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path (best is kept)")
+    args = parser.parse_args(argv)
+
+    if args.detail is None:
+        previous = run_static_analysis.load_previous_reports(args.serial, args.output_dir)
+    else:
+        previous = _simulated_previous(args.serial, args.detail)
+
+    report: Dict[str, Dict[str, object]] = {}
+    for name, fn in (
+        ("full", lambda: package_analysis.get_all_package_permissions(args.serial)),
+        ("fast", lambda: package_analysis.get_fast_package_permissions(args.serial, previous)[0]),
+    ):
+        runs = [_measure(fn) for _ in range(max(1, args.repeat))]
+        report[name] = min(runs, key=lambda r: float(r["seconds"]))
+
+    full, fast = report["full"], report["fast"]
+    print(f"{'path':<6} {'seconds':>8} {'bytes':>12} {'commands':>9} {'packages':>9}")
+    for name, stats in report.items():
+        print(
+            f"{name:<6} {stats['seconds']:>8} {stats['bytes']:>12} "
+            f"{stats['commands']:>9} {stats['packages']:>9}"
+        )
+    if full["bytes"]:
+        print(
+            f"fast/full: {float(fast['bytes']) / float(full['bytes']):.1%} of bytes, "
+            f"{float(fast['seconds']) / max(float(full['seconds']), 1e-9):.1%} of time"
+        )
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = OUTPUT_DIR / "inventory.json"
+    out_path.write_text(json.dumps({"serial": args.serial, **report}, indent=2))
+    log.info(f"Inventory benchmark written to {out_path}")
+    return 0 if full["packages"] and fast["packages"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
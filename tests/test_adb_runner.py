@@ -14,3 +14,98 @@ def test_run_adb_command_errors_on_multiple(monkeypatch):
     res = adb_runner.run_adb_command(None, ['shell', 'id'])
     assert not res['success']
     assert 'Multiple devices' in res['error']
+
+
+def test_stream_adb_command_pumps_chunks(monkeypatch):
+    import sys
+
+    monkeypatch.setattr(adb_runner, '_resolve_device', lambda serial, args, log_errors: (serial, None))
+    monkeypatch.setattr(
+        adb_runner,
+        'build_adb_command',
+        lambda serial, args: [sys.executable, '-c', 'import sys; sys.stdout.buffer.write(b"x" * 2500)'],
+    )
+    chunks = []
+    res = adb_runner.stream_adb_command('SER', ['exec-out', 'cat', '/f'], chunks.append, chunk_size=1000)
+    assert res['success'] and res['bytes'] == 2500
+    assert b''.join(chunks) == b'x' * 2500
+    assert max(len(c) for c in chunks) <= 1000
+
+    monkeypatch.setattr(
+        adb_runner,
+        'build_adb_command',
+        lambda serial, args: [sys.executable, '-c', 'import sys; sys.stderr.write("nope"); sys.exit(3)'],
+    )
+    res = adb_runner.stream_adb_command('SER', ['exec-out', 'cat', '/f'], chunks.append, log_errors=False)
+    assert not res['success'] and 'nope' in res['error']
+
+
+def _gzip_stream(monkeypatch, payload, rc=0):
+    import gzip
+
+    def fake_stream(serial, args, on_chunk, **kwargs):
+        if isinstance(payload, bytes):
+            data = payload
+        else:
+            data = gzip.compress(payload.encode()) + f'\nGF_RC={rc}\n'.encode()
+        for i in range(0, len(data), 7):
+            on_chunk(data[i : i + 7])
+        return {'success': True, 'output': '', 'error': '', 'bytes': len(data)}
+
+    monkeypatch.setattr(adb_runner, 'stream_adb_command', fake_stream)
+    monkeypatch.setattr(adb_runner, '_gzip_support', {'SER': True})
+
+
+def test_compressed_command_inflates_and_keeps_gzip(monkeypatch, tmp_path):
+    import gzip
+
+    _gzip_stream(monkeypatch, 'Package [a]\nPackage [b]\n')
+    raw = tmp_path / 'dumpsys.txt.gz'
+    res = adb_runner.run_adb_command_compressed('SER', ['shell', 'dumpsys', 'package'], gzip_path=raw)
+    assert res['success'] and res['compressed']
+    assert res['output'] == 'Package [a]\nPackage [b]'
+    assert gzip.decompress(raw.read_bytes()) == b'Package [a]\nPackage [b]\n'
+
+
+def test_compressed_command_falls_back_on_bad_stream(monkeypatch, tmp_path):
+    _gzip_stream(monkeypatch, b'gzip: not found\n')
+    monkeypatch.setattr(
+        adb_runner,
+        'run_adb_command',
+        lambda serial, args, **kwargs: {'success': True, 'output': 'plain', 'error': ''},
+    )
+    raw = tmp_path / 'logcat.txt.gz'
+    res = adb_runner.run_adb_command_compressed('SER', ['logcat', '-d'], gzip_path=raw)
+    assert res == {'success': True, 'output': 'plain', 'error': '', 'compressed': False, 'raw_path': ''}
+    assert not raw.exists()
+
+
+def test_compressed_command_falls_back_when_remote_command_fails(monkeypatch, tmp_path):
+    _gzip_stream(monkeypatch, '', rc=1)
+    monkeypatch.setattr(
+        adb_runner,
+        'run_adb_command',
+        lambda serial, args, **kwargs: {'success': False, 'output': '', 'error': 'Command failed'},
+    )
+    raw = tmp_path / 'dumpsys.txt.gz'
+    res = adb_runner.run_adb_command_compressed('SER', ['shell', 'dumpsys', 'nosuchservice'], gzip_path=raw)
+    assert not res['success'] and not res['compressed']
+    assert res['error'] == 'Command failed'
+    assert not raw.exists()
+
+
+def test_compressed_script_reports_remote_exit_status():
+    import shutil
+    import subprocess
+    import zlib
+
+    if not shutil.which('sh') or not shutil.which('gzip'):
+        return
+    for remote, expected in (("printf 'ok'", b'0'), ('exit 3', b'3')):
+        out = subprocess.run(
+            ['sh', '-c', adb_runner._compressed_script(remote)], capture_output=True
+        ).stdout
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        inflater.decompress(out)
+        assert inflater.eof
+        assert adb_runner._RC_TRAILER.search(inflater.unused_data).group(1) == expected
@@ -27,3 +27,50 @@ def test_analyze_apk_reports_steps(monkeypatch, capsys):
     assert 'Found 1 permission' in out
     assert 'APK metadata extraction complete' in out
     assert meta['name'] == 'com.example'
+
+
+def test_analyze_remote_apk_reads_only_triage_members(monkeypatch, tmp_path):
+    import io
+    import zipfile
+
+    from utils.adb_utils import remote_zip
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('AndroidManifest.xml', b'<manifest/>')
+        zf.writestr('resources.arsc', b'res')
+        zf.writestr('META-INF/CERT.RSA', b'sig')
+        zf.writestr('classes.dex', b'dex' * 10000)
+    data = buf.getvalue()
+    opened = []
+
+    def fake_open(serial, path):
+        opened.append((serial, path))
+        return remote_zip.RemoteZip(lambda off, n: data[off : off + n], len(data), path)
+
+    badged = []
+
+    def fake_analyze_apk(path):
+        with zipfile.ZipFile(path) as zf:
+            badged.append(sorted(zf.namelist()))
+        return {'name': 'com.example'}
+
+    monkeypatch.setattr(remote_zip.RemoteZip, 'open', staticmethod(fake_open))
+    monkeypatch.setattr(apk_analysis, 'analyze_apk', fake_analyze_apk)
+
+    meta = apk_analysis.analyze_remote_apk('SER', '/data/app/x/base.apk', tmp_path)
+
+    assert opened == [('SER', '/data/app/x/base.apk')]
+    assert badged == [['AndroidManifest.xml', 'META-INF/CERT.RSA', 'resources.arsc']]
+    assert meta == {'name': 'com.example', 'signature_files': 'META-INF/CERT.RSA'}
+
+
+def test_analyze_remote_apk_reports_read_errors(monkeypatch, tmp_path, capsys):
+    from utils.adb_utils import remote_zip
+
+    def fake_open(serial, path):
+        raise remote_zip.RemoteZipError('not a zip file')
+
+    monkeypatch.setattr(remote_zip.RemoteZip, 'open', staticmethod(fake_open))
+    assert apk_analysis.analyze_remote_apk('SER', '/data/app/x/base.apk', tmp_path) == {}
+    assert 'Could not read /data/app/x/base.apk remotely' in capsys.readouterr().out
@@ -0,0 +1,89 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import batch_cli
+from analysis.static_analysis import run_static_analysis
+from analysis.static_analysis.package_analysis import PackageReport
+from database import artifact_index, run_catalog
+
+
+def _report(name, sha, artifacts):
+    return PackageReport(name, "User", [], [], 0, apk_hash=sha, artifacts=artifacts)
+
+
+def test_index_search_and_incremental_skip(tmp_path):
+    path = run_catalog.catalog_path(tmp_path)
+    reports = [
+        _report("com.x", "aa", ["https://api.example.com/v1", "AKIAABCDEF123"]),
+        _report("com.y", "bb", ["http://other.org"]),
+        _report("com.z", None, ["https://api.example.com/z"]),
+    ]
+    run_catalog.record_run(tmp_path, "SER", tmp_path / "SER" / "20240101_000000", reports)
+
+    assert artifact_index.index_run(tmp_path, reports) == 4
+    # Same hashes reported again (e.g. another device) are not re-indexed
+    assert artifact_index.index_run(tmp_path, [_report("com.x", "aa", ["new"])]) == 0
+
+    with artifact_index.ArtifactIndex(path) as index:
+        assert index.fts
+        hits = index.search("api.example.com")
+        assert [(h["package"], h["sha256"], h["devices"]) for h in hits] == [
+            ("com.x", "aa", "SER"),
+            ("com.z", None, None),
+        ]
+        assert [h["artifact"] for h in index.search("AKIA", prefix=True)] == ["AKIAABCDEF123"]
+        assert index.search("AKIA") == []
+
+        index.fts = False  # LIKE fallback
+        assert len(index.search("example.com")) == 2
+
+
+def test_search_subcommand_reindexes_history(tmp_path):
+    reports_dir = tmp_path / "SER" / "20240101_000000" / "reports"
+    reports_dir.mkdir(parents=True)
+    run_static_analysis.save_results_json(
+        [_report("com.x", "aa", ["https://tracker.example.net"])], reports_dir
+    )
+    (tmp_path / "SER" / "latest").symlink_to("20240101_000000")
+
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    batch_cli.register_subcommands(parser)
+    args = parser.parse_args(
+        ["search", "tracker.example.net", "--reindex", "--output-dir", str(tmp_path)]
+    )
+    out = io.StringIO()
+    assert batch_cli.run(args, stdout=out) == 0
+    assert [r["package"] for r in json.loads(out.getvalue())] == ["com.x"]
+
+
+def test_search_reindex_writes_into_the_db_being_queried(tmp_path):
+    results = tmp_path / "results"
+    reports_dir = results / "SER" / "20240101_000000" / "reports"
+    reports_dir.mkdir(parents=True)
+    run_static_analysis.save_results_json(
+        [_report("com.x", "aa", ["https://tracker.example.net"])], reports_dir
+    )
+    db = tmp_path / "elsewhere" / "index.sqlite"
+
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    batch_cli.register_subcommands(parser)
+    args = parser.parse_args(
+        [
+            "search", "tracker.example.net", "--reindex",
+            "--db", str(db), "--output-dir", str(results),
+        ]
+    )
+    out = io.StringIO()
+    assert batch_cli.run(args, stdout=out) == 0
+    assert [r["package"] for r in json.loads(out.getvalue())] == ["com.x"]
+    assert not run_catalog.catalog_path(db.parent).exists()
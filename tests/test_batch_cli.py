@@ -0,0 +1,157 @@
+import argparse
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import batch_cli
+from analysis.static_analysis import run_static_analysis
+from utils.adb_utils.adb_devices import DeviceInfo
+
+
+def _parse(argv):
+    parser = argparse.ArgumentParser()
+    batch_cli.register_subcommands(parser)
+    return parser.parse_args(argv)
+
+
+def _devices(*serials):
+    return [DeviceInfo(serial=s, state="device", model="m", type="Physical") for s in serials]
+
+
+def test_hash_command_emits_json_for_each_device(monkeypatch, capsys):
+    from analysis.static_analysis import package_analysis
+
+    monkeypatch.setattr(batch_cli, "get_connected_devices", lambda: _devices("A", "B"))
+    monkeypatch.setattr(
+        package_analysis, "get_installed_apk_paths", lambda serial: {"pkg": "/p.apk"}
+    )
+    monkeypatch.setattr(
+        package_analysis,
+        "compute_apk_hashes",
+        lambda serial, apk_map: {"pkg": f"hash-{serial}"},
+    )
+
+    out = io.StringIO()
+    code = batch_cli.run(_parse(["hash", "--jobs", "2"]), stdout=out)
+
+    assert code == 0
+    payload = json.loads(out.getvalue())
+    assert payload["command"] == "hash"
+    assert [d["serial"] for d in payload["devices"]] == ["A", "B"]
+    assert payload["devices"][1]["rows"] == [
+        {"package": "pkg", "apk_path": "/p.apk", "sha256": "hash-B"}
+    ]
+    # Nothing but the results should reach stdout
+    assert capsys.readouterr().out == ""
+
+
+def test_devices_filter_and_csv_output(monkeypatch):
+    from analysis.static_analysis import social_app_finder
+    from analysis.static_analysis.social_app_finder import SocialApp
+
+    monkeypatch.setattr(batch_cli, "get_connected_devices", lambda: _devices("A", "B"))
+    monkeypatch.setattr(
+        social_app_finder,
+        "find_social_apps",
+        lambda serial, apk_csv="apk_list.csv": [SocialApp("com.x", "X", ["/a", "/b"], None, {})],
+    )
+
+    out = io.StringIO()
+    code = batch_cli.run(_parse(["social", "--devices", "B", "--output-format", "csv"]), stdout=out)
+
+    assert code == 0
+    assert out.getvalue().splitlines() == ["serial,package,app_name,apk_paths", "B,com.x,X,/a;/b"]
+
+
+def test_failing_device_sets_exit_code(monkeypatch):
+    from analysis.static_analysis import package_analysis
+
+    monkeypatch.setattr(batch_cli, "get_connected_devices", lambda: _devices("A"))
+    monkeypatch.setattr(package_analysis, "get_installed_apk_paths", lambda serial: {})
+
+    out = io.StringIO()
+    code = batch_cli.run(_parse(["hash", "--output-format", "jsonl"]), stdout=out)
+
+    assert code == 1
+    line = json.loads(out.getvalue())
+    assert line["serial"] == "A" and "No APKs" in line["error"]
+
+
+def test_no_devices_returns_2(monkeypatch):
+    monkeypatch.setattr(batch_cli, "get_connected_devices", lambda: [])
+    out = io.StringIO()
+    assert batch_cli.run(_parse(["hash"]), stdout=out) == 2
+
+
+def test_load_previous_artifacts_reads_latest_results(tmp_path):
+    reports_dir = tmp_path / "SER" / "20240101_000000" / "reports"
+    reports_dir.mkdir(parents=True)
+    run_static_analysis.save_results_json(
+        [{"name": "pkg", "apk_hash": "abc", "artifacts": ["http://x"]}], reports_dir
+    )
+    (tmp_path / "SER" / "latest").symlink_to("20240101_000000")
+
+    known = run_static_analysis.load_previous_artifacts("SER", tmp_path)
+    assert known == {"abc": ["http://x"]}
+    assert run_static_analysis.load_previous_artifacts("OTHER", tmp_path) == {}
+
+
+def test_incremental_is_an_analyze_only_option():
+    import argparse
+
+    import pytest
+
+    parser = argparse.ArgumentParser()
+    batch_cli.register_subcommands(parser)
+    assert parser.parse_args(["analyze", "--incremental"]).incremental is True
+    with pytest.raises(SystemExit):
+        parser.parse_args(["hash", "--incremental"])
+
+
+def test_scan_strings_prints_one_failure_summary_for_all_devices(monkeypatch):
+    from analysis.static_analysis import string_finder
+
+    def fake_find(serial, pkg):
+        string_finder._record_failure(pkg, "pull", f"{serial} denied")
+        return []
+
+    summaries = []
+
+    def fake_summary(debug=False):
+        summaries.append(string_finder.get_failure_counts())
+        string_finder._failure_counts.clear()
+        string_finder._failure_details.clear()
+
+    monkeypatch.setattr(batch_cli, "get_connected_devices", lambda: _devices("A", "B", "C"))
+    monkeypatch.setattr(string_finder, "find_artifacts", fake_find)
+    monkeypatch.setattr(string_finder, "print_failure_summary", fake_summary)
+
+    out = io.StringIO()
+    code = batch_cli.run(_parse(["scan-strings", "--package", "com.x", "--jobs", "3"]), stdout=out)
+
+    assert code == 0
+    assert summaries == [{"pull": 3}]
+
+
+def test_interrupted_run_still_drains_db_writer(monkeypatch):
+    from database import db_writer
+
+    drained = []
+
+    def interrupted(command, serials, args):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(batch_cli, "get_connected_devices", lambda: _devices("A"))
+    monkeypatch.setattr(batch_cli, "execute", interrupted)
+    monkeypatch.setattr(db_writer, "drain", lambda timeout=30.0: drained.append(True))
+
+    with pytest.raises(KeyboardInterrupt):
+        batch_cli.run(_parse(["hash"]), stdout=io.StringIO())
+    assert drained == [True]
@@ -0,0 +1,223 @@
+import csv
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import collection
+
+DUMPSYS = """Packages:
+  Package [com.example.app] (1a2b3c):
+    userId=10123
+    versionCode=42 minSdk=21 targetSdk=33
+    versionName=1.2.3
+    installerPackageName=com.android.vending
+Hidden system packages:
+  Package [com.example.app] (4d5e6f):
+    versionCode=1 minSdk=21 targetSdk=30
+    versionName=0.1
+Packages:
+  Package [com.example.sys] (7a8b9c):
+    versionCode=7 minSdk=21 targetSdk=34
+    installerPackageName=null
+"""
+
+
+def test_hash_file_computes_all_digests_in_one_pass(tmp_path):
+    data = b"apk-bytes" * 1000
+    path = tmp_path / "base.apk"
+    path.write_bytes(data)
+
+    digests = collection.hash_file(path, chunk_size=64)
+    assert digests == {
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "sha1": hashlib.sha1(data).hexdigest(),
+        "md5": hashlib.md5(data).hexdigest(),
+        "size": len(data),
+    }
+
+
+def test_parse_dumpsys_packages_keeps_first_values():
+    meta = collection.parse_dumpsys_packages(DUMPSYS)
+    assert meta["com.example.app"] == collection.PackageMeta("1.2.3", "42", "33", "com.android.vending")
+    assert meta["com.example.sys"].installer == "unknown"
+    assert meta["com.example.sys"].version == "unknown"
+
+
+def test_harvest_streams_reports(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_run_adb_command(serial, args, **kwargs):
+        calls.append(args)
+        if args[0] == "shell" and args[1].startswith("dumpsys"):
+            return {"success": True, "output": DUMPSYS, "error": ""}
+        if args[:3] == ["shell", "pm", "path"]:
+            if args[3] == "com.example.app":
+                return {"success": True, "output": "package:/data/app/x/base.apk\npackage:/system/app/x/split.apk", "error": ""}
+            return {"success": True, "output": "", "error": ""}
+        return {"success": False, "output": "", "error": "unexpected"}
+
+    def fake_stream(serial, args, on_chunk, **kwargs):
+        data = args[1].split()[1].encode()  # the remote path doubles as content
+        on_chunk(data)
+        return {"success": True, "output": "", "error": "", "bytes": len(data)}
+
+    monkeypatch.setattr(collection, "run_adb_command", fake_run_adb_command)
+    monkeypatch.setattr(collection, "stream_adb_command", fake_stream)
+    monkeypatch.setattr(collection, "remote_size", lambda serial, remote: len(remote))
+    monkeypatch.setattr(
+        collection, "hash_file", lambda path: (_ for _ in ()).throw(AssertionError("re-read"))
+    )
+    records = collection.harvest(
+        "SER", ["com.example.app", "com.missing"], tmp_path / "apks", tmp_path / "reports"
+    )
+
+    assert sum(1 for a in calls if a[0] == "shell" and a[1].startswith("dumpsys")) == 1
+    assert not any(a[0] == "pull" for a in calls)
+    assert records[0].md5 == hashlib.md5(b"/data/app/x/base.apk").hexdigest()
+    assert [r.installType for r in records] == ["user", "system"]
+    assert records[0].sha1 == hashlib.sha1(b"/data/app/x/base.apk").hexdigest()
+    csv_path = next((tmp_path / "reports").glob("apks_report_*.csv"))
+    rows = list(csv.DictReader(csv_path.open()))
+    assert [r["versionCode"] for r in rows] == ["42", "42"]
+    doc = json.loads(csv_path.with_suffix(".json").read_text())
+    assert [d["file"] for d in doc] == [r.file for r in records]
+
+
+def test_collect_hashes_while_streaming(monkeypatch, tmp_path):
+    blobs = {"/data/app/x/base.apk": b"base" * 4096, "/data/app/x/split.apk": b""}
+
+    def fake_stream(serial, args, on_chunk, **kwargs):
+        remote = args[1].split()[1]
+        data = blobs[remote]
+        for i in range(0, len(data), 1000):
+            on_chunk(data[i : i + 1000])
+        return {"success": True, "output": "", "error": "", "bytes": len(data)}
+
+    def fake_run_adb_command(serial, args, **kwargs):
+        if args[0] == "pull":  # fallback for the file streaming could not read
+            Path(args[2]).write_bytes(b"pulled")
+            return {"success": True, "output": "", "error": ""}
+        if args[:3] == ["shell", "pm", "path"]:
+            return {"success": True, "output": "\n".join(f"package:{p}" for p in blobs), "error": ""}
+        return {"success": False, "output": "", "error": "unexpected"}
+
+    monkeypatch.setattr(collection, "stream_adb_command", fake_stream)
+    monkeypatch.setattr(collection, "remote_size", lambda serial, remote: len(blobs[remote]))
+    monkeypatch.setattr(collection, "run_adb_command", fake_run_adb_command)
+    monkeypatch.chdir(tmp_path)
+
+    records = collection.collect("SER", ["com.x"], jobs=1)
+
+    assert [r[2] for r in records] == [
+        hashlib.sha256(blobs["/data/app/x/base.apk"]).hexdigest(),
+        hashlib.sha256(b"pulled").hexdigest(),
+    ]
+    assert Path("apks/com.x/base.apk").read_bytes() == blobs["/data/app/x/base.apk"]
+    lines = Path("apks/com.x/com.x.sha256.txt").read_text().splitlines()
+    assert [line.split()[1] for line in lines] == ["base.apk", "split.apk"]
+
+
+def test_collect_resumes_from_manifest(monkeypatch, tmp_path):
+    blobs = {
+        "com.a": {"/data/app/a/base.apk": b"a-base", "/data/app/a/split_config.apk": b"a-split"},
+        "com.b": {"/data/app/b/base.apk": b"b-base"},
+    }
+    streamed = []
+
+    def fake_run_adb_command(serial, args, **kwargs):
+        paths = blobs.get(args[-1], {})
+        return {"success": True, "output": "\n".join(f"package:{p}" for p in paths), "error": ""}
+
+    def fake_stream(serial, args, on_chunk, **kwargs):
+        remote = args[1].split()[1]
+        data = next(files[remote] for files in blobs.values() if remote in files)
+        streamed.append(remote)
+        on_chunk(data)
+        return {"success": True, "output": "", "error": "", "bytes": len(data)}
+
+    monkeypatch.setattr(collection, "run_adb_command", fake_run_adb_command)
+    monkeypatch.setattr(collection, "stream_adb_command", fake_stream)
+    monkeypatch.setattr(
+        collection,
+        "remote_size",
+        lambda serial, remote: next(len(f[remote]) for f in blobs.values() if remote in f),
+    )
+    apks, reports = tmp_path / "apks", tmp_path / "reports"
+
+    first = collection.collect("SER", ["com.a", "com.b"], jobs=3, out_dir=apks, reports_dir=reports)
+    assert len(first) == 3 and len(streamed) == 3
+
+    # Corrupt one split; only it is fetched again and the CSV has no duplicates
+    (apks / "com.a" / "split_config.apk").write_bytes(b"garbage")
+    streamed.clear()
+    second = collection.collect("SER", ["com.a", "com.b"], jobs=3, out_dir=apks, reports_dir=reports)
+
+    assert streamed == ["/data/app/a/split_config.apk"]
+    assert second == first
+    rows = list(csv.reader((reports / "pulled_apks.csv").open()))
+    assert len(rows) == 4
+    manifest = json.loads((reports / "pulled_apks.manifest.json").read_text())
+    assert manifest["entries"]["com.a/base.apk"]["sha256"] == hashlib.sha256(b"a-base").hexdigest()
+    assert len((apks / "com.a" / "com.a.sha256.txt").read_text().splitlines()) == 2
+
+
+def test_collect_drops_entries_whose_repull_fails(monkeypatch, tmp_path):
+    blobs = {"/data/app/a/base.apk": b"a-base", "/data/app/a/split.apk": b"a-split"}
+    failing = set()
+
+    def fake_run_adb_command(serial, args, **kwargs):
+        if args[0] == "pull":
+            return {"success": False, "output": "", "error": "device offline"}
+        return {"success": True, "output": "\n".join(f"package:{p}" for p in blobs), "error": ""}
+
+    def fake_stream(serial, args, on_chunk, **kwargs):
+        remote = args[1].split()[1]
+        if remote in failing:
+            return {"success": False, "output": "", "error": "device offline", "bytes": 0}
+        on_chunk(blobs[remote])
+        return {"success": True, "output": "", "error": "", "bytes": len(blobs[remote])}
+
+    monkeypatch.setattr(collection, "run_adb_command", fake_run_adb_command)
+    monkeypatch.setattr(collection, "stream_adb_command", fake_stream)
+    monkeypatch.setattr(collection, "remote_size", lambda serial, remote: len(blobs[remote]))
+    apks, reports = tmp_path / "apks", tmp_path / "reports"
+    collection.collect("SER", ["com.a"], out_dir=apks, reports_dir=reports)
+
+    (apks / "com.a" / "base.apk").write_bytes(b"garbage")
+    failing.add("/data/app/a/base.apk")
+    records = collection.collect("SER", ["com.a"], out_dir=apks, reports_dir=reports)
+
+    assert not (apks / "com.a" / "base.apk").exists()
+    assert [Path(r[1]).name for r in records] == ["split.apk"]
+    rows = list(csv.reader((reports / "pulled_apks.csv").open()))
+    assert [Path(r[1]).name for r in rows[1:]] == ["split.apk"]
+    manifest = json.loads((reports / "pulled_apks.manifest.json").read_text())
+    assert list(manifest["entries"]) == ["com.a/split.apk"]
+    assert (apks / "com.a" / "com.a.sha256.txt").read_text().split()[1] == "split.apk"
+
+
+def test_stream_pull_falls_back_to_adb_pull_on_short_stream(monkeypatch, tmp_path):
+    data = b"full-apk-contents"
+
+    def fake_stream(serial, args, on_chunk, **kwargs):
+        on_chunk(data[:5])  # connection dropped partway through
+        return {"success": True, "output": "", "error": "", "bytes": 5}
+
+    def fake_run_adb_command(serial, args, **kwargs):
+        assert args[0] == "pull"
+        Path(args[2]).write_bytes(data)
+        return {"success": True, "output": "", "error": ""}
+
+    monkeypatch.setattr(collection, "remote_size", lambda serial, remote: len(data))
+    monkeypatch.setattr(collection, "stream_adb_command", fake_stream)
+    monkeypatch.setattr(collection, "run_adb_command", fake_run_adb_command)
+
+    local = tmp_path / "base.apk"
+    digests = collection.stream_pull("SER", "/data/app/x/base.apk", local)
+    assert digests == {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+    assert local.read_bytes() == data
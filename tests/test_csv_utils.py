@@ -50,3 +50,48 @@ def test_report_formatter_writes_valid_csv(tmp_path):
     assert csv_utils.validate_apk_list(path)
     rows = csv_utils.read_apk_list(path)
     assert rows[0]["Package"] == "com.app"
+
+
+def test_write_csv_spilled_merge_matches_in_memory_sort(tmp_path):
+    import random
+
+    rnd = random.Random(7)
+    rows = [
+        {"Package": rnd.choice(["com.a", "COM.b", "com.c", None]), "APK_Path": f"/p{i}", "N": i}
+        for i in range(200)
+    ]
+    in_memory = tmp_path / "mem.csv"
+    spilled = tmp_path / "spill.csv"
+    csv_utils.write_csv(in_memory, rows, headers=["N"])
+    csv_utils.write_csv(spilled, (r for r in rows), headers=["N"], buffer_rows=16)
+
+    assert spilled.read_bytes() == in_memory.read_bytes()
+    # Equal keys keep input order (stable sort)
+    ns = [int(r["N"]) for r in csv_utils.read_apk_list(spilled) if r["Package"] == "com.a"]
+    assert ns == sorted(ns)
+
+
+def test_write_csv_returns_summary_with_inline_validation(tmp_path):
+    import hashlib
+
+    path = tmp_path / "out.csv"
+    summary = csv_utils.write_csv(
+        path,
+        [{"Package": "b", "APK_Path": ""}, {"Package": "a", "APK_Path": "/a"}],
+        headers=[],
+    )
+    data = path.read_bytes()
+    assert summary.rows == 2 and summary.bytes == len(data)
+    assert summary.sha256 == hashlib.sha256(data).hexdigest()
+    assert not summary.valid and summary.errors == ["missing data at row 2"]
+
+
+def test_write_csv_report_does_not_reread(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "packages.csv"
+    monkeypatch.setattr(csv_utils, "read_apk_list", None)
+    monkeypatch.setattr(csv_utils, "validate_apk_list", None)
+    summary = report_formatter.write_csv_report(
+        [DummyReport("com.app", "/app.apk", "util", 5)], str(path)
+    )
+    assert summary.valid and summary.rows == 1
+    assert "Wrote 1 report row(s)" in capsys.readouterr().out
@@ -0,0 +1,105 @@
+import sys
+import threading
+import types
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+# Provide stub mysql modules so the database package imports without the real driver
+fake_mysql = types.ModuleType("mysql")
+fake_mysql.connector = types.ModuleType("mysql.connector")
+fake_mysql.connector.Error = Exception
+fake_mysql.connector.errorcode = types.SimpleNamespace()
+fake_mysql.connector.connect = mock.Mock()
+pooling = types.ModuleType("mysql.connector.pooling")
+pooling.MySQLConnectionPool = mock.Mock()
+sys.modules.setdefault("mysql", fake_mysql)
+sys.modules.setdefault("mysql.connector", fake_mysql.connector)
+sys.modules.setdefault("mysql.connector.pooling", pooling)
+
+from database import db_core
+from utils.perf_utils import metrics
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    conns = []
+
+    def fake_connect(**cfg):
+        conn = mock.Mock(in_transaction=False, _cnx=None)
+        conns.append(conn)
+        return conn
+
+    monkeypatch.setattr(db_core.mysql.connector, "connect", fake_connect)
+    return conns
+
+
+def test_checkout_skips_ping_within_idle_window(opened):
+    pool = db_core.ConnectionPool({}, ping_idle=60, max_size=2)
+
+    for _ in range(3):
+        with pool.connection():
+            pass
+
+    assert len(opened) == 1
+    raw = opened[0]
+    assert raw.ping.call_count == 1
+    assert raw.rollback.call_count == 0 and raw.close.call_count == 0
+
+    pool._idle.idle_seconds = 0
+    raw.in_transaction = True
+    with pool.connection():
+        pass
+    assert raw.ping.call_count == 2
+    assert raw.rollback.call_count == 1
+
+
+def test_pool_grows_to_max_then_times_out(opened):
+    pool = db_core.ConnectionPool({}, min_size=1, max_size=2, checkout_timeout=0.05)
+
+    with metrics.session() as reg:
+        with pool.connection(), pool.connection():
+            assert len(opened) == 2
+            assert pool.stats()["in_use"] == 2
+            with pytest.raises(db_core.PoolExhaustedError):
+                with pool.connection():
+                    pass
+
+    stats = pool.stats()
+    assert stats["exhaustion_events"] == 1 and stats["timeouts"] == 1
+    assert stats["idle"] == 2 and stats["in_use"] == 0
+    assert reg.get("gf_db_pool_exhausted_total").value(pool="default_pool") == 1
+    assert reg.get("gf_db_pool_checkout_seconds").count(pool="default_pool") == 2
+
+
+def test_waiting_checkout_gets_returned_connection(opened):
+    pool = db_core.ConnectionPool({}, max_size=1, checkout_timeout=5)
+    got = []
+
+    with pool.connection() as first:
+        worker = threading.Thread(target=lambda: got.append(pool._checkout()))
+        worker.start()
+        worker.join(0.05)
+        assert not got
+    worker.join(5)
+
+    assert got == [first]
+    assert pool.stats()["checkout_latency_max"] > 0
+
+
+def test_idle_connections_shrink_to_min(opened):
+    pool = db_core.ConnectionPool({}, min_size=1, max_size=3, idle_timeout=0)
+
+    with pool.connection(), pool.connection(), pool.connection():
+        pass
+    with pool.connection():
+        pass
+
+    stats = pool.stats()
+    assert stats["opened"] == 3
+    assert stats["size"] == 1 and stats["closed"] == 2
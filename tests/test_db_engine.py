@@ -0,0 +1,122 @@
+import sys
+import types
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+# Provide stub mysql modules so the database package imports without the real driver
+fake_mysql = types.ModuleType("mysql")
+fake_mysql.connector = types.ModuleType("mysql.connector")
+fake_mysql.connector.Error = Exception
+fake_mysql.connector.errorcode = types.SimpleNamespace()
+fake_mysql.connector.connect = mock.Mock()
+pooling = types.ModuleType("mysql.connector.pooling")
+pooling.MySQLConnectionPool = mock.Mock()
+sys.modules.setdefault("mysql", fake_mysql)
+sys.modules.setdefault("mysql.connector", fake_mysql.connector)
+sys.modules.setdefault("mysql.connector.pooling", pooling)
+
+from database.db_engine import DbEngine
+
+
+class FakeCursor:
+    def __init__(self, rows=()):
+        self.batches = []
+        self.rowcount = 0
+        self.kwargs = {}
+        self._rows = list(rows)
+        self.closed = False
+
+    def executemany(self, sql, params):
+        self.batches.append(params)
+        self.rowcount = len(params)
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchmany(self, size):
+        out, self._rows = self._rows[:size], self._rows[size:]
+        return out
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConn:
+    def __init__(self, rows=()):
+        self.cur = FakeCursor(rows)
+        self.commits = 0
+        self.consumed = False
+
+    def cursor(self, **kwargs):
+        self.cur.kwargs = kwargs
+        return self.cur
+
+    def commit(self):
+        self.commits += 1
+
+    def consume_results(self):
+        self.consumed = True
+
+
+class FakeCore:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @contextmanager
+    def connection(self):
+        yield self.conn
+
+
+def test_executemany_consumes_generator_in_chunks_with_progress():
+    conn = FakeConn()
+    engine = DbEngine(FakeCore(conn))
+    seen = []
+
+    def params():
+        for i in range(5):
+            yield (i,)
+
+    affected = engine.executemany(
+        "INSERT INTO t VALUES (%s)", params(), chunk_size=2, commit=True, progress=seen.append
+    )
+
+    assert affected == 5
+    assert [len(b) for b in conn.cur.batches] == [2, 2, 1]
+    assert seen == [2, 4, 5]
+    assert conn.commits == 1
+
+
+def test_executemany_commit_each_chunk():
+    conn = FakeConn()
+    engine = DbEngine(FakeCore(conn))
+    engine.executemany("INSERT INTO t VALUES (%s)", [(1,), (2,), (3,)], chunk_size=2, commit_each_chunk=True)
+    assert conn.commits == 2
+    with pytest.raises(ValueError):
+        engine.executemany("INSERT INTO t VALUES (%s)", [], chunk_size=0)
+
+
+def test_fetch_iter_streams_with_unbuffered_cursor():
+    conn = FakeConn(rows=[(i,) for i in range(5)])
+    engine = DbEngine(FakeCore(conn))
+
+    assert [len(b) for b in engine.stream("SELECT", batch_size=2)] == [2, 2, 1]
+    assert conn.cur.kwargs["buffered"] is False
+    assert conn.cur.closed and not conn.consumed
+
+
+def test_fetch_iter_discards_unread_rows_on_early_exit():
+    conn = FakeConn(rows=[(i,) for i in range(5)])
+    engine = DbEngine(FakeCore(conn))
+
+    rows = engine.fetch_iter("SELECT", batch_size=2)
+    assert next(rows) == (0,)
+    rows.close()
+    assert conn.consumed and conn.cur.closed
+
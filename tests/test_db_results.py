@@ -0,0 +1,114 @@
+import sys
+import types
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+# Provide stub mysql modules so the database package imports without the real driver
+fake_mysql = types.ModuleType("mysql")
+fake_mysql.connector = types.ModuleType("mysql.connector")
+fake_mysql.connector.Error = Exception
+fake_mysql.connector.errorcode = types.SimpleNamespace()
+fake_mysql.connector.connect = mock.Mock()
+pooling = types.ModuleType("mysql.connector.pooling")
+pooling.MySQLConnectionPool = mock.Mock()
+sys.modules.setdefault("mysql", fake_mysql)
+sys.modules.setdefault("mysql.connector", fake_mysql.connector)
+sys.modules.setdefault("mysql.connector.pooling", pooling)
+
+from analysis.static_analysis.package_analysis import PackageReport
+from database import db_results
+
+
+class FakeCursor:
+    def __init__(self):
+        self.calls = []
+        self.lastrowid = 7
+
+    def execute(self, sql, params=None):
+        self.calls.append((sql, params))
+
+
+class FakeEngine:
+    def __init__(self):
+        self.cursor = FakeCursor()
+        self.transactions = 0
+
+    @contextmanager
+    def transaction(self):
+        self.transactions += 1
+        yield self.cursor
+
+
+def _reports(n):
+    return [
+        PackageReport(
+            name=f"pkg{i}",
+            category="User",
+            permissions=["android.permission.CAMERA", "android.permission.INTERNET"],
+            dangerous_permissions=["android.permission.CAMERA"],
+            risk_score=1,
+            apk_hash=f"{i:064d}",
+            apk_path=f"/data/app/pkg{i}/base.apk",
+            artifacts=["http://x", "http://x"],
+        )
+        for i in range(n)
+    ]
+
+
+def test_build_upsert_multi_row_statement():
+    sql = db_results.build_upsert("t", ("a", "b"), 2, update_columns=("b",))
+    assert sql == (
+        "INSERT INTO `t` (`a`, `b`) VALUES (%s, %s), (%s, %s) "
+        "ON DUPLICATE KEY UPDATE `b` = VALUES(`b`)"
+    )
+
+
+def test_upsert_rows_chunks_parameters():
+    cur = FakeCursor()
+    sent = db_results.upsert_rows(cur, "t", ("a", "b"), [(i, i) for i in range(5)], chunk_size=2)
+
+    assert sent == 5
+    assert [len(params) for _, params in cur.calls] == [4, 4, 2]
+
+
+def test_save_run_writes_all_tables_in_one_transaction():
+    engine = FakeEngine()
+    run_id = db_results.save_run(engine, "SER", _reports(5), run_dir="out/SER/1", chunk_size=2)
+
+    assert run_id == 7
+    assert engine.transactions == 1
+    tables = [sql.split("`")[1] for sql, _ in engine.cursor.calls]
+    assert tables == (
+        ["gf_devices", "gf_runs"]
+        + ["gf_packages"] * 3
+        + ["gf_apk_hashes"] * 3
+        + ["gf_permissions"] * 5
+        + ["gf_artifacts"] * 3
+        + ["gf_runs"]
+    )
+    perm_params = engine.cursor.calls[8][1]
+    assert perm_params[:4] == (7, "pkg0", "android.permission.CAMERA", 1)
+    assert perm_params[4:8] == (7, "pkg0", "android.permission.INTERNET", 0)
+
+
+def test_save_run_can_use_load_data(tmp_path):
+    engine = FakeEngine()
+    seen = {}
+
+    def capture(sql, params=None):
+        if sql.startswith("LOAD DATA"):
+            seen[sql.split("`")[1]] = Path(params[0]).read_text()
+        engine.cursor.calls.append((sql, params))
+
+    engine.cursor.execute = capture
+    db_results.save_run(engine, "SER", _reports(2), use_load_data=True)
+
+    assert seen["gf_artifacts"].count("\n") == 2
+    assert seen["gf_permissions"].splitlines()[0] == (
+        '"7","pkg0","android.permission.CAMERA","1"'
+    )
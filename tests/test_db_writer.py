@@ -0,0 +1,103 @@
+import queue
+import sys
+import threading
+import types
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+# Provide stub mysql modules so the database package imports without the real driver
+fake_mysql = types.ModuleType("mysql")
+fake_mysql.connector = types.ModuleType("mysql.connector")
+fake_mysql.connector.Error = Exception
+fake_mysql.connector.errorcode = types.SimpleNamespace()
+fake_mysql.connector.connect = mock.Mock()
+pooling = types.ModuleType("mysql.connector.pooling")
+pooling.MySQLConnectionPool = mock.Mock()
+sys.modules.setdefault("mysql", fake_mysql)
+sys.modules.setdefault("mysql.connector", fake_mysql.connector)
+sys.modules.setdefault("mysql.connector.pooling", pooling)
+
+from database import db_results, db_writer
+
+
+class FakeEngine:
+    def with_retry(self, fn, **kwargs):
+        return fn()
+
+
+def test_writer_batches_by_size_and_drains_on_close(monkeypatch):
+    saved = []
+    monkeypatch.setattr(
+        db_results,
+        "save_run",
+        lambda engine, serial, reports, run_dir="": saved.append((serial, run_dir, list(reports))),
+    )
+    writer = db_writer.ResultWriter(FakeEngine(), batch_size=2, flush_interval=60)
+    for i in range(5):
+        writer.submit("SER", "run1", f"rep{i}")
+    writer.close(timeout=5)
+
+    assert [len(r) for _, _, r in saved] == [2, 2, 1]
+    assert sum((r for _, _, r in saved), []) == [f"rep{i}" for i in range(5)]
+    assert writer.stats()["written"] == 5
+    with pytest.raises(RuntimeError):
+        writer.submit("SER", "run1", "late")
+
+
+def test_writer_applies_backpressure_when_queue_full(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(db_results, "save_run", lambda *a, **k: release.wait(5))
+    writer = db_writer.ResultWriter(FakeEngine(), max_queue=1, batch_size=1, flush_interval=0.01)
+
+    writer.submit("SER", "run", "a")  # picked up by the writer, which then blocks
+    for _ in range(100):
+        if writer.stats()["queued"] == 0:
+            break
+        threading.Event().wait(0.01)
+    writer.submit("SER", "run", "b")  # fills the queue
+    with pytest.raises(queue.Full):
+        writer.submit("SER", "run", "c", timeout=0.05)
+    assert writer.stats()["backpressure_waits"] == 1
+
+    release.set()
+    writer.close(timeout=5)
+    assert writer.stats()["written"] == 2
+
+
+def test_failed_batches_are_counted(monkeypatch):
+    def boom(*a, **k):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(db_results, "save_run", boom)
+    writer = db_writer.ResultWriter(FakeEngine(), batch_size=10, flush_interval=0.01)
+    writer.submit("SER", "run", "a")
+    writer.flush()
+    writer.close(timeout=5)
+    assert writer.stats()["failed"] == 1
+
+
+def test_close_honours_timeout_when_queue_stays_full(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(db_results, "save_run", lambda *a, **k: release.wait(5))
+    writer = db_writer.ResultWriter(FakeEngine(), max_queue=1, batch_size=1, flush_interval=0.01)
+
+    writer.submit("SER", "run", "a")  # writer thread blocks on this one
+    for _ in range(100):
+        if writer.stats()["queued"] == 0:
+            break
+        threading.Event().wait(0.01)
+    writer.submit("SER", "run", "b")  # queue is now full
+
+    closer = threading.Thread(target=writer.close, kwargs={"timeout": 0.1})
+    closer.start()
+    closer.join(2)
+    assert not closer.is_alive()
+    release.set()
+    writer.flush()
+    assert writer.stats()["written"] == 2
@@ -9,7 +9,7 @@ import discovery
 
 
 def test_list_packages_fallback_to_adb(monkeypatch):
-    def fake_read_apk_list(_):
+    def fake_load(_):
         raise OSError
 
     def fake_run_adb_command(serial, args, **kwargs):
@@ -19,7 +19,7 @@ def test_list_packages_fallback_to_adb(monkeypatch):
             "error": "",
         }
 
-    monkeypatch.setattr(discovery, "read_apk_list", fake_read_apk_list)
+    monkeypatch.setattr(discovery.inventory, "load", fake_load)
     monkeypatch.setattr(discovery.adb_runner, "run_adb_command", fake_run_adb_command)
 
     packages, source = discovery.list_packages("SER", "missing.csv")
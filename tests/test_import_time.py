@@ -0,0 +1,48 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from scripts.benchmark.import_time import HEAVY_MODULES
+
+
+def _import_in_clean_interpreter(tmp_path, target):
+    code = (
+        f"import json, sys; import {target}; "
+        "print(json.dumps(sorted(sys.modules)))"
+    )
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    res = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=tmp_path,
+        env=env,
+        check=True,
+    )
+    return set(json.loads(res.stdout))
+
+
+def test_main_import_defers_heavy_modules(tmp_path):
+    loaded = _import_in_clean_interpreter(tmp_path, "main")
+    eager = [m for m in loaded if m in HEAVY_MODULES or m.split(".")[0] in HEAVY_MODULES]
+    assert eager == []
+    # Logging is configured on first use, not at import time
+    assert not (tmp_path / "logs").exists()
+
+
+def test_main_menu_import_defers_action_dependencies(tmp_path):
+    loaded = _import_in_clean_interpreter(tmp_path, "main_menu")
+    assert "database.db_menu" not in loaded
+    assert "device.device_menu" not in loaded
+    assert "utils.test_utils.test_runner" not in loaded
+
+
+def test_dex_features_import_defers_androguard(tmp_path):
+    loaded = _import_in_clean_interpreter(tmp_path, "analysis.dex_features")
+    assert "androguard" not in loaded
@@ -0,0 +1,74 @@
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import detection
+import discovery
+import inventory
+from utils import csv_utils
+
+ROWS = [
+    {"Package": "com.vendor.camera", "APK_Path": "/system/app/cam.apk", "Install_Tier": "system"},
+    {"Package": "com.vendor.gallery", "APK_Path": "/system/app/gal.apk", "Install_Tier": "system"},
+    {"Package": "com.whatsapp", "APK_Path": "/data/app/wa.apk", "Install_Tier": "data"},
+    {"Package": "org.example.discordbot", "APK_Path": "/data/app/bot.apk", "Install_Tier": "data"},
+]
+
+
+def _write(path, rows=ROWS):
+    csv_utils.write_csv(path, rows, headers=["Install_Tier"])
+    return path
+
+
+def test_indexes_answer_package_tier_and_prefix_queries(tmp_path):
+    inv = inventory.Inventory.from_csv(_write(tmp_path / "apk_list.csv"))
+
+    assert len(inv) == 4 and "com.whatsapp" in inv
+    assert inv.get("com.whatsapp")["APK_Path"] == "/data/app/wa.apk"
+    assert inv.get("missing") is None
+    assert [r["Package"] for r in inv.by_tier("data")] == ["com.whatsapp", "org.example.discordbot"]
+    assert inv.with_prefix("com.vendor.*") == ["com.vendor.camera", "com.vendor.gallery"]
+    assert inv.with_prefix("net.") == []
+    assert inv.package_paths()["com.vendor.camera"] == "/system/app/cam.apk"
+    assert inv.validate()
+
+
+def test_load_is_cached_until_file_changes(tmp_path, monkeypatch):
+    path = _write(tmp_path / "apk_list.csv")
+    inventory.clear_cache()
+    parses = []
+    real = inventory.Inventory.from_csv.__func__
+    monkeypatch.setattr(
+        inventory.Inventory,
+        "from_csv",
+        classmethod(lambda cls, p: parses.append(p) or real(cls, p)),
+    )
+
+    first = inventory.load(path)
+    assert inventory.load(path) is first
+    discovery.list_packages("SER", path)
+    assert len(parses) == 1
+
+    _write(path, ROWS[:1])
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert len(inventory.load(path)) == 1
+    assert len(parses) == 2
+
+
+def test_validate_flags_missing_data(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("Package,APK_Path\ncom.a,\n", encoding="utf-8")
+    assert not inventory.Inventory.from_csv(path).validate()
+
+
+def test_detect_uses_tier_index(tmp_path):
+    hits = detection.detect(_write(tmp_path / "apk_list.csv"), tmp_path / "found.csv")
+    assert [(h["Package"], h["Detected"]) for h in hits] == [
+        ("com.whatsapp", "Y"),
+        ("org.example.discordbot", "?"),
+    ]
@@ -0,0 +1,42 @@
+import csv
+import io
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import detection
+from config.social_detection import KEYWORD_TOKENS
+from utils.text_utils.keyword_automaton import KeywordAutomaton, compile_keywords
+
+
+def test_matches_overlapping_tokens_in_list_order():
+    automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+    assert automaton.matches("USHERS") == ["he", "she", "hers"]
+    assert automaton.first("ahishers") == "he"
+    assert automaton.matches("xyz") == []
+
+
+def test_agrees_with_substring_scan_on_config_tokens():
+    automaton = compile_keywords(KEYWORD_TOKENS)
+    for pkg in ["com.snapchat.android", "com.vk.lite", "org.example", "com.linkedin.lines"]:
+        expected = [t for t in KEYWORD_TOKENS if t in pkg.lower()]
+        assert automaton.matches(pkg) == expected
+    assert compile_keywords(list(KEYWORD_TOKENS)) is automaton
+
+
+def test_iter_hits_streams_csv_rows():
+    text = (
+        "Package,APK_Path,Install_Tier\n"
+        "com.snapchat.android,/a.apk,data\n"
+        "com.example.snaptool,/b.apk,data\n"
+        "com.example.snaptool2,/c.apk,system\n"
+        "com.example,/d.apk,data\n"
+    )
+    hits = list(detection.iter_hits(csv.DictReader(io.StringIO(text))))
+    assert [(h["Package"], h["Reason"], h["Matched_Tokens"]) for h in hits] == [
+        ("com.snapchat.android", "exact:com.snapchat.android", "snap;snapchat"),
+        ("com.example.snaptool", "keyword:snap", "snap"),
+    ]
@@ -0,0 +1,72 @@
+import logging
+import threading
+
+import pytest
+
+from utils.logging_utils.logging_core import LoggingCore
+
+
+class _CountingArg:
+    """Argument that records how often, and on which thread, it is formatted."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.current_thread())
+        return "counted"
+
+
+@pytest.fixture()
+def core(tmp_path):
+    core = LoggingCore(log_name="test", log_dir=str(tmp_path))
+    yield core
+    core.shutdown()
+
+
+def test_file_records_written_by_background_listener(core, tmp_path):
+    writers = []
+    original_emit = core.file_handler.emit
+    core.file_handler.emit = lambda record: (
+        writers.append(threading.current_thread()), original_emit(record)
+    )
+    core.get_logger().debug("value=%s count=%d", "x", 3)
+    core.flush()
+
+    content = (tmp_path / "test.log").read_text(encoding="utf-8")
+    assert "value=x count=3" in content
+    assert writers and all(t is not threading.current_thread() for t in writers)
+
+
+def test_mutable_args_are_formatted_at_call_time(core, tmp_path):
+    arg = _CountingArg()
+    state = {"step": 1}
+    logger = core.get_logger()
+    logger.debug("obj=%s state=%s", arg, state)
+    state["step"] = 2
+    logger.debug("mapping %(a)s", {"a": [1]})
+    core.flush()
+
+    content = (tmp_path / "test.log").read_text(encoding="utf-8")
+    assert "obj=counted state={'step': 1}" in content
+    assert "mapping [1]" in content
+    assert arg.threads and all(t is threading.current_thread() for t in arg.threads)
+
+
+def test_disabled_level_skips_formatting(core):
+    core.set_file_level(logging.INFO)
+    logger = core.get_logger()
+    assert not logger.isEnabledFor(logging.DEBUG)
+
+    arg = _CountingArg()
+    logger.debug("value=%s", arg)
+    core.flush()
+    assert arg.threads == []
+
+
+def test_console_level_lowers_root_level(core):
+    core.set_file_level(logging.WARNING)
+    core.set_console_level(logging.WARNING)
+    assert not core.get_logger().isEnabledFor(logging.INFO)
+    core.set_console_level(logging.INFO)
+    assert core.get_logger().isEnabledFor(logging.INFO)
@@ -0,0 +1,73 @@
+import json
+from types import SimpleNamespace
+
+from analysis.static_analysis import string_finder
+from utils.adb_utils import adb_runner
+from utils.perf_utils import metrics
+
+
+def test_prometheus_rendering_of_all_metric_types():
+    reg = metrics.MetricsRegistry()
+    reg.counter("jobs_total", "Jobs run").inc(2, kind="a")
+    reg.gauge("queue_depth").set(3.5)
+    hist = reg.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    hist.observe(0.05, op="x")
+    hist.observe(0.5, op="x")
+    hist.observe(5, op="x")
+
+    text = reg.render_prometheus()
+    assert "# HELP jobs_total Jobs run\n# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="a"} 2' in text
+    assert "queue_depth 3.5" in text
+    assert 'latency_seconds_bucket{op="x",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{op="x",le="1"} 2' in text
+    assert 'latency_seconds_bucket{op="x",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{op="x"} 3' in text
+
+
+def test_label_values_are_escaped():
+    reg = metrics.MetricsRegistry()
+    reg.counter("c").inc(path='a"b\\c')
+    assert 'c{path="a\\"b\\\\c"} 1' in reg.render_prometheus()
+
+
+def test_write_outputs_prom_and_json(tmp_path):
+    reg = metrics.MetricsRegistry()
+    reg.counter("c_total").inc()
+    prom, js = reg.write(tmp_path)
+    assert prom.read_text().endswith("c_total 1\n")
+    assert json.loads(js.read_text())["c_total"]["samples"][0]["value"] == 1
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_session_isolates_adb_and_failure_metrics(monkeypatch):
+    monkeypatch.setattr(
+        adb_runner.subprocess, "run", lambda cmd, **kw: SimpleNamespace(stdout="out")
+    )
+    with metrics.session() as reg:
+        adb_runner.execute_command(["adb", "-s", "S", "shell", "dumpsys", "package"])
+        string_finder._record_failure("pkg", "denied", "permission denied")
+        string_finder._failure_counts.clear()
+        string_finder._failure_details.clear()
+
+    assert reg.counter("gf_adb_commands_total").value(
+        subcommand="adb shell dumpsys", status="ok"
+    ) == 1
+    assert reg.histogram("gf_adb_command_duration_seconds").count(
+        subcommand="adb shell dumpsys"
+    ) == 1
+    assert reg.counter("gf_string_finder_failures_total").value(reason="denied") == 1
+    assert metrics.registry() is not reg
+
+
+def test_metrics_outside_a_session_are_not_retained():
+    assert metrics.active() is None
+    metrics.registry().counter("gf_unscoped_total").inc()
+    assert metrics.registry().get("gf_unscoped_total") is None
+
+
+def test_metric_base_class_is_abstract():
+    import pytest
+
+    with pytest.raises(TypeError):
+        metrics._Metric("x")
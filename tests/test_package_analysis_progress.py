@@ -16,8 +16,8 @@ def test_analyze_packages_shows_steps(monkeypatch, capsys):
     )
     monkeypatch.setattr(
         package_analysis,
-        'get_installed_apk_paths',
-        lambda s, raw_dir=None: {'pkg': 'path.apk'},
+        'get_install_matrix',
+        lambda s, raw_dir=None: package_analysis.InstallMatrix(paths={'pkg': 'path.apk'}),
     )
     monkeypatch.setattr(
         package_analysis,
@@ -36,3 +36,116 @@ def test_analyze_packages_shows_steps(monkeypatch, capsys):
     assert "Verifying APK availability" in out
     assert "Computing APK hashes" in out
     assert len(reports) == 1
+
+
+PM_OUTPUT = """Users:
+\tUserInfo{0:Owner:c13} running
+\tUserInfo{10:Work profile:1030} running
+@user 0
+package:/data/app/~~AbC==/com.whatsapp-XyZ==/base.apk=com.whatsapp uid:10123
+package:/system/app/Camera/Camera.apk=com.android.camera uid:10050
+@user 10
+package:/data/app/~~AbC==/com.whatsapp-XyZ==/base.apk=com.whatsapp uid:1010123
+package:/data/app/~~Q==/com.slack-R==/base.apk=com.slack uid:1010200
+"""
+
+
+def test_install_matrix_from_one_batched_command(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_run_adb_command(serial, args, **kwargs):
+        calls.append(args)
+        return {'success': True, 'output': PM_OUTPUT, 'error': ''}
+
+    monkeypatch.setattr(package_analysis, 'run_adb_command', fake_run_adb_command)
+    matrix = package_analysis.get_install_matrix('SER', raw_dir=tmp_path)
+
+    assert len(calls) == 1
+    assert matrix.users == {0: 'Owner', 10: 'Work profile'}
+    assert matrix.paths['com.whatsapp'] == '/data/app/~~AbC==/com.whatsapp-XyZ==/base.apk'
+    assert matrix.users_for('com.whatsapp') == [0, 10]
+    assert matrix.packages_for(10) == ['com.whatsapp', 'com.slack']
+    assert len((tmp_path / 'pm_list_packages.txt').read_text().splitlines()) == 3
+
+
+def test_install_matrix_accepts_all_users_uid_lists():
+    matrix = package_analysis.parse_install_matrix(
+        'package:/data/app/a/base.apk=com.a uid:10100,1010100\n'
+    )
+    assert matrix.users_for('com.a') == [0, 10]
+    assert set(matrix.users) == {0, 10}
+
+
+INVENTORY = (
+    "package:/data/app/~~a==/com.a-b==/base.apk=com.a versionCode:12 installer=com.android.vending uid:10100\n"
+    "package:/data/app/com.b-1/base.apk=com.b versionCode:3 installer=null uid:10101\n"
+    "package:/system/app/C/C.apk=com.c versionCode:1 installer=null uid:1000\n"
+    "package:/system/app/D/D.apk=com.d versionCode:1 installer=null uid:1000\n"
+)
+
+
+def test_parse_package_inventory():
+    inv = package_analysis.parse_package_inventory(INVENTORY)
+    assert inv['com.a'] == package_analysis.InventoryEntry(
+        '/data/app/~~a==/com.a-b==/base.apk', '12', 'com.android.vending', 10100
+    )
+    assert inv['com.b'].installer is None
+
+
+def test_fast_inventory_dumps_only_new_changed_or_missing(monkeypatch, capsys):
+    previous = {
+        'com.a': {'version_code': '11', 'permissions': ['old'], 'risk_score': 0},  # changed
+        'com.b': {'version_code': '3', 'permissions': ['p.B'], 'risk_score': 0},  # unchanged
+        'com.c': {'version_code': '1', 'permissions': None, 'risk_score': 0},  # no permissions
+        'com.d': {'version_code': '1', 'permissions': ['p.D'], 'risk_score': 0},  # unchanged
+    }
+    calls = []
+
+    def fake_run_adb_command(serial, args, **kwargs):
+        calls.append(args)
+        if args == ['shell', package_analysis._FAST_INVENTORY_CMD]:
+            return {'success': True, 'output': INVENTORY, 'error': ''}
+        if args[1].startswith('dumpsys package com.'):
+            return {
+                'success': True,
+                'output': (
+                    'Package [com.a] (1):\n uses-permission: p.A\n'
+                    'Package [com.c] (2):\n uses-permission: p.C2\n'
+                    'Hidden system packages:\nPackage [com.c] (3):\n uses-permission: stale\n'
+                ),
+                'error': '',
+            }
+        return {'success': False, 'output': '', 'error': 'unexpected'}
+
+    monkeypatch.setattr(package_analysis, 'run_adb_command', fake_run_adb_command)
+    monkeypatch.setattr(
+        package_analysis, 'compute_apk_hashes', lambda serial, apk_map: {}
+    )
+    monkeypatch.setattr(package_analysis, 'string_finder', None)
+    matrix = package_analysis.InstallMatrix(
+        paths={p: f'/{p}.apk' for p in ('com.a', 'com.b', 'com.c', 'com.d')}
+    )
+
+    reports = package_analysis.analyze_packages(
+        'SER', install_matrix=matrix, fast_inventory=True, previous_reports=previous
+    )
+
+    assert ['shell', 'dumpsys', 'package'] not in calls
+    assert calls[1] == ['shell', 'dumpsys package com.a; dumpsys package com.c']
+    perms = {r.name: r.permissions for r in reports}
+    assert perms == {'com.a': ['p.A'], 'com.b': ['p.B'], 'com.c': ['p.C2'], 'com.d': ['p.D']}
+    assert {r.name: r.version_code for r in reports}['com.a'] == '12'
+    assert 'Retrieving package inventory' in capsys.readouterr().out
+
+
+def test_unchanged_risky_packages_are_not_redumped():
+    inventory = package_analysis.parse_package_inventory(INVENTORY)
+    previous = {
+        pkg: {'version_code': entry.version_code, 'permissions': ['android.permission.CAMERA'], 'risk_score': 3}
+        for pkg, entry in inventory.items()
+    }
+    assert package_analysis.select_for_detail(inventory, previous) == []
+
+    previous['com.b']['version_code'] = '2'
+    del previous['com.d']
+    assert package_analysis.select_for_detail(inventory, previous) == ['com.b', 'com.d']
@@ -0,0 +1,62 @@
+import pstats
+
+from utils.perf_utils import profiling, tracing
+
+
+def _busy(n):
+    return sum(i * i for i in range(n))
+
+
+def test_stage_profiler_writes_reports_per_stage(tmp_path, capsys):
+    with tracing.session() as tracer:
+        profiler = profiling.StageProfiler(tmp_path / "profile", top_n=5)
+        tracer.add_stage_hook(profiler)
+        with tracing.span("outer"):
+            _busy(1000)
+            with tracing.span("inner"):
+                blob = [bytearray(1024) for _ in range(200)]
+                _busy(1000)
+            with tracing.span("adb", cat="adb"):
+                pass
+        written = profiler.finish()
+
+    names = sorted(p.name for p in written)
+    assert names == ["inner.alloc.txt", "inner.pstats", "outer.alloc.txt", "outer.pstats"]
+
+    inner = pstats.Stats(str(tmp_path / "profile" / "inner.pstats"))
+    funcs = {func for (_, _, func) in inner.stats}
+    assert "_busy" in funcs
+    # The inner stage pauses the outer profiler, so its list comprehension
+    # allocations are attributed to "inner" only.
+    assert profiler.top_allocations("inner")[0][1] >= 200 * 1024
+    assert "test_profiling.py" in (tmp_path / "profile" / "inner.alloc.txt").read_text()
+
+    out = capsys.readouterr().out
+    assert "Profile summary" in out and "inner" in out
+    del blob
+
+
+def test_stages_beyond_max_depth_fold_into_parent(tmp_path):
+    with tracing.session() as tracer:
+        profiler = profiling.StageProfiler(tmp_path, max_depth=0)
+        tracer.add_stage_hook(profiler)
+        with tracing.span("top"):
+            with tracing.span("per_package"):
+                _busy(100)
+        profiler.finish()
+
+    assert not (tmp_path / "per_package.pstats").exists()
+    top = pstats.Stats(str(tmp_path / "top.pstats"))
+    assert "_busy" in {func for (_, _, func) in top.stats}
+
+
+def test_tracemalloc_stays_on_until_last_profiler_finishes(tmp_path):
+    import tracemalloc
+
+    assert not tracemalloc.is_tracing()
+    first = profiling.StageProfiler(tmp_path / "a")
+    second = profiling.StageProfiler(tmp_path / "b")
+    first.finish()
+    assert tracemalloc.is_tracing()
+    second.finish()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,58 @@
+import io
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from utils.adb_utils import remote_zip
+
+
+def _apk_bytes():
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("AndroidManifest.xml", b"<manifest/>" * 50)
+        zf.writestr("classes.dex", b"dex\n035" + bytes(200))
+        zf.writestr("META-INF/CERT.RSA", b"cert")
+        zf.writestr(zipfile.ZipInfo("lib/arm64/libbig.so"), bytes(range(256)) * 4000, zipfile.ZIP_STORED)
+        zf.writestr("res/raw/video.bin", bytes(500_000))
+    return buf.getvalue()
+
+
+def _reader(data, reads):
+    def read(offset, length):
+        reads.append((offset, length))
+        return data[offset : offset + length]
+
+    return read
+
+
+def test_reads_only_directory_and_requested_members(tmp_path):
+    data = _apk_bytes()
+    reads = []
+    archive = remote_zip.RemoteZip(_reader(data, reads), len(data), "base.apk")
+
+    assert len(reads) == 1  # EOCD tail already covers the central directory
+    assert sorted(archive.match()) == ["AndroidManifest.xml", "META-INF/CERT.RSA", "classes.dex"]
+    members = archive.read_matching()
+    assert members["AndroidManifest.xml"] == b"<manifest/>" * 50
+    assert members["META-INF/CERT.RSA"] == b"cert"
+    assert archive.bytes_transferred < len(data) // 10
+
+    stub = archive.extract_subset(tmp_path / "stub.apk", ["AndroidManifest.xml"])
+    with zipfile.ZipFile(stub) as zf:
+        assert zf.namelist() == ["AndroidManifest.xml"]
+
+
+def test_stored_members_and_errors():
+    data = _apk_bytes()
+    archive = remote_zip.RemoteZip(_reader(data, []), len(data))
+    assert archive.read("lib/arm64/libbig.so") == bytes(range(256)) * 4000
+    with pytest.raises(KeyError):
+        archive.read("missing")
+    with pytest.raises(remote_zip.RemoteZipError):
+        remote_zip.RemoteZip(_reader(b"not a zip" * 10, []), 90)
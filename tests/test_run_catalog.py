@@ -0,0 +1,78 @@
+import io
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import batch_cli
+from analysis.static_analysis.package_analysis import PackageReport
+from analysis.static_analysis.social_app_finder import SocialApp
+from database import run_catalog
+
+
+def _report(name, sha):
+    return PackageReport(name, "User", [], [], 0, apk_hash=sha, apk_path=f"/data/app/{name}.apk")
+
+
+def _populate(base):
+    run_catalog.record_run(
+        base, "A", base / "A" / "20240105_120000",
+        [_report("com.x", "aa"), _report("com.y", "bb")],
+        [SocialApp("com.x", "X", [], None, {})],
+    )
+    run_catalog.record_run(base, "B", base / "B" / "20240210_080000", [_report("com.x", "cc")])
+
+
+def test_catalog_queries_across_runs(tmp_path):
+    _populate(tmp_path)
+    path = run_catalog.catalog_path(tmp_path)
+
+    with run_catalog.RunCatalog(path) as cat:
+        rows = cat.find_packages(package="com.x")
+        assert [(r["serial"], r["sha256"]) for r in rows] == [("B", "cc"), ("A", "aa")]
+        assert [r["serial"] for r in cat.find_packages(sha256="AA")] == ["A"]
+        assert len(cat.find_packages(package="com.*", serial="A")) == 2
+        assert [r["serial"] for r in cat.find_packages(since="2024-02-01")] == ["B"]
+        assert cat.find_packages(package="com.x", until="2024-01-05") == []
+        assert [r["package_count"] for r in cat.list_runs()] == [1, 2]
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = " ".join(
+        str(r) for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM packages WHERE sha256 = 'aa'"
+        )
+    )
+    assert "idx_packages_sha256" in plan
+
+
+def test_rerecording_a_run_replaces_it(tmp_path):
+    run_dir = tmp_path / "A" / "20240105_120000"
+    run_catalog.record_run(tmp_path, "A", run_dir, [_report("com.x", "aa")])
+    run_catalog.record_run(tmp_path, "A", run_dir, [_report("com.z", "zz")])
+
+    with run_catalog.RunCatalog(run_catalog.catalog_path(tmp_path)) as cat:
+        assert [r["package"] for r in cat.find_packages()] == ["com.z"]
+
+
+def test_catalog_subcommand_outputs_matches(tmp_path):
+    import argparse
+
+    _populate(tmp_path)
+    parser = argparse.ArgumentParser()
+    batch_cli.register_subcommands(parser)
+    args = parser.parse_args(
+        ["catalog", "--output-dir", str(tmp_path), "--package", "com.x", "--output-format", "jsonl"]
+    )
+
+    out = io.StringIO()
+    assert batch_cli.run(args, stdout=out) == 0
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["serial"] for r in rows] == ["B", "A"]
+
+    missing = parser.parse_args(["catalog", "--db", str(tmp_path / "none.sqlite")])
+    assert batch_cli.run(missing, stdout=io.StringIO()) == 1
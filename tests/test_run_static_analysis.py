@@ -6,6 +6,7 @@ if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
 from analysis.static_analysis import run_static_analysis
+from analysis.static_analysis.package_analysis import InstallMatrix
 from analysis.static_analysis.social_app_finder import SocialApp
 
 
@@ -42,6 +43,11 @@ def test_analyze_device_creates_output(monkeypatch, tmp_path, capsys):
         'print_reports',
         lambda reports, serial, limit: None,
     )
+    monkeypatch.setattr(
+        run_static_analysis.package_analysis,
+        'get_install_matrix',
+        lambda serial, raw_dir=None: InstallMatrix(),
+    )
     monkeypatch.setattr(run_static_analysis, 'run_adb_command', fake_run_adb_command)
     monkeypatch.chdir(tmp_path)
 
@@ -61,6 +67,9 @@ def test_analyze_device_creates_output(monkeypatch, tmp_path, capsys):
     assert (run_path / 'raw' / 'pm_list_packages.txt').exists()
     assert (run_path / 'raw' / 'third_party_packages.txt').exists()
     assert (run_path / 'apks' / 'pkg.apk').exists()
+    assert (run_path / 'trace.json').exists()
+    assert (tmp_path / 'output' / 'catalog.sqlite').exists()
+    assert (run_path / 'metrics.prom').exists()
     latest = root / 'latest'
     assert latest.is_symlink()
     assert latest.resolve() == run_path.resolve()
@@ -97,6 +106,11 @@ def test_analyze_device_skip_apk_pull(monkeypatch, tmp_path, capsys):
         'print_reports',
         lambda reports, serial, limit: None,
     )
+    monkeypatch.setattr(
+        run_static_analysis.package_analysis,
+        'get_install_matrix',
+        lambda serial, raw_dir=None: InstallMatrix(),
+    )
     monkeypatch.setattr(run_static_analysis, 'run_adb_command', fake_run_adb_command)
     monkeypatch.chdir(tmp_path)
 
@@ -111,6 +125,41 @@ def test_analyze_device_skip_apk_pull(monkeypatch, tmp_path, capsys):
     assert called['pull'] is False
 
 
+def test_analyze_device_profile_writes_stage_reports(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(
+        run_static_analysis.package_analysis,
+        'analyze_packages',
+        lambda serial, raw_dir=None: [
+            {'name': 'pkg', 'apk_path': '/a/b.apk', 'category': 'cat', 'risk_score': 0}
+        ],
+    )
+    monkeypatch.setattr(
+        run_static_analysis.social_app_finder,
+        'find_social_apps',
+        lambda serial, raw_dir=None: [],
+    )
+    monkeypatch.setattr(
+        run_static_analysis.report_formatter,
+        'print_reports',
+        lambda reports, serial, limit: None,
+    )
+    monkeypatch.setattr(
+        run_static_analysis.package_analysis,
+        'get_install_matrix',
+        lambda serial, raw_dir=None: InstallMatrix(),
+    )
+    monkeypatch.chdir(tmp_path)
+
+    run_static_analysis.analyze_device('SER', pull_apk_files=False, profile=True)
+    out = capsys.readouterr().out
+    assert 'Profile summary' in out
+
+    root = tmp_path / 'output' / 'SER'
+    run_path = next(p for p in root.iterdir() if p.is_dir() and p.name != 'latest')
+    assert (run_path / 'profile' / 'analyze_packages.pstats').exists()
+    assert (run_path / 'profile' / 'analyze_packages.alloc.txt').exists()
+
+
 def test_analyze_apk_driver_shows_metadata(monkeypatch, capsys):
     monkeypatch.setattr(
         run_static_analysis.apk_analysis,
@@ -123,6 +172,28 @@ def test_analyze_apk_driver_shows_metadata(monkeypatch, capsys):
     assert 'size' in out
 
 
+def test_analyze_device_apk_driver_uses_partial_read(monkeypatch, capsys):
+    calls = []
+
+    def fake_run_adb_command(serial, args, **kwargs):
+        return {
+            'success': True,
+            'output': 'package:/data/app/x/split_a.apk\npackage:/data/app/x/base.apk',
+            'error': '',
+        }
+
+    def fake_remote(serial, remote_path, work_dir):
+        calls.append((serial, remote_path))
+        return {'name': 'com.example'}
+
+    monkeypatch.setattr(run_static_analysis, 'run_adb_command', fake_run_adb_command)
+    monkeypatch.setattr(run_static_analysis.apk_analysis, 'analyze_remote_apk', fake_remote)
+    run_static_analysis.analyze_device_apk_driver('SER', 'com.example')
+    out = capsys.readouterr().out
+    assert calls == [('SER', '/data/app/x/base.apk')]
+    assert 'com.example' in out and 'APK analysis complete' in out
+
+
 def test_list_apk_hashes_verbose(monkeypatch, capsys):
     monkeypatch.setattr(
         run_static_analysis.package_analysis,
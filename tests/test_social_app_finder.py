@@ -57,3 +57,52 @@ def test_find_social_apps_adb_lookup_failure(monkeypatch, capsys):
     assert "pm path failed; searching common partitions" in out
     assert "Unresolved packages" in out
     assert apps[0].apk_paths == []
+
+
+def test_find_social_apps_resolves_from_one_partition_listing(monkeypatch, capsys):
+    def fake_list_packages(serial, apk_csv="apk_list.csv"):
+        return {"com.snapchat.android": "", "com.whatsapp": "", "com.discord": ""}, "csv"
+
+    calls = []
+
+    def fake_run_adb_command(serial, args, **kwargs):
+        calls.append(args)
+        if args[0] == "shell":
+            return {
+                "success": False,
+                "output": (
+                    "/data/app/~~Ab12==/com.snapchat.android-Xy9==\n"
+                    "/data/app/com.whatsapp-1\n"
+                    "/system/app/com.whatsapp\n"
+                ),
+                "error": "",
+            }
+        return {"success": True, "output": "", "error": ""}
+
+    monkeypatch.setattr(social_app_finder.discovery, "list_packages", fake_list_packages)
+    monkeypatch.setattr(social_app_finder, "run_adb_command", fake_run_adb_command)
+    apps = {a.package: a.apk_paths for a in social_app_finder.find_social_apps("SER")}
+
+    assert apps == {
+        "com.snapchat.android": ["/data/app/~~Ab12==/com.snapchat.android-Xy9=="],
+        "com.whatsapp": ["/data/app/com.whatsapp-1"],
+        "com.discord": [],
+    }
+    assert sum(1 for args in calls if args[0] == "shell") == 1
+    assert "com.discord: searched" in capsys.readouterr().out
+
+
+def test_find_social_apps_uses_install_matrix(monkeypatch):
+    from analysis.static_analysis.package_analysis import InstallMatrix
+
+    monkeypatch.setattr(
+        social_app_finder.discovery, "list_packages", lambda serial, apk_csv="apk_list.csv": ({}, "csv")
+    )
+    matrix = InstallMatrix(
+        users={0: "Owner", 10: "Work"},
+        paths={"com.whatsapp": "/data/app/wa/base.apk"},
+        installs={"com.whatsapp": [10]},
+    )
+    apps = social_app_finder.find_social_apps("SER", install_matrix=matrix)
+    assert apps[0].apk_paths == ["/data/app/wa/base.apk"]
+    assert apps[0].metadata == {"users": "10"}
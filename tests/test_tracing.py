@@ -0,0 +1,71 @@
+import json
+from types import SimpleNamespace
+
+from utils.adb_utils import adb_runner
+from utils.perf_utils import tracing
+
+
+def test_span_without_session_records_nothing():
+    assert tracing.current() is None
+    with tracing.span("idle", serial="X") as args:
+        args["bytes"] = 1
+    assert tracing.current() is None
+
+
+def test_session_records_nested_spans_and_writes_json(tmp_path):
+    @tracing.traced()
+    def inner():
+        return 42
+
+    with tracing.session() as tracer:
+        with tracing.span("outer", serial="SER") as args:
+            assert inner() == 42
+            args["bytes"] = 10
+
+    names = [e["name"] for e in tracer.events]
+    assert names == ["inner", "outer"]
+    outer = tracer.events[1]
+    assert outer["ph"] == "X" and outer["args"] == {"serial": "SER", "bytes": 10}
+    assert outer["dur"] >= tracer.events[0]["dur"]
+
+    path = tracer.write(tmp_path / "trace.json")
+    data = json.loads(path.read_text())
+    phases = {e["ph"] for e in data["traceEvents"]}
+    assert phases == {"M", "X"}
+
+
+def test_execute_command_records_adb_span(monkeypatch):
+    monkeypatch.setattr(
+        adb_runner.subprocess,
+        "run",
+        lambda cmd, **kw: SimpleNamespace(stdout="abc\n"),
+    )
+    with tracing.session() as tracer:
+        adb_runner.execute_command(["adb", "-s", "SER", "shell", "pm", "list", "packages"])
+
+    (event,) = tracer.events
+    assert event["name"] == "adb shell pm"
+    assert event["cat"] == "adb"
+    assert event["args"]["serial"] == "SER"
+    assert event["args"]["bytes"] == 3
+    assert event["args"]["success"] is True
+
+
+def test_describe_command_handles_non_shell_commands():
+    assert adb_runner.describe_command(["adb", "devices", "-l"]) == (None, "adb devices")
+    assert adb_runner.describe_command(["adb", "-s", "A", "pull", "/x", "y"]) == ("A", "adb pull")
+
+
+def test_execute_command_skips_instrumentation_without_sessions(monkeypatch):
+    monkeypatch.setattr(
+        adb_runner.subprocess,
+        "run",
+        lambda cmd, **kw: SimpleNamespace(stdout="abc\n"),
+    )
+
+    def fail(cmd):
+        raise AssertionError("label built with no active session")
+
+    monkeypatch.setattr(adb_runner, "describe_command", fail)
+    result = adb_runner.execute_command(["adb", "-s", "SER", "shell", "pm", "list", "packages"])
+    assert result["output"] == "abc"
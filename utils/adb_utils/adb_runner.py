@@ -1,10 +1,18 @@
 # utils/adb_utils/adb_runner.py
 """ADB command helper utilities."""
 
+import logging
+import re
+import shlex
 import shutil
 import subprocess
-from typing import Optional, List, Dict, Union
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Optional, List, Dict, Tuple, Union
 import utils.logging_utils.logging_engine as log
+from utils.perf_utils import metrics, tracing
 
 
 def build_adb_command(serial: Optional[str], args: List[str]) -> List[str]:
@@ -17,6 +25,23 @@ def build_adb_command(serial: Optional[str], args: List[str]) -> List[str]:
     return cmd + args
 
 
+def describe_command(cmd: List[str]) -> Tuple[Optional[str], str]:
+    """Return ``(serial, label)`` for an adb command line.
+
+    The label names the adb subcommand and, for ``shell``, the program run on
+    the device, e.g. ``"adb shell dumpsys"``.
+    """
+    if not cmd or cmd[0] != "adb":
+        return None, cmd[0] if cmd else ""
+    args = cmd[1:]
+    serial = None
+    if len(args) >= 2 and args[0] == "-s":
+        serial = args[1]
+        args = args[2:]
+    label = "adb " + " ".join(args[:2] if args[:1] == ["shell"] else args[:1])
+    return serial, label.strip()
+
+
 def execute_command(
     cmd: List[str],
     timeout: int = 15,
@@ -33,8 +58,74 @@ def execute_command(
             "error": str (error message if failed)
         }
     """
-    log.debug(f"[EXECUTE] Running command: {' '.join(cmd)}")
+    debug_enabled = log.is_enabled_for(logging.DEBUG)
+    if debug_enabled:
+        log.debug("[EXECUTE] Running command: %s", " ".join(cmd))
+
+    return _instrumented(
+        cmd,
+        lambda: _execute(cmd, timeout, capture_stderr, log_errors, debug_enabled),
+        lambda result: len(result["output"]),
+    )
+
+
+def _instrumented(
+    cmd: List[str],
+    run: Callable[[], Dict],
+    size_of: Callable[[Dict], int],
+) -> Dict:
+    """Run ``run()`` under an adb trace span and record its metrics.
+
+    The span label and command string are only built while a trace or
+    metrics session is active, so unobserved calls pay nothing extra.
+    """
+    tracer = tracing.current()
+    reg = metrics.active()
+    if tracer is None and reg is None:
+        return run()
+
+    serial, label = describe_command(cmd)
+    started = time.perf_counter()
+    if tracer is None:
+        result = run()
+    else:
+        with tracing.span(label, "adb", serial=serial, cmd=" ".join(cmd)) as span_args:
+            result = run()
+            span_args["success"] = result["success"]
+            span_args["bytes"] = size_of(result)
+    if reg is not None:
+        _record_metrics(reg, label, result, size_of(result), time.perf_counter() - started)
+    return result
 
+
+def _record_metrics(
+    reg: metrics.MetricsRegistry,
+    label: str,
+    result: Dict,
+    nbytes: int,
+    elapsed: float,
+) -> None:
+    """Update adb command counters and latency histograms."""
+    status = "ok" if result["success"] else "error"
+    reg.counter("gf_adb_commands_total", "adb commands executed").inc(
+        subcommand=label, status=status
+    )
+    reg.histogram(
+        "gf_adb_command_duration_seconds", "adb command latency"
+    ).observe(elapsed, subcommand=label)
+    reg.counter("gf_adb_output_bytes_total", "Bytes of adb command output").inc(
+        nbytes, subcommand=label
+    )
+
+
+def _execute(
+    cmd: List[str],
+    timeout: int,
+    capture_stderr: bool,
+    log_errors: bool,
+    debug_enabled: bool,
+) -> Dict[str, Union[bool, str]]:
+    """Run ``cmd`` and translate failures into a result dict."""
     try:
         result = subprocess.run(
             cmd,
@@ -44,8 +135,9 @@ def execute_command(
             timeout=timeout,
         )
         output = result.stdout.strip()
-        snippet = output if len(output) <= 200 else f"{output[:200]}..."
-        log.debug(f"[EXECUTE] Output: {snippet}")
+        if debug_enabled:
+            snippet = output if len(output) <= 200 else f"{output[:200]}..."
+            log.debug("[EXECUTE] Output: %s", snippet)
         return {"success": True, "output": output, "error": ""}
 
     except subprocess.TimeoutExpired:
@@ -101,44 +193,59 @@ def ensure_device_ready(serial: str) -> Dict[str, Union[bool, str]]:
     return {"success": True, "output": state, "error": ""}
 
 
-def run_adb_command(
-    serial: Optional[str],
-    args: List[str],
-    timeout: int = 15,
-    capture_stderr: bool = False,
-    log_errors: bool = True,
-) -> Dict[str, Union[bool, str]]:
-    """
-    Run an adb command for a specific device.
+def _resolve_device(
+    serial: Optional[str], args: List[str], log_errors: bool
+) -> Tuple[Optional[str], Optional[Dict[str, Union[bool, str]]]]:
+    """Pick and ready the target device for ``args``.
 
-    Returns a dict with success, output, error.
+    Returns ``(serial, None)`` on success or ``(None, result)`` with the
+    failure result to hand back to the caller.
     """
     if not is_adb_available(log_errors=log_errors):
-        return {"success": False, "output": "", "error": "adb not found"}
+        return None, {"success": False, "output": "", "error": "adb not found"}
 
     needs_device = args and args[0] != "devices"
 
     if needs_device and serial is None:
         devices_res = execute_command(["adb", "devices", "-l"], log_errors=log_errors)
         if not devices_res.get("success"):
-            return devices_res
+            return None, devices_res
         lines = [l for l in devices_res.get("output", "").splitlines()[1:] if l.strip()]
         if len(lines) > 1:
             msg = "Multiple devices connected. Use --device to specify one."
             if log_errors:
                 log.error(msg)
-            return {"success": False, "output": "", "error": msg}
+            return None, {"success": False, "output": "", "error": msg}
         if len(lines) == 0:
             msg = "No adb devices connected"
             if log_errors:
                 log.error(msg)
-            return {"success": False, "output": "", "error": msg}
+            return None, {"success": False, "output": "", "error": msg}
         serial = lines[0].split()[0]
 
     if needs_device and serial:
         ready = ensure_device_ready(serial)
         if not ready.get("success"):
-            return ready
+            return None, ready
+
+    return serial, None
+
+
+def run_adb_command(
+    serial: Optional[str],
+    args: List[str],
+    timeout: int = 15,
+    capture_stderr: bool = False,
+    log_errors: bool = True,
+) -> Dict[str, Union[bool, str]]:
+    """
+    Run an adb command for a specific device.
+
+    Returns a dict with success, output, error.
+    """
+    serial, failure = _resolve_device(serial, args, log_errors)
+    if failure is not None:
+        return failure
 
     cmd = build_adb_command(serial, args)
     return execute_command(
@@ -147,3 +254,216 @@ def run_adb_command(
         capture_stderr=capture_stderr,
         log_errors=log_errors,
     )
+
+
+# Read size for streamed ``exec-out`` output
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def stream_adb_command(
+    serial: Optional[str],
+    args: List[str],
+    on_chunk: Callable[[bytes], None],
+    timeout: int = 300,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    log_errors: bool = True,
+) -> Dict[str, Union[bool, str, int]]:
+    """Run an adb command and hand its binary stdout to ``on_chunk``.
+
+    Meant for ``exec-out`` commands whose output is too large to buffer
+    (e.g. ``exec-out cat <apk>``): at most ``chunk_size`` bytes are held at a
+    time.  Returns the usual result dict with ``output`` left empty and the
+    number of bytes streamed under ``bytes``.
+    """
+    serial, failure = _resolve_device(serial, args, log_errors)
+    if failure is not None:
+        return {**failure, "bytes": 0}
+
+    cmd = build_adb_command(serial, args)
+    if log.is_enabled_for(logging.DEBUG):
+        log.debug("[STREAM] Running command: %s", " ".join(cmd))
+    return _instrumented(
+        cmd,
+        lambda: _stream(cmd, on_chunk, timeout, chunk_size, log_errors),
+        lambda result: int(result["bytes"]),
+    )
+
+
+def _stream(
+    cmd: List[str],
+    on_chunk: Callable[[bytes], None],
+    timeout: int,
+    chunk_size: int,
+    log_errors: bool,
+) -> Dict[str, Union[bool, str, int]]:
+    """Pump ``cmd``'s stdout into ``on_chunk`` until EOF or ``timeout``."""
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        msg = f"Command not found: {cmd[0]}"
+        if log_errors:
+            log.error(msg)
+        return {"success": False, "output": "", "error": msg, "bytes": 0}
+
+    timed_out = threading.Event()
+
+    def _kill() -> None:
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, _kill)
+    timer.start()
+    total = 0
+    try:
+        assert proc.stdout is not None
+        while True:
+            chunk = proc.stdout.read(chunk_size)
+            if not chunk:
+                break
+            on_chunk(chunk)
+            total += len(chunk)
+        stderr = proc.stderr.read().decode("utf-8", "replace").strip() if proc.stderr else ""
+        returncode = proc.wait()
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        timer.cancel()
+        for pipe in (proc.stdout, proc.stderr):
+            if pipe is not None:
+                pipe.close()
+
+    if returncode != 0:
+        if timed_out.is_set():
+            msg = f"Command timed out after {timeout}s: {' '.join(cmd)}"
+        else:
+            msg = f"Command failed: {' '.join(cmd)} :: {stderr or f'exit {returncode}'}"
+        if log_errors:
+            log.error(msg)
+        return {"success": False, "output": "", "error": msg, "bytes": total}
+    return {"success": True, "output": "", "error": "", "bytes": total}
+
+
+# Per-serial cache of whether the device has a usable ``gzip``
+_gzip_support: Dict[str, bool] = {}
+_gzip_lock = threading.Lock()
+
+
+def device_has_gzip(serial: str) -> bool:
+    """Return ``True`` if ``gzip`` is available on ``serial`` (cached)."""
+    with _gzip_lock:
+        if serial in _gzip_support:
+            return _gzip_support[serial]
+    res = run_adb_command(
+        serial, ["shell", "command -v gzip >/dev/null 2>&1 && echo yes"], log_errors=False
+    )
+    supported = bool(res.get("success")) and res.get("output") == "yes"
+    with _gzip_lock:
+        _gzip_support[serial] = supported
+    return supported
+
+
+def _remote_command(args: List[str]) -> Optional[str]:
+    """Return the device-side command line for ``args`` or ``None``."""
+    if args[:1] == ["shell"] and len(args) > 1:
+        return args[1] if len(args) == 2 else shlex.join(args[1:])
+    if args[:1] == ["logcat"]:
+        return shlex.join(args)
+    return None
+
+
+# Written after the gzip member by the compressed wrapper: ``\nGF_RC=<status>\n``
+_RC_TRAILER = re.compile(rb"GF_RC=(\d+)")
+
+
+def _compressed_script(remote: str) -> str:
+    """Wrap ``remote`` so its output is gzipped and its exit status kept.
+
+    A pipeline's status is gzip's, so the command's own status is passed out
+    through fd 3 and printed as a trailer once gzip (writing to fd 4, the
+    real stdout) has finished.
+    """
+    return (
+        f"{{ rc=$({{ {{ ({remote}) 2>/dev/null; echo $? >&3; }} | gzip -c -1 >&4; }} 3>&1); "
+        f"printf '\\nGF_RC=%s\\n' \"$rc\"; }} 4>&1"
+    )
+
+
+def run_adb_command_compressed(
+    serial: Optional[str],
+    args: List[str],
+    timeout: int = 15,
+    log_errors: bool = True,
+    gzip_path: Optional[Path] = None,
+) -> Dict[str, Union[bool, str]]:
+    """Run a text-producing adb command with gzip compression on the wire.
+
+    ``shell`` and ``logcat`` commands are piped through the device's
+    ``gzip`` over ``exec-out`` and decompressed on the host as they stream
+    in.  When ``gzip_path`` is given the compressed bytes are also written
+    there, so raw artefacts can be stored without re-compressing.  Falls back
+    to :func:`run_adb_command` when the device lacks ``gzip``, the command
+    cannot be wrapped, the stream is not valid gzip, or the command exited
+    non-zero (so the failure is reported exactly as the plain path would);
+    ``compressed`` and ``raw_path`` in the result tell which path was taken.
+    """
+    remote = _remote_command(args)
+    if remote is None or not serial or not device_has_gzip(serial):
+        result = run_adb_command(serial, args, timeout=timeout, log_errors=log_errors)
+        return {**result, "compressed": False, "raw_path": ""}
+
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    parts: List[bytes] = []
+    plain = 0
+    gz_file = gzip_path.open("wb") if gzip_path is not None else None
+
+    def consume(chunk: bytes) -> None:
+        nonlocal plain
+        trailing = len(inflater.unused_data)
+        data = inflater.decompress(chunk)
+        if gz_file is not None:
+            # Keep the status trailer out of the stored gzip file
+            trailing = len(inflater.unused_data) - trailing if inflater.eof else 0
+            gz_file.write(chunk[: len(chunk) - trailing])
+        plain += len(data)
+        parts.append(data)
+
+    try:
+        res = stream_adb_command(
+            serial,
+            ["exec-out", _compressed_script(remote)],
+            consume,
+            timeout=timeout,
+            log_errors=log_errors,
+        )
+        status = _RC_TRAILER.search(inflater.unused_data) if inflater.eof else None
+        valid = bool(res.get("success") and status and status.group(1) == b"0")
+        if status and status.group(1) != b"0":
+            log.debug("%s exited with status %s", remote, status.group(1).decode())
+    except zlib.error as exc:
+        log.debug("Invalid gzip stream for %s: %s", remote, exc)
+        res, valid = {"bytes": 0}, False
+    finally:
+        if gz_file is not None:
+            gz_file.close()
+
+    if not valid:
+        if gzip_path is not None:
+            gzip_path.unlink(missing_ok=True)
+        log.debug("Compressed transport failed for %s; retrying uncompressed", remote)
+        result = run_adb_command(serial, args, timeout=timeout, log_errors=log_errors)
+        return {**result, "compressed": False, "raw_path": ""}
+
+    reg = metrics.registry()
+    wire = reg.counter("gf_adb_compressed_bytes_total", "Bytes moved by compressed adb commands")
+    wire.inc(int(res.get("bytes", 0)), kind="wire")
+    wire.inc(plain, kind="plain")
+    output = b"".join(parts).decode("utf-8", "replace").strip()
+    return {
+        "success": True,
+        "output": output,
+        "error": "",
+        "compressed": True,
+        "raw_path": str(gzip_path) if gzip_path is not None else "",
+    }
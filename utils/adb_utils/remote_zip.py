@@ -0,0 +1,203 @@
+"""Read members of a zip/APK on the device without pulling the whole file.
+
+Only three kinds of ranged reads are issued over ``adb exec-out``:
+
+1. the tail of the file, to locate the End-of-Central-Directory record,
+2. the central directory itself, which lists every member with its offset,
+3. the local header and compressed bytes of each member actually requested.
+
+Triage of the manifest and signature files therefore moves kilobytes per
+APK instead of the full (often 100+ MB) file.  ZIP64 archives are not
+supported and raise :class:`RemoteZipError`.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import shlex
+import struct
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from . import adb_runner
+
+# Members needed to triage an APK's manifest and signing data
+TRIAGE_PATTERNS = ("AndroidManifest.xml", "classes*.dex", "META-INF/*")
+
+_EOCD_SIG = b"PK\x05\x06"
+_EOCD_SIZE = 22
+_MAX_COMMENT = 0xFFFF
+_CDIR_SIG = b"PK\x01\x02"
+_CDIR_SIZE = 46
+_LOCAL_SIG = b"PK\x03\x04"
+_LOCAL_SIZE = 30
+_ZIP64_MARK = 0xFFFFFFFF
+
+RangeReader = Callable[[int, int], bytes]
+
+
+class RemoteZipError(Exception):
+    """Raised when a remote archive cannot be read or parsed."""
+
+
+@dataclass
+class ZipMember:
+    """Central directory entry of one archive member."""
+
+    name: str
+    method: int
+    crc32: int
+    compressed_size: int
+    file_size: int
+    header_offset: int
+
+
+def adb_range_reader(serial: Optional[str], path: str) -> RangeReader:
+    """Return a reader fetching ``length`` bytes at ``offset`` of ``path``.
+
+    Uses ``tail -c +N | head -c L`` on the device, both available in toybox.
+    """
+    quoted = shlex.quote(path)
+
+    def read(offset: int, length: int) -> bytes:
+        buf = bytearray()
+        res = adb_runner.stream_adb_command(
+            serial,
+            ["exec-out", f"tail -c +{offset + 1} {quoted} 2>/dev/null | head -c {length}"],
+            buf.extend,
+            log_errors=False,
+        )
+        if not res.get("success"):
+            raise RemoteZipError(f"Range read of {path} failed: {res.get('error')}")
+        return bytes(buf)
+
+    return read
+
+
+def remote_size(serial: Optional[str], path: str) -> int:
+    """Return the size of ``path`` on the device in bytes."""
+    res = adb_runner.run_adb_command(
+        serial, ["shell", f"stat -c %s {shlex.quote(path)}"], log_errors=False
+    )
+    output = str(res.get("output", "")).strip()
+    if not res.get("success") or not output.isdigit():
+        raise RemoteZipError(f"Cannot stat {path}: {res.get('error') or output}")
+    return int(output)
+
+
+class RemoteZip:
+    """Lazy view of a zip archive accessed through ranged reads."""
+
+    def __init__(self, read: RangeReader, size: int, name: str = "") -> None:
+        self._read = read
+        self.size = size
+        self.name = name
+        self.bytes_transferred = 0
+        self.members: Dict[str, ZipMember] = self._read_central_directory()
+
+    @classmethod
+    def open(cls, serial: Optional[str], path: str) -> "RemoteZip":
+        """Open ``path`` on the device identified by ``serial``."""
+        return cls(adb_range_reader(serial, path), remote_size(serial, path), path)
+
+    def _fetch(self, offset: int, length: int) -> bytes:
+        data = self._read(offset, length)
+        self.bytes_transferred += len(data)
+        if len(data) != length:
+            raise RemoteZipError(
+                f"Short read from {self.name or 'archive'}: wanted {length} bytes at {offset}, got {len(data)}"
+            )
+        return data
+
+    def _read_central_directory(self) -> Dict[str, ZipMember]:
+        tail_len = min(self.size, _EOCD_SIZE + _MAX_COMMENT)
+        tail = self._fetch(self.size - tail_len, tail_len)
+        pos = tail.rfind(_EOCD_SIG)
+        if pos < 0 or pos + _EOCD_SIZE > len(tail):
+            raise RemoteZipError(f"{self.name or 'archive'} is not a zip file")
+        (_, _, _, _, count, cd_size, cd_offset, _) = struct.unpack(
+            "<4s4H2LH", tail[pos : pos + _EOCD_SIZE]
+        )
+        if _ZIP64_MARK in (cd_size, cd_offset) or count == 0xFFFF:
+            raise RemoteZipError(f"{self.name or 'archive'} is a ZIP64 archive")
+
+        # The central directory usually sits just before the EOCD record
+        tail_start = self.size - tail_len
+        if cd_offset >= tail_start:
+            cdir = tail[cd_offset - tail_start : cd_offset - tail_start + cd_size]
+        else:
+            cdir = self._fetch(cd_offset, cd_size)
+
+        members: Dict[str, ZipMember] = {}
+        off = 0
+        for _ in range(count):
+            if cdir[off : off + 4] != _CDIR_SIG:
+                raise RemoteZipError(f"Corrupt central directory in {self.name or 'archive'}")
+            fields = struct.unpack("<4s6H3L5H2L", cdir[off : off + _CDIR_SIZE])
+            method, crc, csize, usize = fields[4], fields[7], fields[8], fields[9]
+            name_len, extra_len, comment_len = fields[10], fields[11], fields[12]
+            header_offset = fields[16]
+            raw_name = cdir[off + _CDIR_SIZE : off + _CDIR_SIZE + name_len]
+            name = raw_name.decode("utf-8" if fields[3] & 0x800 else "cp437")
+            members[name] = ZipMember(name, method, crc, csize, usize, header_offset)
+            off += _CDIR_SIZE + name_len + extra_len + comment_len
+        return members
+
+    def namelist(self) -> List[str]:
+        return list(self.members)
+
+    def read(self, name: str) -> bytes:
+        """Fetch and decompress member ``name``."""
+        try:
+            member = self.members[name]
+        except KeyError:
+            raise KeyError(f"{name} not in {self.name or 'archive'}") from None
+        header = self._fetch(member.header_offset, _LOCAL_SIZE)
+        if header[:4] != _LOCAL_SIG:
+            raise RemoteZipError(f"Bad local header for {name}")
+        name_len, extra_len = struct.unpack("<2H", header[26:30])
+        raw = self._fetch(member.header_offset + _LOCAL_SIZE + name_len + extra_len, member.compressed_size)
+        if member.method == zipfile.ZIP_STORED:
+            data = raw
+        elif member.method == zipfile.ZIP_DEFLATED:
+            data = zlib.decompressobj(-zlib.MAX_WBITS).decompress(raw)
+        else:
+            raise RemoteZipError(f"Unsupported compression method {member.method} for {name}")
+        if zlib.crc32(data) != member.crc32:
+            raise RemoteZipError(f"CRC mismatch for {name}")
+        return data
+
+    def match(self, patterns: Iterable[str] = TRIAGE_PATTERNS) -> List[str]:
+        """Return member names matching any of the glob ``patterns``."""
+        patterns = list(patterns)
+        return [n for n in self.members if any(fnmatch.fnmatchcase(n, p) for p in patterns)]
+
+    def read_matching(self, patterns: Iterable[str] = TRIAGE_PATTERNS) -> Dict[str, bytes]:
+        """Fetch every member matching ``patterns``."""
+        return {name: self.read(name) for name in self.match(patterns)}
+
+    def extract_subset(self, dest: str | Path, patterns: Iterable[str] = TRIAGE_PATTERNS) -> Path:
+        """Write the members matching ``patterns`` into a local zip at ``dest``.
+
+        The result is a slimmed-down APK that local tools (``aapt2``, zip
+        readers) can open without the full file being transferred.
+        """
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(dest, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, data in self.read_matching(patterns).items():
+                zf.writestr(name, data)
+        return dest
+
+
+__all__ = [
+    "RemoteZip",
+    "RemoteZipError",
+    "TRIAGE_PATTERNS",
+    "ZipMember",
+    "adb_range_reader",
+    "remote_size",
+]
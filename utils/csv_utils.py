@@ -1,22 +1,67 @@
 """CSV helper utilities for project.
 
 Provides a ``write_csv`` helper that enforces ``Package`` and ``APK_Path``
-headers and ensures deterministic row ordering.  Additional helpers assist
-with reading and validating APK lists.
+headers, ensures deterministic row ordering and validates rows while they are
+written.  Additional helpers assist with reading and validating APK lists.
 """
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Iterable, Sequence, Mapping, Any, List, Dict
 import csv
+import hashlib
+import heapq
+import tempfile
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from operator import itemgetter
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
 
-# Debugging helper prefix for all prints from this module
-_DEBUG_PREFIX = "[csv_utils]"
-
+import utils.logging_utils.logging_engine as log
 
 _BASE_HEADERS = ["Package", "APK_Path"]
 
+# Rows held in memory before a sorted run is spilled to a temporary file
+DEFAULT_SORT_BUFFER_ROWS = 50_000
+
+_SortItem = Tuple[str, List[Any]]
+
+# Invalid rows reported individually in a summary before they are only counted
+_MAX_REPORTED_ERRORS = 20
+
+
+@dataclass
+class CsvWriteSummary:
+    """Outcome of :func:`write_csv`, gathered in the same pass as the write."""
+
+    path: Path
+    rows: int = 0
+    bytes: int = 0
+    sha256: str = ""
+    invalid_rows: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        """``True`` when every row has a ``Package`` and ``APK_Path``."""
+        return self.invalid_rows == 0
+
+
+class _HashingWriter:
+    """Text sink encoding to UTF-8 while counting and hashing the bytes."""
+
+    def __init__(self, raw: IO[bytes]) -> None:
+        self._raw = raw
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self.sha256.update(data)
+        self.bytes += len(data)
+        self._raw.write(data)
+        return len(text)
+
 
 def _coerce_mapping(row: Mapping[str, Any] | Any, headers: Sequence[str]) -> Dict[str, Any]:
     """Return ``row`` as a mapping for ``headers``.
@@ -30,69 +75,154 @@ def _coerce_mapping(row: Mapping[str, Any] | Any, headers: Sequence[str]) -> Dic
     return {h: getattr(row, h, None) for h in headers}
 
 
-def write_csv(path: str | Path, rows: Iterable[Mapping[str, Any] | Any], headers: Sequence[str]) -> None:
-    """Write ``rows`` to ``path`` using UTF-8 encoding and ``\n`` line endings.
+def _sort_item(row: Mapping[str, Any] | Any, headers: Sequence[str]) -> _SortItem:
+    """Return ``(sort key, values)`` for ``row`` in ``headers`` order."""
+
+    coerced = _coerce_mapping(row, headers)
+    key = str(coerced.get("Package", "")).lower()
+    # csv writes None as an empty field; normalise now so spilled runs match
+    return key, ["" if coerced[h] is None else coerced[h] for h in headers]
+
+
+def _spill(run: List[_SortItem], stack: ExitStack) -> IO[str]:
+    """Write a sorted run to a temporary file and return it rewound."""
+
+    fh = stack.enter_context(
+        tempfile.TemporaryFile("w+", encoding="utf-8", newline="", prefix="gf_csv_")
+    )
+    writer = csv.writer(fh)
+    for key, values in run:
+        writer.writerow([key, *values])
+    fh.seek(0)
+    return fh
+
+
+def _read_run(fh: IO[str]) -> Iterator[_SortItem]:
+    for record in csv.reader(fh):
+        yield record[0], record[1:]
+
+
+def _sorted_values(
+    rows: Iterable[Mapping[str, Any] | Any],
+    headers: Sequence[str],
+    buffer_rows: int,
+    stack: ExitStack,
+) -> Iterator[List[Any]]:
+    """Yield row values sorted by ``Package`` using an external merge sort.
+
+    Up to ``buffer_rows`` rows are sorted in memory at a time; full runs are
+    spilled to temporary files and k-way merged.  Both the in-memory sort and
+    :func:`heapq.merge` are stable, so rows with equal keys keep their input
+    order exactly as a single in-memory sort would.
+    """
+
+    runs: List[Iterator[_SortItem]] = []
+    buffer: List[_SortItem] = []
+    for row in rows:
+        buffer.append(_sort_item(row, headers))
+        if len(buffer) >= buffer_rows:
+            buffer.sort(key=itemgetter(0))
+            runs.append(_read_run(_spill(buffer, stack)))
+            buffer = []
+    buffer.sort(key=itemgetter(0))
+    if runs:
+        log.debug("Merging %d spilled run(s) plus %d buffered row(s)", len(runs), len(buffer))
+        runs.append(iter(buffer))
+        merged: Iterable[_SortItem] = heapq.merge(*runs, key=itemgetter(0))
+    else:
+        merged = buffer
+    for _, values in merged:
+        yield values
+
+
+def write_csv(
+    path: str | Path,
+    rows: Iterable[Mapping[str, Any] | Any],
+    headers: Sequence[str],
+    *,
+    buffer_rows: int = DEFAULT_SORT_BUFFER_ROWS,
+) -> CsvWriteSummary:
+    """Write ``rows`` to ``path`` using UTF-8 encoding.
 
     The first two headers are forced to be ``Package`` and ``APK_Path``. Any
     additional ``headers`` are appended after these.  Rows are sorted
-    case-insensitively by the ``Package`` column.
+    case-insensitively (and stably) by the ``Package`` column.
+
+    ``rows`` may be any iterable, including a generator; it is consumed once
+    and at most ``buffer_rows`` rows are held in memory, with larger inputs
+    sorted through temporary files.
+
+    Rows are validated as they are written (non-empty ``Package`` and
+    ``APK_Path``, as :func:`validate_apk_list` checks) and the returned
+    :class:`CsvWriteSummary` carries the row count, byte size and SHA-256
+    of the file, so callers need not read it back.
     """
 
+    if buffer_rows < 1:
+        raise ValueError("buffer_rows must be at least 1")
     path = Path(path)
     extra_headers = [h for h in headers if h not in _BASE_HEADERS]
     fieldnames = _BASE_HEADERS + list(extra_headers)
-    print(f"{_DEBUG_PREFIX} Preparing to write CSV to {path} with headers: {fieldnames}")
-
-    coerced_rows: List[Dict[str, Any]] = []
-    for row in rows:
-        coerced = _coerce_mapping(row, fieldnames)
-        coerced_rows.append(coerced)
-    print(f"{_DEBUG_PREFIX} Coerced {len(coerced_rows)} row(s) for output")
-
-    coerced_rows.sort(key=lambda r: (str(r.get("Package", "")).lower()))
-    print(f"{_DEBUG_PREFIX} Sorted rows by 'Package' header")
+    log.debug("Writing CSV to %s with headers: %s", path, fieldnames)
 
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8", newline="\n") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in coerced_rows:
-            writer.writerow(row)
-    print(f"{_DEBUG_PREFIX} Wrote {len(coerced_rows)} row(s) to {path}")
+    summary = CsvWriteSummary(path)
+    with ExitStack() as stack:
+        sink = _HashingWriter(stack.enter_context(path.open("wb")))
+        writer = csv.writer(sink)
+        writer.writerow(fieldnames)
+        for values in _sorted_values(rows, fieldnames, buffer_rows, stack):
+            writer.writerow(values)
+            summary.rows += 1
+            # Package and APK_Path are always the first two columns
+            if values[0] == "" or values[1] == "":
+                summary.invalid_rows += 1
+                if len(summary.errors) < _MAX_REPORTED_ERRORS:
+                    summary.errors.append(f"missing data at row {summary.rows}")
+    summary.bytes = sink.bytes
+    summary.sha256 = sink.sha256.hexdigest()
+    log.debug(
+        "Wrote %d row(s), %d bytes to %s (sha256 %s)",
+        summary.rows, summary.bytes, path, summary.sha256,
+    )
+    return summary
 
 
 def read_apk_list(path: str | Path) -> List[Dict[str, str]]:
     """Read an ``apk_list.csv`` style file into a list of dictionaries."""
 
     path = Path(path)
-    print(f"{_DEBUG_PREFIX} Reading APK list from {path}")
+    log.debug("Reading APK list from %s", path)
     with path.open(encoding="utf-8") as f:
         reader = csv.DictReader(f)
         rows = [dict(row) for row in reader]
-    print(f"{_DEBUG_PREFIX} Loaded {len(rows)} row(s) from {path}")
+    log.debug("Loaded %d row(s) from %s", len(rows), path)
     return rows
 
 
 def validate_apk_list(path: str | Path) -> bool:
     """Return ``True`` if ``path`` exists and appears to be a valid APK list."""
 
-    print(f"{_DEBUG_PREFIX} Validating APK list at {path}")
+    log.debug("Validating APK list at %s", path)
     try:
         path = Path(path)
         with path.open(encoding="utf-8") as f:
             reader = csv.DictReader(f)
             if not reader.fieldnames:
-                print(f"{_DEBUG_PREFIX} Validation failed: missing headers")
+                log.warning("Validation failed for %s: missing headers", path)
                 return False
             if reader.fieldnames[:2] != _BASE_HEADERS:
-                print(f"{_DEBUG_PREFIX} Validation failed: incorrect base headers {reader.fieldnames[:2]}")
+                log.warning(
+                    "Validation failed for %s: incorrect base headers %s",
+                    path, reader.fieldnames[:2],
+                )
                 return False
             for idx, row in enumerate(reader, start=1):
                 if not row.get("Package") or not row.get("APK_Path"):
-                    print(f"{_DEBUG_PREFIX} Validation failed: missing data at row {idx}")
+                    log.warning("Validation failed for %s: missing data at row %d", path, idx)
                     return False
     except OSError as exc:
-        print(f"{_DEBUG_PREFIX} Validation failed: {exc}")
+        log.warning("Validation failed for %s: %s", path, exc)
         return False
-    print(f"{_DEBUG_PREFIX} Validation succeeded for {path}")
+    log.debug("Validation succeeded for %s", path)
     return True
@@ -1,15 +1,56 @@
 # utils/logging_utils/logging_core.py
 
+import atexit
+import copy
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 
+# Argument types whose value cannot change after the logging call
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves message formatting to the listener thread.
+
+    The stock :class:`QueueHandler` merges ``%`` arguments into the message
+    before enqueueing.  Records here stay in-process, so when every argument
+    is an immutable primitive the merge is deferred to the background writer
+    and the caller only pays for the enqueue.  Records with other arguments
+    (dicts, lists, objects) are formatted here, so later mutation by the
+    caller cannot change what gets logged.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if not args:
+            return record
+        values = args.values() if isinstance(args, dict) else args
+        if all(isinstance(v, _IMMUTABLE_ARGS) for v in values):
+            return record
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 class LoggingCore:
-    def __init__(self, log_name: str = "android_tool", log_dir: str = "logs"):
+    def __init__(
+        self,
+        log_name: str = "android_tool",
+        log_dir: str = "logs",
+        file_level: int = logging.DEBUG,
+    ):
         """Configure application-wide logging.
 
-        A root logger is created at DEBUG level. Console output defaults to
-        INFO while the log file captures DEBUG and above.
+        Console output defaults to INFO while the log file captures
+        ``file_level`` (DEBUG by default) and above.  File records travel
+        through a :class:`queue.Queue` and are written by a
+        :class:`QueueListener` thread, so disk I/O never happens on the
+        calling thread.  The console handler stays synchronous because its
+        output is interleaved with ``print`` based progress.
         """
 
         # ensure logs directory exists
@@ -21,7 +62,6 @@ class LoggingCore:
 
         # configure root logger
         self.logger = logging.getLogger()
-        self.logger.setLevel(logging.DEBUG)
         # avoid duplicate handlers if re-initialized
         self.logger.handlers.clear()
 
@@ -37,16 +77,58 @@ class LoggingCore:
         self.console_handler.setFormatter(formatter)
         self.logger.addHandler(self.console_handler)
 
-        # file handler captures DEBUG messages
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        # file handler captures DEBUG messages on the background writer thread
+        self.file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        self.file_handler.setLevel(file_level)
+        self.file_handler.setFormatter(formatter)
+
+        self._queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        self.queue_handler = _DeferredQueueHandler(self._queue)
+        self.queue_handler.setLevel(file_level)
+        self.logger.addHandler(self.queue_handler)
+
+        self.listener = QueueListener(
+            self._queue, self.file_handler, respect_handler_level=True
+        )
+        self.listener.start()
+        self._listening = True
+        atexit.register(self.shutdown)
+
+        self._update_root_level()
+
+    def _update_root_level(self) -> None:
+        # the root level is the lowest handler level so that
+        # ``isEnabledFor`` rejects records no handler would emit
+        self.logger.setLevel(min(self.console_handler.level, self.file_handler.level))
 
     def set_console_level(self, level: int) -> None:
         """Adjust the console handler log level."""
 
         self.console_handler.setLevel(level)
+        self._update_root_level()
+
+    def set_file_level(self, level: int) -> None:
+        """Adjust the log file level."""
+
+        self.file_handler.setLevel(level)
+        self.queue_handler.setLevel(level)
+        self._update_root_level()
+
+    def flush(self) -> None:
+        """Block until queued records have been written to the log file."""
+
+        if self._listening:
+            self._queue.join()
+        self.file_handler.flush()
+
+    def shutdown(self) -> None:
+        """Drain the queue, stop the writer thread and close the log file."""
+
+        if self._listening:
+            self.listener.stop()
+            self._listening = False
+        self.logger.removeHandler(self.queue_handler)
+        self.file_handler.close()
 
     def get_logger(self):
         # return the logger instance
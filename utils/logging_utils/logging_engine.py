@@ -1,39 +1,86 @@
 # utils/logging_utils/logging_engine.py
+"""Module-level logging API used throughout the application.
 
+Messages accept lazy ``%``-style arguments, e.g.
+``log.debug("Hash for %s: %s", pkg, digest)``; the string is only built when
+a handler will emit the record, and file output is formatted on the
+background writer thread.  Wrap expensive argument preparation in
+:func:`is_enabled_for`.
+"""
+
+import logging
+import threading
+
+from config import app_config
 from utils.logging_utils.logging_core import LoggingCore
 
 
-# initialize the core logging system once
-_core = LoggingCore()
-_logger = _core.get_logger()
+# the core logging system is created on first use so that importing this
+# module has no side effects (no logs/ directory or open file handles)
+_core = None
+_logger = None
+_init_lock = threading.Lock()
+
+
+def _get_logger():
+    # initialize the core logging system once, on demand
+    global _core, _logger
+    if _logger is None:
+        with _init_lock:
+            if _logger is None:
+                level = logging.getLevelName(getattr(app_config, "LOG_FILE_LEVEL", "DEBUG"))
+                _core = LoggingCore(file_level=level if isinstance(level, int) else logging.DEBUG)
+                _logger = _core.get_logger()
+    return _logger
 
 
-def info(message: str):
+def info(message: str, *args, **kwargs):
     # log informational messages
-    _logger.info(message)
+    _get_logger().info(message, *args, **kwargs)
 
 
-def warning(message: str):
+def warning(message: str, *args, **kwargs):
     # log warnings
-    _logger.warning(message)
+    _get_logger().warning(message, *args, **kwargs)
 
 
-def error(message: str):
+def error(message: str, *args, **kwargs):
     # log errors
-    _logger.error(message)
+    _get_logger().error(message, *args, **kwargs)
 
 
-def debug(message: str):
+def debug(message: str, *args, **kwargs):
     # log debug messages
-    _logger.debug(message)
+    _get_logger().debug(message, *args, **kwargs)
 
 
-def critical(message: str):
+def critical(message: str, *args, **kwargs):
     # log critical issues
-    _logger.critical(message)
+    _get_logger().critical(message, *args, **kwargs)
+
+
+def is_enabled_for(level: int) -> bool:
+    """Return ``True`` if a record at ``level`` would be emitted anywhere."""
+
+    return _get_logger().isEnabledFor(level)
 
 
 def set_console_level(level: int) -> None:
     """Expose ability to tweak console log level at runtime."""
 
+    _get_logger()
     _core.set_console_level(level)
+
+
+def flush() -> None:
+    """Wait until queued records have been written to the log file."""
+
+    if _core is not None:
+        _core.flush()
+
+
+def shutdown() -> None:
+    """Drain pending records and stop the background writer."""
+
+    if _core is not None:
+        _core.shutdown()
@@ -0,0 +1,295 @@
+"""Per-run metrics registry with Prometheus text-format and JSON export.
+
+Counters, gauges and histograms are created on first use through the active
+:class:`MetricsRegistry` and keyed by label values.  :func:`session` binds a
+fresh registry to the current context for the duration of a run, mirroring
+:func:`utils.perf_utils.tracing.session`; outside a session metrics go to a
+throwaway registry, so nothing accumulates across runs.
+
+Example::
+
+    with metrics.session() as registry:
+        metrics.registry().counter("gf_adb_commands_total", "adb commands").inc(
+            subcommand="adb shell pm"
+        )
+        registry.write(run_dir)  # metrics.prom + metrics.json
+
+``metrics.prom`` follows the Prometheus text exposition format and is written
+atomically so a node-exporter textfile collector never reads a partial file.
+"""
+
+from __future__ import annotations
+
+import abc
+import contextvars
+import json
+import math
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Default buckets (seconds) suited to adb round-trips and pipeline stages.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str = "") -> None:
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = []
+        if self.help:
+            lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        lines.extend(self._samples())
+        return lines
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """Return the Prometheus sample lines of this metric."""
+
+    @abc.abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the metric as a JSON-serialisable dict."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = "") -> None:
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def total(self) -> float:
+        with self._lock:
+            return sum(self._values.values())
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return {"type": self.kind, "help": self.help, "samples": [
+            {"labels": dict(k), "value": v} for k, v in items
+        ]}
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., sum, count]
+        self._series: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return int(series[-1]) if series else 0
+
+    def _snapshot(self) -> List[Tuple[LabelKey, List[float]]]:
+        with self._lock:
+            return [(k, list(v)) for k, v in sorted(self._series.items())]
+
+    def _samples(self) -> List[str]:
+        lines: List[str] = []
+        for key, series in self._snapshot():
+            cumulative = 0
+            for bound, hits in zip(self.buckets, series):
+                cumulative += hits
+                le = (("le", _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {int(cumulative)}")
+            inf = (("le", "+Inf"),)
+            lines.append(f"{self.name}_bucket{_format_labels(key, inf)} {int(series[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {int(series[-1])}")
+        return lines
+
+    def to_dict(self) -> Dict[str, Any]:
+        samples = []
+        for key, series in self._snapshot():
+            samples.append({
+                "labels": dict(key),
+                "buckets": dict(zip((str(b) for b in self.buckets), series[:-2])),
+                "sum": series[-2],
+                "count": int(series[-1]),
+            })
+        return {"type": self.kind, "help": self.help, "samples": samples}
+
+
+class MetricsRegistry:
+    """Named collection of metrics."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, **kwargs: Any):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str = "") -> Gauge:
+        return self._get(Gauge, name, help)
+
+    def histogram(
+        self, name: str, help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render_prometheus(self) -> str:
+        """Return all metrics in Prometheus text exposition format."""
+        with self._lock:
+            metrics = [self._metrics[n] for n in sorted(self._metrics)]
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = [self._metrics[n] for n in sorted(self._metrics)]
+        return {m.name: m.to_dict() for m in metrics}
+
+    def write(self, directory: str | Path, stem: str = "metrics") -> List[Path]:
+        """Write ``<stem>.prom`` and ``<stem>.json`` into ``directory``."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        prom = directory / f"{stem}.prom"
+        js = directory / f"{stem}.json"
+        for path, text in (
+            (prom, self.render_prometheus()),
+            (js, json.dumps(self.to_dict(), indent=2)),
+        ):
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+        return [prom, js]
+
+
+_current: contextvars.ContextVar[Optional[MetricsRegistry]] = contextvars.ContextVar(
+    "gf_metrics", default=None
+)
+
+
+def active() -> Optional[MetricsRegistry]:
+    """Return the registry bound by :func:`session`, if any."""
+    return _current.get()
+
+
+def registry() -> MetricsRegistry:
+    """Return the registry for the current run.
+
+    Outside a session a fresh registry is returned each time, so the values
+    recorded there are discarded instead of accumulating for the life of the
+    process.
+    """
+    return _current.get() or MetricsRegistry()
+
+
+@contextmanager
+def session(reg: Optional[MetricsRegistry] = None) -> Iterator[MetricsRegistry]:
+    """Collect metrics into ``reg`` (or a new registry) for the enclosed block."""
+    reg = reg or MetricsRegistry()
+    token = _current.set(reg)
+    try:
+        yield reg
+    finally:
+        _current.reset(token)
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "active",
+    "registry",
+    "session",
+]
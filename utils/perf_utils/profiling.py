@@ -0,0 +1,218 @@
+"""Per-stage cProfile and tracemalloc profiling for analysis runs.
+
+A :class:`StageProfiler` registers itself as a stage hook on the active
+:class:`~utils.perf_utils.tracing.Tracer`, so every ``tracing.span`` with
+``cat="stage"`` is profiled without further instrumentation.  Entering a
+nested stage pauses the enclosing stage's profiler, which keeps the reported
+times exclusive to each stage.  Stages nested deeper than ``max_depth`` (for
+example the per-package ``hash_apk`` spans) are folded into their parent so
+that taking allocation snapshots does not dominate the run.
+
+Example::
+
+    with tracing.session() as tracer:
+        profiler = StageProfiler(run_dir / "profile")
+        tracer.add_stage_hook(profiler)
+        ...
+        profiler.finish()  # writes <stage>.pstats / <stage>.alloc.txt
+
+Repeated stages with the same name accumulate into one profile.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+import re
+import threading
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import utils.logging_utils.logging_engine as log
+
+DEFAULT_TOP_N = 10
+
+
+@dataclass
+class _StageProfile:
+    """cProfile and allocation data accumulated for one stage name."""
+
+    profile: cProfile.Profile = field(default_factory=cProfile.Profile)
+    calls: int = 0
+    # "file:line" -> (size delta in bytes, allocation count delta)
+    allocations: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(lambda: [0, 0]))
+
+
+def _safe_name(stage: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", stage)
+
+
+# tracemalloc is process-wide, so concurrent profilers (``analyze --jobs N
+# --profile``) share one tracing session: it is started by the first profiler
+# and stopped when the last one finishes, unless someone else started it.
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+
+
+def _acquire_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc() -> None:
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+class StageProfiler:
+    """Stage hook collecting cProfile stats and tracemalloc diffs.
+
+    Only stages entered on the thread that created the profiler are profiled,
+    since cProfile instruments a single thread.
+    """
+
+    def __init__(
+        self,
+        output_dir: str | Path,
+        top_n: int = DEFAULT_TOP_N,
+        max_depth: int = 2,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self.top_n = top_n
+        self.max_depth = max_depth
+        self._thread = threading.get_ident()
+        self._stages: Dict[str, _StageProfile] = {}
+        # Entries are (stage, snapshot) for profiled stages, None for folded ones
+        self._stack: List[Optional[Tuple[str, Optional[tracemalloc.Snapshot]]]] = []
+        _acquire_tracemalloc()
+        self._tracing = True
+
+    # -- tracer hook ------------------------------------------------------
+
+    def _active(self) -> Optional[_StageProfile]:
+        for entry in reversed(self._stack):
+            if entry is not None:
+                return self._stages[entry[0]]
+        return None
+
+    def enter_stage(self, name: str) -> None:
+        if threading.get_ident() != self._thread:
+            return
+        if len(self._stack) > self.max_depth:
+            self._stack.append(None)
+            return
+        outer = self._active()
+        if outer is not None:
+            outer.profile.disable()
+        stage = self._stages.setdefault(name, _StageProfile())
+        stage.calls += 1
+        snapshot = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        self._stack.append((name, snapshot))
+        try:
+            stage.profile.enable()
+        except ValueError as exc:  # another profiler is active on this process
+            log.warning("Profiling disabled for stage %s: %s", name, exc)
+
+    def exit_stage(self, name: str) -> None:
+        if threading.get_ident() != self._thread or not self._stack:
+            return
+        entry = self._stack.pop()
+        if entry is None:
+            return
+        stage_name, before = entry
+        stage = self._stages[stage_name]
+        stage.profile.disable()
+        if before is not None and tracemalloc.is_tracing():
+            after = tracemalloc.take_snapshot()
+            for diff in after.compare_to(before, "lineno"):
+                if diff.size_diff <= 0:
+                    continue
+                frame = diff.traceback[0]
+                totals = stage.allocations[f"{frame.filename}:{frame.lineno}"]
+                totals[0] += diff.size_diff
+                totals[1] += diff.count_diff
+        outer = self._active()
+        if outer is not None:
+            outer.profile.enable()
+
+    # -- reporting --------------------------------------------------------
+
+    def top_allocations(self, stage: str) -> List[Tuple[str, int, int]]:
+        """Return ``(location, bytes, count)`` for the largest allocators."""
+        allocations = self._stages[stage].allocations
+        ranked = sorted(allocations.items(), key=lambda kv: kv[1][0], reverse=True)
+        return [(loc, size, count) for loc, (size, count) in ranked[: self.top_n]]
+
+    def hottest_functions(self) -> List[Tuple[str, str, int, float, float]]:
+        """Return ``(stage, function, ncalls, tottime, cumtime)`` across stages."""
+        rows = []
+        for name, stage in self._stages.items():
+            stats = pstats.Stats(stage.profile)
+            for (filename, lineno, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+                label = f"{Path(filename).name}:{lineno}({func})"
+                rows.append((name, label, ncalls, tottime, cumtime))
+        rows.sort(key=lambda r: r[3], reverse=True)
+        return rows[: self.top_n]
+
+    def largest_allocators(self) -> List[Tuple[str, str, int, int]]:
+        """Return ``(stage, location, bytes, count)`` across stages."""
+        rows = [
+            (name, loc, size, count)
+            for name in self._stages
+            for loc, size, count in self.top_allocations(name)
+        ]
+        rows.sort(key=lambda r: r[2], reverse=True)
+        return rows[: self.top_n]
+
+    def write(self) -> List[Path]:
+        """Write ``<stage>.pstats`` and ``<stage>.alloc.txt`` files."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        written: List[Path] = []
+        for name, stage in self._stages.items():
+            base = self.output_dir / _safe_name(name)
+            pstats_path = base.with_name(base.name + ".pstats")
+            stage.profile.dump_stats(pstats_path)
+            written.append(pstats_path)
+
+            alloc_path = base.with_name(base.name + ".alloc.txt")
+            lines = [f"Top {self.top_n} allocations for stage '{name}' ({stage.calls} call(s))"]
+            for loc, size, count in self.top_allocations(name):
+                lines.append(f"{size / 1024:12.1f} KiB {count:8d} blocks  {loc}")
+            alloc_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            written.append(alloc_path)
+        return written
+
+    def print_summary(self) -> None:
+        """Print the hottest functions and largest allocators."""
+        print(f"\n⏱️  Profile summary (files in {self.output_dir})")
+        print(f"{'Stage':<20} {'Calls':>8} {'Self s':>9} {'Cum s':>9}  Function")
+        for stage, func, ncalls, tottime, cumtime in self.hottest_functions():
+            print(f"{stage:<20} {ncalls:>8} {tottime:>9.4f} {cumtime:>9.4f}  {func}")
+        print(f"\n{'Stage':<20} {'KiB':>10} {'Blocks':>8}  Allocated at")
+        for stage, loc, size, count in self.largest_allocators():
+            print(f"{stage:<20} {size / 1024:>10.1f} {count:>8}  {loc}")
+
+    def finish(self) -> List[Path]:
+        """Stop tracing, write per-stage reports and print the summary."""
+        if self._tracing:
+            _release_tracemalloc()
+            self._tracing = False
+        written = self.write()
+        self.print_summary()
+        log.info("Wrote %d profile files to %s", len(written), self.output_dir)
+        return written
+
+
+__all__ = ["DEFAULT_TOP_N", "StageProfiler"]
@@ -0,0 +1,166 @@
+"""Lightweight stage tracing exported in Chrome trace-event format.
+
+A :class:`Tracer` collects complete ("X") events for each :func:`span`
+entered while it is active.  Activation is scoped with :func:`session`, which
+binds the tracer to the current context so parallel device runs on separate
+threads keep separate traces.  When no session is active :func:`span` is a
+near no-op, so instrumentation can stay in hot paths permanently.
+
+Example::
+
+    with tracing.session() as tracer:
+        with tracing.span("hashing", serial=serial) as args:
+            ...
+            args["bytes"] = total
+        tracer.write(run_dir / "trace.json")
+
+The resulting ``trace.json`` opens in ``chrome://tracing`` or Perfetto.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Tracer:
+    """Thread-safe collector of trace events."""
+
+    def __init__(self) -> None:
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._threads: Dict[int, str] = {}
+        self._stage_hooks: List[Any] = []
+
+    def add_stage_hook(self, hook: Any) -> None:
+        """Register ``hook`` to be notified around every ``"stage"`` span.
+
+        ``hook`` must provide ``enter_stage(name)`` and ``exit_stage(name)``;
+        :class:`utils.perf_utils.profiling.StageProfiler` is one such hook.
+        """
+        self._stage_hooks.append(hook)
+
+    def now_us(self) -> float:
+        """Microseconds elapsed since the tracer was created."""
+        return (time.perf_counter_ns() - self._origin_ns) / 1000
+
+    def add_complete(
+        self, name: str, cat: str, start_us: float, dur_us: float, args: Dict[str, Any]
+    ) -> None:
+        """Record a complete event that started at ``start_us``."""
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round(start_us, 3),
+            "dur": round(dur_us, 3),
+            "pid": self._pid,
+            "tid": thread.ident,
+            "args": args,
+        }
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault(thread.ident or 0, thread.name)
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._events)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the trace as a Chrome trace-event JSON object."""
+        with self._lock:
+            meta = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._threads.items()
+            ]
+            events = list(self._events)
+        return {"traceEvents": meta + events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str | Path) -> Path:
+        """Write the trace to ``path`` and return it."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), default=str), encoding="utf-8")
+        return path
+
+
+_current: contextvars.ContextVar[Optional[Tracer]] = contextvars.ContextVar(
+    "gf_tracer", default=None
+)
+
+
+def current() -> Optional[Tracer]:
+    """Return the tracer active in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def session(tracer: Optional[Tracer] = None) -> Iterator[Tracer]:
+    """Activate ``tracer`` (or a new one) for the enclosed block."""
+    tracer = tracer or Tracer()
+    token = _current.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, cat: str = "stage", **args: Any) -> Iterator[Dict[str, Any]]:
+    """Record the enclosed block as a trace event.
+
+    The yielded dict holds the event arguments and may be updated inside the
+    block, e.g. to attach a byte count once it is known.
+    """
+    tracer = _current.get()
+    if tracer is None:
+        yield args
+        return
+    hooks = tracer._stage_hooks if cat == "stage" else ()
+    for hook in hooks:
+        hook.enter_stage(name)
+    start = tracer.now_us()
+    try:
+        yield args
+    finally:
+        tracer.add_complete(name, cat, start, tracer.now_us() - start, args)
+        for hook in reversed(hooks):
+            hook.exit_stage(name)
+
+
+def traced(name: Optional[str] = None, cat: str = "stage") -> Callable[[F], F]:
+    """Decorator form of :func:`span` using the function name by default."""
+
+    def decorator(fn: F) -> F:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*a: Any, **kw: Any) -> Any:
+            with span(label, cat):
+                return fn(*a, **kw)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+__all__ = ["Tracer", "current", "session", "span", "traced"]
@@ -0,0 +1,90 @@
+"""Multi-pattern keyword matching with an Aho-Corasick automaton.
+
+A :class:`KeywordAutomaton` is compiled once from a token list and then
+reports every token occurring in a string in a single left-to-right pass,
+independent of how many tokens there are.  :func:`compile_keywords` caches
+automata by token tuple so callers can ask for one per call without paying
+for the build again.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class KeywordAutomaton:
+    """Case-insensitive Aho-Corasick matcher over a fixed token list.
+
+    Matches are returned in token-list order, so the first match is the same
+    token a ``next(t for t in tokens if t in text)`` scan would pick.
+    """
+
+    __slots__ = ("tokens", "_goto", "_fail", "_out")
+
+    def __init__(self, tokens: Iterable[str]) -> None:
+        self.tokens: Tuple[str, ...] = tuple(dict.fromkeys(t.lower() for t in tokens if t))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Tuple[int, ...]] = [()]
+        for idx, token in enumerate(self.tokens):
+            state = 0
+            for ch in token:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._out.append(())
+                state = nxt
+            self._out[state] += (idx,)
+        self._fail: List[int] = [0] * len(self._goto)
+        self._link()
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first and merge suffix outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def matches(self, text: str) -> List[str]:
+        """Return every token found in ``text``, in token-list order."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[int] = set()
+        state = 0
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return [self.tokens[i] for i in sorted(found)]
+
+    def first(self, text: str) -> Optional[str]:
+        """Return the earliest token (in list order) found in ``text``."""
+        found = self.matches(text)
+        return found[0] if found else None
+
+
+@lru_cache(maxsize=16)
+def _compile(tokens: Tuple[str, ...]) -> KeywordAutomaton:
+    return KeywordAutomaton(tokens)
+
+
+def compile_keywords(tokens: Iterable[str]) -> KeywordAutomaton:
+    """Return a cached automaton for ``tokens``."""
+    return _compile(tuple(tokens))
+
+
+__all__ = ["KeywordAutomaton", "compile_keywords"]